@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""Benchmarks the event loop latency while the storage engine saves.
+
+Usage: ./benchmarks/async_benchmark.py [number_of_objects ...]
+
+For each store size, an event loop runs a ticker that sleeps for 1 ms at a
+time and records how late it wakes up, while 20 requests each update an
+object and save. The mean and worst lateness are reported with the blocking
+save() called on the event loop and with AsyncStorage.asave(), where the
+saves run on an executor and overlapping ones share one write.
+"""
+import os
+import sys
+import asyncio
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+import models  # noqa: E402
+from models.engine.async_storage import AsyncStorage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+REQUESTS = 20
+
+
+async def ticker(lateness, done):
+    """Record in lateness how late every 1 ms sleep ends until done."""
+    while not done.is_set():
+        start = perf_counter()
+        await asyncio.sleep(0.001)
+        lateness.append(perf_counter() - start - 0.001)
+
+
+async def run(storage, places, blocking):
+    """Return the lateness of the ticker while REQUESTS requests save."""
+    storage_async = AsyncStorage(storage)
+    lateness = []
+    done = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lateness, done))
+
+    async def request(i):
+        await asyncio.sleep(i * 0.005)
+        places[i].name = f"place {i}"
+        if blocking:
+            storage.save()
+        else:
+            await storage_async.asave()
+
+    await asyncio.gather(*(request(i) for i in range(REQUESTS)))
+    done.set()
+    await tick
+    return lateness
+
+
+def main(sizes):
+    """Run the benchmark for every size in sizes."""
+    print("{:>10} {:>22} {:>22}".format(
+        "objects", "save() mean/worst", "asave() mean/worst"))
+    for size in sizes:
+        results = []
+        for blocking in (True, False):
+            FileStorage._FileStorage__objects = {}
+            storage = FileStorage(thread_safe=True, durable=False)
+            models.storage = storage
+            places = [Place() for i in range(size)]
+            storage.save()
+            lateness = asyncio.run(run(storage, places, blocking))
+            results += [sum(lateness) / len(lateness) * 1000,
+                        max(lateness) * 1000]
+        print("{:>10} {:>9.2f} / {:>6.1f} ms {:>9.2f} / {:>6.1f} ms".format(
+            size, *results))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1000, 10000])
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""Benchmarks creating many objects at once with create_many().
+
+Usage: ./benchmarks/bulk_benchmark.py [number_of_objects ...]
+
+For each number of objects, the seconds taken to create that many places
+with a name and a price, store them and save them once are reported, one
+object at a time through Place() and with Place.create_many(). Saving after
+every object, as scripts calling obj.save() in a loop do, is reported for
+the first number only, since it rewrites the whole file every time. Creating
+objects one at a time inserts each into the sorted range indexes, so that
+path takes very long at a million objects.
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def one_by_one(count, save_each):
+    """Create count places one at a time."""
+    for i in range(count):
+        place = Place()
+        place.name = f"place {i}"
+        place.price_by_night = i % 500
+        if save_each:
+            place.save()
+    FileStorage().save()
+
+
+def at_once(count):
+    """Create count places with create_many()."""
+    Place.create_many(name=[f"place {i}" for i in range(count)],
+                      price_by_night=[i % 500 for i in range(count)])
+
+
+def timed(function, *args):
+    """Return the seconds function takes on a fresh storage engine."""
+    FileStorage._FileStorage__objects = {}
+    if os.path.exists("storage.json"):
+        os.remove("storage.json")
+    start = perf_counter()
+    function(*args)
+    return perf_counter() - start
+
+
+def main(counts):
+    """Run the benchmark for every number of objects in counts."""
+    print("{:>10} {:>14} {:>14} {:>14}".format(
+        "objects", "save each", "one by one", "create_many"))
+    for count in counts:
+        save_each = "-"
+        if count == counts[0]:
+            save_each = "{:.2f} s".format(timed(one_by_one, count, True))
+        print("{:>10} {:>14} {:>12.2f} s {:>12.2f} s".format(
+            count, save_each, timed(one_by_one, count, False),
+            timed(at_once, count)))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10000, 100000, 1000000])
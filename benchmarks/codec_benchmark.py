@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""Benchmarks the serialization codecs of FileStorage.
+
+Usage: ./benchmarks/codec_benchmark.py [number_of_objects ...]
+
+For each store size, generates a mix of Users, Places and Reviews and
+reports, for every codec, the size of the file, the time of a full save
+and the time of a reload.
+"""
+import os
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.codecs import codecs  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def generate(size):
+    """Fill the storage with size objects: 1 User for 4 Places and
+    5 Reviews."""
+    FileStorage._FileStorage__objects = {}
+    users, places = [], []
+    for i in range(size):
+        if i % 10 == 0 or not places:
+            user = User()
+            user.email = "user{}@example.com".format(i)
+            user.first_name = "First{}".format(i)
+            user.last_name = "Last{}".format(i)
+            users.append(user.id)
+            if not places:
+                place = Place()
+                place.user_id = user.id
+                places.append(place.id)
+        elif i % 10 < 5:
+            place = Place()
+            place.city_id = random.choice(users)
+            place.user_id = random.choice(users)
+            place.name = "Place {}".format(i)
+            place.description = "A lovely place " * random.randint(1, 8)
+            place.number_rooms = random.randint(1, 6)
+            place.number_bathrooms = random.randint(1, 3)
+            place.max_guest = random.randint(1, 12)
+            place.price_by_night = random.randint(20, 400)
+            place.latitude = random.uniform(-90, 90)
+            place.longitude = random.uniform(-180, 180)
+            place.amenity_ids = [str(random.randint(0, 30)) for j in range(4)]
+            places.append(place.id)
+        else:
+            review = Review()
+            review.place_id = random.choice(places)
+            review.user_id = random.choice(users)
+            review.text = "Great stay! " * random.randint(1, 20)
+
+
+def main(sizes):
+    """Run the benchmark for every size in sizes."""
+    print("{:>10} {:>8} {:>12} {:>10} {:>10}".format(
+        "objects", "codec", "file size", "save", "reload"))
+    for size in sizes:
+        generate(size)
+        objects = FileStorage._FileStorage__objects
+        for name, codec in codecs.items():
+            storage = FileStorage(codec=name)
+            FileStorage._FileStorage__objects = objects
+            FileStorage._FileStorage__fragments = {}
+            start = perf_counter()
+            storage.save()
+            save = perf_counter() - start
+            path = "storage" + codec.extension
+            FileStorage._FileStorage__objects = {}
+            start = perf_counter()
+            storage.reload()
+            reload = perf_counter() - start
+            print("{:>10} {:>8} {:>10.1f}MB {:>9.3f}s {:>9.3f}s".format(
+                size, name, os.path.getsize(path) / 1e6, save, reload))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10000, 100000])
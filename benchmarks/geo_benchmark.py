@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""Benchmarks the geospatial lookups of FileStorage.
+
+Usage: ./benchmarks/geo_benchmark.py [number_of_places ...]
+
+For each store size, generates Places spread over Europe and reports the
+time of a 5 km radius search and of a 10 nearest search, through the
+geospatial index and by measuring the distance to every Place.
+"""
+import os
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+import models  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.engine.geo import haversine  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def generate(size):
+    """Fill the storage with size Places."""
+    FileStorage._FileStorage__objects = {}
+    for i in range(size):
+        place = Place()
+        place.latitude = random.uniform(36, 60)
+        place.longitude = random.uniform(-10, 30)
+
+
+def brute(lat, lon):
+    """Return the (distance, Place) pairs of every Place, nearest first."""
+    return sorted(((haversine(lat, lon, pl.latitude, pl.longitude), pl)
+                   for pl in models.storage.all(Place).values()),
+                  key=lambda pair: pair[0])
+
+
+def main(sizes):
+    """Run the benchmark for every size in sizes."""
+    print("{:>10} {:>8} {:>12} {:>12} {:>12}".format(
+        "places", "search", "matches", "index", "brute force"))
+    for size in sizes:
+        generate(size)
+        lat, lon = 48.8566, 2.3522
+        start = perf_counter()
+        near = models.storage.lookup_radius(Place, lat, lon, 5)
+        index = perf_counter() - start
+        start = perf_counter()
+        expected = [pl for d, pl in brute(lat, lon) if d <= 5]
+        scan = perf_counter() - start
+        assert list(near.values()) == expected
+        print("{:>10} {:>8} {:>12} {:>10.3f}ms {:>10.3f}ms".format(
+            size, "radius", len(near), index * 1e3, scan * 1e3))
+        start = perf_counter()
+        near = models.storage.lookup_nearest(Place, lat, lon, 10)
+        index = perf_counter() - start
+        start = perf_counter()
+        expected = [pl for d, pl in brute(lat, lon)[:10]]
+        scan = perf_counter() - start
+        assert list(near.values()) == expected
+        print("{:>10} {:>8} {:>12} {:>10.3f}ms {:>10.3f}ms".format(
+            size, "nearest", len(near), index * 1e3, scan * 1e3))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""Benchmarks the throughput of durable saves with group commit.
+
+Usage: ./benchmarks/group_commit_benchmark.py [number_of_objects ...]
+
+For each store size, 8 threads each run 50 `create`-like commands (a new
+object followed by a save), every save flushed to disk with fsync. The
+commands per second are reported without a group commit window, where
+saves take turns, and with windows of 1 and 5 milliseconds. The storage
+engine is thread-safe in every case; a command failing in any thread
+stops the benchmark.
+"""
+import os
+import sys
+import tempfile
+import threading
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+import models  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.review import Review  # noqa: E402
+
+THREADS = 8
+COMMANDS = 50
+
+
+def throughput(storage):
+    """Return the commands per second of THREADS threads saving to
+    storage.
+
+    Raises:
+        RuntimeError: If a command failed in one of the threads.
+    """
+    failures = []
+
+    def run():
+        try:
+            for i in range(COMMANDS):
+                Review()
+                storage.save()
+        except Exception as error:
+            failures.append(error)
+
+    threads = [threading.Thread(target=run) for i in range(THREADS)]
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+    if failures:
+        raise RuntimeError("{} of {} threads failed".format(
+            len(failures), THREADS)) from failures[0]
+    return THREADS * COMMANDS / elapsed
+
+
+def main(sizes):
+    """Run the benchmark for every size in sizes."""
+    print("{:>10} {:>12} {:>12} {:>12}".format(
+        "objects", "no window", "1 ms", "5 ms"))
+    for size in sizes:
+        results = []
+        for window in (0, 0.001, 0.005):
+            FileStorage._FileStorage__objects = {}
+            storage = FileStorage(group_commit=window, thread_safe=True)
+            models.storage = storage
+            for i in range(size):
+                Review()
+            storage.save()
+            results.append(throughput(storage))
+        print("{:>10} {:>8.0f} c/s {:>8.0f} c/s {:>8.0f} c/s".format(
+            size, *results))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1000, 10000])
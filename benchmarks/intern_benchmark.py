@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""Benchmarks the memory saved by interning ids on FileStorage.reload().
+
+Usage: ./benchmarks/intern_benchmark.py [number_of_places ...]
+
+For each store size, writes a synthetic dataset of users, cities,
+amenities, places referring to them and two reviews per place, then
+reports with tracemalloc the memory held once the objects are reloaded,
+with the repeated ids and attribute names interned and without.
+"""
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.amenity import Amenity  # noqa: E402
+from models.city import City  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def generate(size):
+    """Write a storage file of size places and the objects they refer
+    to."""
+    FileStorage._FileStorage__objects = {}
+    rand = random.Random(size)
+    users = [u.id for u in User.create_many(
+        email=["user@hbnb.io"] * (size // 10 + 1))]
+    cities = [c.id for c in City.create_many(
+        name=["city"] * (size // 50 + 1))]
+    amenities = [a.id for a in Amenity.create_many(name=["amenity"] * 30)]
+    places = Place.create_many(
+        city_id=[rand.choice(cities) for i in range(size)],
+        user_id=[rand.choice(users) for i in range(size)],
+        amenity_ids=[rand.sample(amenities, 5) for i in range(size)])
+    Review.create_many(
+        place_id=[p.id for p in places for i in range(2)],
+        user_id=[rand.choice(users) for i in range(2 * size)])
+    FileStorage().save()
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__fragments = {}
+
+
+def measure():
+    """Return the memory held after a reload, in MiB."""
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__fragments = {}
+    tracemalloc.start()
+    FileStorage().reload()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return current / 2 ** 20
+
+
+def main(sizes):
+    """Run the benchmark for every size in sizes."""
+    print("{:>10} {:>10} {:>14} {:>14} {:>8}".format(
+        "places", "objects", "interned", "not interned", "saved"))
+    for size in sizes:
+        generate(size)
+        interned = measure()
+        with patch.object(sys, "intern", lambda s: s):
+            plain = measure()
+        print("{:>10} {:>10} {:>10.1f} MiB {:>10.1f} MiB {:>7.0%}".format(
+            size, len(FileStorage().all()), interned, plain,
+            1 - interned / plain))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""Benchmarks price range queries over Places.
+
+Usage: ./benchmarks/query_benchmark.py [number_of_places ...]
+
+For each store size, generates Places with prices spread like nightly
+rates, mostly between 50 and 400, and runs price-slider lookups through
+the range index: a wide window, 100 to 150, and a narrow one, 120 to 121.
+For each window it reports the number of matches, the time to count them,
+the time to read every matching Place, and the time of a scan of every
+Place.
+"""
+import os
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+import models  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+WINDOWS = [(100, 150), (120, 121)]
+
+
+def generate(size):
+    """Fill the storage with size Places."""
+    FileStorage._FileStorage__objects = {}
+    rand = random.Random(size)
+    Place.create_many(price_by_night=[
+        min(int(rand.lognormvariate(5, 0.6)), 5000) for i in range(size)])
+    models.storage.index_range(Place, "price_by_night")
+
+
+def timed(func):
+    """Return the result of func() and the milliseconds it took."""
+    start = perf_counter()
+    result = func()
+    return result, (perf_counter() - start) * 1e3
+
+
+def main(sizes):
+    """Run the benchmark for every size in sizes."""
+    print("{:>10} {:>10} {:>8} {:>10} {:>10} {:>10}".format(
+        "places", "window", "matches", "count", "read", "scan"))
+    for size in sizes:
+        generate(size)
+        places = models.storage.all(Place)
+        for low, high in WINDOWS:
+            objs = models.storage.lookup_range(Place, "price_by_night",
+                                               low, high)
+            matches, count = timed(lambda: len(objs))
+            read, read_time = timed(lambda: list(objs.values()))
+            scanned, scan = timed(lambda: [
+                obj for obj in places.values()
+                if low <= obj.price_by_night <= high])
+            assert len(scanned) == len(read) == matches
+            print("{:>10} {:>10} {:>8} {:>8.3f}ms {:>8.1f}ms {:>8.1f}ms"
+                  .format(size, "{}-{}".format(low, high), matches, count,
+                          read_time, scan))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [100000, 1000000])
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""Benchmarks FileStorage.reload() on a generated storage file.
+
+Usage: ./benchmarks/reload_benchmark.py [number_of_objects ...]
+
+For each store size, times an eager reload and a lazy reload followed by
+a single get(), the work done by one console `show`.
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+
+
+def generate(size):
+    """Write a storage file of size objects and return one Place id."""
+    FileStorage._FileStorage__objects = {}
+    for i in range(size):
+        obj = Place() if i % 2 else Review()
+        obj.name = "object {}".format(i)
+    FileStorage().save()
+    return obj.id
+
+
+def timed(storage, place_id):
+    """Return the seconds taken to reload storage and get one Place."""
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__unloaded = {}
+    start = perf_counter()
+    storage.reload()
+    storage.get(Place, place_id)
+    return perf_counter() - start
+
+
+def main(sizes):
+    """Run the benchmark for every size in sizes."""
+    print("{:>10} {:>12} {:>12}".format("objects", "eager", "lazy"))
+    for size in sizes:
+        place_id = generate(size)
+        eager = timed(FileStorage(), place_id)
+        lazy = timed(FileStorage(lazy=True), place_id)
+        print("{:>10} {:>11.4f}s {:>11.4f}s".format(size, eager, lazy))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1000, 10000, 100000])
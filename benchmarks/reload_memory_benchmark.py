@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""Benchmarks the memory used by FileStorage.reload().
+
+Usage: ./benchmarks/reload_memory_benchmark.py [number_of_objects ...]
+
+For each store size, reports with tracemalloc the memory held once the
+objects are loaded and the peak reached while loading them, for the
+streaming reload and for a json.load() of the whole file.
+"""
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.file_storage import FileStorage, classes  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+
+
+def generate(size):
+    """Write a storage file of size objects."""
+    FileStorage._FileStorage__objects = {}
+    for i in range(size):
+        obj = Place() if i % 2 else Review()
+        obj.name = "object {}".format(i)
+    FileStorage().save()
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__fragments = {}
+
+
+def load_whole_file():
+    """Reload the way FileStorage did before streaming."""
+    storage = FileStorage()
+    with open("storage.json", "r") as f:
+        for o in json.load(f).values():
+            storage.new(classes[o.pop("__class__")](**o))
+
+
+def measure(reload):
+    """Return the memory held after reload() and its peak, in MiB."""
+    FileStorage._FileStorage__objects = {}
+    tracemalloc.start()
+    reload()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / 2 ** 20, peak / 2 ** 20
+
+
+def main(sizes):
+    """Run the benchmark for every size in sizes."""
+    print("{:>10} {:>24} {:>24}".format(
+        "objects", "streaming held/peak", "json.load held/peak"))
+    for size in sizes:
+        generate(size)
+        streaming = measure(FileStorage().reload)
+        whole = measure(load_whole_file)
+        print("{:>10} {:>10.1f} / {:>8.1f} MiB {:>10.1f} / {:>8.1f} MiB"
+              .format(size, *streaming, *whole))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [100000, 1000000])
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""Benchmarks FileStorage.save() after a single change.
+
+Usage: ./benchmarks/save_benchmark.py [number_of_objects ...]
+
+For each store size of Places with descriptions and Reviews with texts,
+times a full save, a save after one attribute update once a search loaded
+the text indexes, and the same update saved in journal mode.
+"""
+import json
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+
+
+def timed(func):
+    """Return the seconds taken by func()."""
+    start = perf_counter()
+    func()
+    return perf_counter() - start
+
+
+def full_dump(storage):
+    """Save the way FileStorage did before change tracking."""
+    with open("storage.json", "w") as f:
+        json.dump({k: o.to_dict() for k, o in storage.all().items()}, f)
+
+
+def main(sizes):
+    """Run the benchmark for every size in sizes."""
+    print("{:>10} {:>12} {:>12} {:>12} {:>12}".format(
+        "objects", "to_dict all", "first save", "one change", "journal"))
+    for size in sizes:
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage()
+        journaled = FileStorage(journal=True)
+        for i in range(size):
+            if i % 2:
+                obj = Place()
+                obj.description = "A quiet loft near the station {}".format(i)
+            else:
+                obj = Review()
+                obj.text = "Great host, the room was clean {}".format(i)
+            obj.name = "object {}".format(i)
+        first = timed(storage.save)
+        baseline = timed(lambda: full_dump(storage))
+        storage.search(Review, "quiet room")
+        storage.save()
+        obj.name = "changed"
+        one = timed(storage.save)
+        obj.name = "changed again"
+        journal = timed(journaled.save)
+        print("{:>10} {:>11.4f}s {:>11.4f}s {:>11.4f}s {:>11.4f}s".format(
+            size, baseline, first, one, journal))
+        os.remove("storage.json.log")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1000, 10000, 100000])
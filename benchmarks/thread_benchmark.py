@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""Benchmarks the throughput of the thread-safe mode of FileStorage.
+
+Usage: ./benchmarks/thread_benchmark.py [number_of_objects ...]
+
+For each store size, 8 threads each run 200 operations: mostly `show`-like
+lookups by key and range lookups on Place.price_by_night, with one object
+in ten updated and one operation in fifty a save. The operations per second
+are reported with the storage engine unguarded on a single thread, and in
+thread-safe mode on 1 and 8 threads, where saves write the file without
+holding the lock.
+"""
+import os
+import sys
+import random
+import tempfile
+import threading
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+import models  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+OPERATIONS = 200
+
+
+def throughput(storage, ids, threads):
+    """Return the operations per second of threads threads sharing
+    storage."""
+    def run():
+        rand = random.Random()
+        for i in range(OPERATIONS):
+            place = storage.get(Place, rand.choice(ids))
+            if i % 10 == 0:
+                place.price_by_night = rand.randrange(500)
+            elif i % 50 == 1:
+                storage.save()
+            else:
+                low = rand.randrange(500)
+                storage.lookup_range(Place, "price_by_night", low, low + 5)
+
+    workers = [threading.Thread(target=run) for i in range(threads)]
+    start = perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * OPERATIONS / (perf_counter() - start)
+
+
+def main(sizes):
+    """Run the benchmark for every size in sizes."""
+    print("{:>10} {:>14} {:>14} {:>14}".format(
+        "objects", "unguarded", "1 thread", "8 threads"))
+    for size in sizes:
+        results = []
+        for thread_safe, threads in ((False, 1), (True, 1), (True, 8)):
+            FileStorage._FileStorage__objects = {}
+            storage = FileStorage(thread_safe=thread_safe, durable=False)
+            models.storage = storage
+            storage.index_range(Place, "price_by_night")
+            ids = []
+            for i in range(size):
+                place = Place()
+                place.price_by_night = i % 500
+                ids.append(place.id)
+            storage.save()
+            results.append(throughput(storage, ids, threads))
+        print("{:>10} {:>10.0f} op/s {:>10.0f} op/s {:>10.0f} op/s".format(
+            size, *results))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1000, 10000])
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""Benchmarks the latency of save() with a background flusher.
+
+Usage: ./benchmarks/write_behind_benchmark.py [number_of_objects ...]
+
+For each store size, 100 `update`-like commands each change an object and
+save. The mean time a command waits for save() is reported with saves
+written before they return, and in write-behind mode with a 50 ms flush
+interval, along with the number of writes and their mean duration.
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(tempfile.mkdtemp())
+
+import models  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+COMMANDS = 100
+
+
+def latency(storage, places):
+    """Return the mean seconds COMMANDS commands wait for save()."""
+    total = 0
+    for i in range(COMMANDS):
+        places[i % len(places)].name = f"place {i}"
+        start = perf_counter()
+        storage.save()
+        total += perf_counter() - start
+    return total / COMMANDS
+
+
+def main(sizes):
+    """Run the benchmark for every size in sizes."""
+    print("{:>10} {:>12} {:>12} {:>8} {:>12}".format(
+        "objects", "sync save", "write-behind", "writes", "write time"))
+    for size in sizes:
+        results = []
+        for interval in (0, 0.05):
+            FileStorage._FileStorage__objects = {}
+            storage = FileStorage(flush_interval=interval)
+            models.storage = storage
+            places = [Place() for i in range(size)]
+            FileStorage(thread_safe=True).save()
+            results.append(latency(storage, places) * 1000)
+            storage.flush()
+        metrics = storage.flush_metrics()
+        print("{:>10} {:>9.3f} ms {:>9.3f} ms {:>8} {:>9.3f} ms".format(
+            size, *results, metrics["flushes"],
+            metrics["total_duration"] / max(metrics["flushes"], 1) * 1000))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1000, 10000])
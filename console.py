@@ -2,6 +2,7 @@
 """Defines the HBnB console."""
 import cmd
 import re
+import sys
 from shlex import split
 from models import storage
 from models.base_model import BaseModel
@@ -53,6 +54,11 @@ class HBNBCommand(cmd.Cmd):
         """Do nothing upon receiving an empty line."""
         pass
 
+    def precmd(self, line):
+        """Pick up the objects other processes saved before a command."""
+        storage.refresh()
+        return line
+
     def default(self, arg):
         """Default behavior for cmd module when input is invalid"""
         argdict = {
@@ -60,7 +66,8 @@ class HBNBCommand(cmd.Cmd):
             "show": self.do_show,
             "destroy": self.do_destroy,
             "count": self.do_count,
-            "update": self.do_update
+            "update": self.do_update,
+            "search": self.do_search
         }
         match = re.search(r"\.", arg)
         if match is not None:
@@ -74,13 +81,23 @@ class HBNBCommand(cmd.Cmd):
         print("*** Unknown syntax: {}".format(arg))
         return False
 
+    def read_only(self):
+        """Print an error and return True if the storage refuses saves,
+        so that commands changing objects stop before they do."""
+        if storage.read_only:
+            print("** storage is read-only **")
+            return True
+        return False
+
     def do_quit(self, arg):
         """Quit command to exit the program."""
+        storage.flush()
         return True
 
     def do_EOF(self, arg):
         """EOF signal to exit the program."""
         print("")
+        storage.flush()
         return True
 
     def do_create(self, arg):
@@ -92,7 +109,7 @@ class HBNBCommand(cmd.Cmd):
             print("** class name missing **")
         elif argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
-        else:
+        elif not self.read_only():
             print(eval(argl[0])().id)
             storage.save()
 
@@ -101,60 +118,96 @@ class HBNBCommand(cmd.Cmd):
         Display the string representation of a class instance of a given id.
         """
         argl = parse(arg)
-        objdict = storage.all()
         if len(argl) == 0:
             print("** class name missing **")
         elif argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         elif len(argl) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(argl[0], argl[1]) not in objdict:
+        elif storage.get(argl[0], argl[1]) is None:
             print("** no instance found **")
         else:
-            print(objdict["{}.{}".format(argl[0], argl[1])])
+            print(storage.get(argl[0], argl[1]))
 
     def do_destroy(self, arg):
         """Usage: destroy <class> <id> or <class>.destroy(<id>)
         Delete a class instance of a given id."""
         argl = parse(arg)
-        objdict = storage.all()
         if len(argl) == 0:
             print("** class name missing **")
         elif argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         elif len(argl) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(argl[0], argl[1]) not in objdict.keys():
+        elif storage.get(argl[0], argl[1]) is None:
             print("** no instance found **")
-        else:
-            del objdict["{}.{}".format(argl[0], argl[1])]
+        elif not self.read_only():
+            storage.delete(storage.get(argl[0], argl[1]))
             storage.save()
 
     def do_all(self, arg):
-        """Usage: all or all <class> or <class>.all()
+        """Usage: all [<class>] [limit=<n>] [after=<key>] or
+       <class>.all([limit=<n>], [after=<key>])
         Display string representations of all instances of a given class.
-        If no class is specified, displays all instantiated objects."""
+        If no class is specified, displays all instantiated objects.
+        Instances are listed in the order of their <class>.<id> keys; with
+        limit, at most n of them are listed, and after lists the ones
+        following the given key (or id, with a class)."""
         argl = parse(arg)
-        if len(argl) > 0 and argl[0] not in HBNBCommand.__classes:
-            print("** class doesn't exist **")
-        else:
-            objl = []
-            for obj in storage.all().values():
-                if len(argl) > 0 and argl[0] == obj.__class__.__name__:
-                    objl.append(obj.__str__())
-                elif len(argl) == 0:
-                    objl.append(obj.__str__())
-            print(objl)
+        cls = None
+        if len(argl) > 0 and "=" not in argl[0]:
+            cls = argl.pop(0)
+            if cls not in HBNBCommand.__classes:
+                print("** class doesn't exist **")
+                return False
+        options = {"limit": None, "after": None}
+        for option in argl:
+            name, _, value = option.partition("=")
+            if name not in options or not value:
+                print("** invalid option **")
+                return False
+            options[name] = value
+        limit, after = options["limit"], options["after"]
+        if limit is not None:
+            if not limit.isdigit():
+                print("** invalid option **")
+                return False
+            limit = int(limit)
+        if after is not None and "." not in after:
+            if cls is None:
+                print("** invalid option **")
+                return False
+            after = "{}.{}".format(cls, after)
+        sep = "["
+        for obj in storage.iter(cls, after, limit):
+            sys.stdout.write(sep + repr(obj.__str__()))
+            sep = ", "
+        print("[]" if sep == "[" else "]")
 
     def do_count(self, arg):
         """Usage: count <class> or <class>.count()
         Retrieve the number of instances of a given class."""
         argl = parse(arg)
-        count = 0
-        for obj in storage.all().values():
-            if argl[0] == obj.__class__.__name__:
-                count += 1
-        print(count)
+        print(storage.count(argl[0]))
+
+    def do_search(self, arg):
+        """Usage: search <class> <words> or <class>.search(<words>)
+        Display string representations of the instances of a given class
+        whose text best matches the given words, best match first."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+        elif argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+        elif len(argl) == 1:
+            print("** search words missing **")
+        else:
+            try:
+                objs = storage.search(argl[0], " ".join(argl[1:]))
+            except KeyError:
+                print("** class can't be searched **")
+                return False
+            print([obj.__str__() for obj in objs])
 
     def do_update(self, arg):
         """Usage: update <class> <id> <attribute_name> <attribute_value> or
@@ -163,7 +216,6 @@ class HBNBCommand(cmd.Cmd):
         Update a class instance of a given id by adding or updating
         a given attribute key/value pair or dictionary."""
         argl = parse(arg)
-        objdict = storage.all()
 
         if len(argl) == 0:
             print("** class name missing **")
@@ -174,7 +226,8 @@ class HBNBCommand(cmd.Cmd):
         if len(argl) == 1:
             print("** instance id missing **")
             return False
-        if "{}.{}".format(argl[0], argl[1]) not in objdict.keys():
+        obj = storage.get(argl[0], argl[1])
+        if obj is None:
             print("** no instance found **")
             return False
         if len(argl) == 2:
@@ -186,16 +239,16 @@ class HBNBCommand(cmd.Cmd):
             except NameError:
                 print("** value missing **")
                 return False
+        if self.read_only():
+            return False
 
         if len(argl) == 4:
-            obj = objdict["{}.{}".format(argl[0], argl[1])]
             if argl[2] in obj.__class__.__dict__.keys():
                 valtype = type(obj.__class__.__dict__[argl[2]])
                 obj.__dict__[argl[2]] = valtype(argl[3])
             else:
                 obj.__dict__[argl[2]] = argl[3]
         elif type(eval(argl[2])) == dict:
-            obj = objdict["{}.{}".format(argl[0], argl[1])]
             for k, v in eval(argl[2]).items():
                 if (k in obj.__class__.__dict__.keys() and
                         type(obj.__class__.__dict__[k]) in {str, int, float}):
@@ -203,6 +256,7 @@ class HBNBCommand(cmd.Cmd):
                     obj.__dict__[k] = valtype(v)
                 else:
                     obj.__dict__[k] = v
+        storage.new(obj)
         storage.save()
 
 
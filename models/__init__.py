@@ -1,6 +1,25 @@
 #!/usr/bin/python3
 """__init__ magic method for models directory"""
-from models.engine.file_storage import FileStorage
+from os import getenv
 
-storage = FileStorage()
+if getenv("HBNB_TYPE_STORAGE") == "sqlite":
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage(database=getenv("HBNB_SQLITE_DB", "storage.db"))
+else:
+    from models.engine.file_storage import FileStorage
+    storage = FileStorage(journal=getenv("HBNB_STORAGE_JOURNAL") == "1",
+                          lazy=getenv("HBNB_STORAGE_LAZY") == "1",
+                          sharded=getenv("HBNB_STORAGE_SHARDED") == "1",
+                          codec=getenv("HBNB_STORAGE_CODEC", "json"),
+                          read_only=getenv("HBNB_STORAGE_READ_ONLY") == "1",
+                          durable=getenv("HBNB_STORAGE_FSYNC", "1") == "1",
+                          group_commit=float(getenv(
+                              "HBNB_STORAGE_GROUP_COMMIT_MS", "0")) / 1000,
+                          thread_safe=getenv(
+                              "HBNB_STORAGE_THREAD_SAFE") == "1",
+                          shared=getenv("HBNB_STORAGE_SHARED") == "1",
+                          flush_interval=float(getenv(
+                              "HBNB_STORAGE_FLUSH_MS", "0")) / 1000,
+                          flush_after=int(getenv(
+                              "HBNB_STORAGE_FLUSH_AFTER", "0")))
 storage.reload()
@@ -1,22 +1,61 @@
 #!/usr/bin/python3
 
 """Defines the BaseModel class."""
+import os
+import sys
 import models
 from uuid import uuid4
 from datetime import datetime
 
 
+def uuid4_strings(count):
+    """Return count random UUID strings, like str(uuid4()) returns.
+
+    The random bytes of every UUID are read at once and formatted without
+    building UUID objects.
+
+    Args:
+        count (int): The number of UUIDs.
+    """
+    data = bytearray(os.urandom(16 * count))
+    data[6::16] = bytes(b & 0x0f | 0x40 for b in data[6::16])
+    data[8::16] = bytes(b & 0x3f | 0x80 for b in data[8::16])
+    hexed = data.hex()
+    return [f"{hexed[i:i + 8]}-{hexed[i + 8:i + 12]}-{hexed[i + 12:i + 16]}-"
+            f"{hexed[i + 16:i + 20]}-{hexed[i + 20:i + 32]}"
+            for i in range(0, 32 * count, 32)]
+
+
 class BaseModel:
-    """Represents the BaseModel of the HBnB project."""
+    """Represents the BaseModel of the HBnB project.
+
+    Attributes:
+        _stored (bool): Whether the instance is stored by the storage
+            engine, which sets it; kept out of __dict__, so that it is
+            neither saved nor printed.
+    """
+
+    __slots__ = ("__dict__", "__weakref__", "_stored")
+
+    def __new__(cls, *args, **kwargs):
+        """Create an instance, not stored yet.
+
+        Args:
+            *args (any): Unused.
+            **kwargs (dict): Unused.
+        """
+        obj = super().__new__(cls)
+        object.__setattr__(obj, "_stored", False)
+        return obj
 
     def __init__(self, *args, **kwargs):
         """Initialize a new BaseModel.
 
         Args:
             *args (any): Unused.
-            **kwargs (dict): Key/value pairs of attributes.
+            **kwargs (dict): Key/value pairs of attributes; their names
+                are interned, so the instances share one string per name.
         """
-        time_format = "%Y-%m-%dT%H:%M:%S.%f"
         self.id = str(uuid4())
         self.created_at = datetime.today()
         self.updated_at = datetime.today()
@@ -25,12 +64,73 @@ class BaseModel:
                 if k == '__class__':
                     continue
                 if k == "created_at" or k == "updated_at":
-                    self.__dict__[k] = datetime.strptime(v, time_format)
+                    self.__dict__[k] = datetime.fromisoformat(v)
                 else:
-                    self.__dict__[k] = v
+                    self.__dict__[sys.intern(k)] = v
         else:
             models.storage.new(self)
 
+    def __setattr__(self, name, value):
+        """Set an attribute and, if the instance is stored, mark it as
+        modified."""
+        if not self._stored:
+            super().__setattr__(name, value)
+        elif name in self.__dict__:
+            previous = self.__dict__[name]
+            super().__setattr__(name, value)
+            models.storage.touch(self, name, previous)
+        else:
+            super().__setattr__(name, value)
+            models.storage.touch(self, name)
+
+    @classmethod
+    def create_many(cls, records=(), **columns):
+        """Create, store and save many instances at once.
+
+        The instances share one creation time and are stored in one
+        operation, then saved once, without the per instance work of
+        __init__ and save().
+
+        Args:
+            records (iterable): A dictionary of the attributes of every
+                instance; like the keyword arguments of __init__, it may
+                come from to_dict(), with __class__ left out and dates
+                given as ISO strings.
+            **columns (list): The values of one attribute for every
+                instance, instead of records.
+
+        Return:
+            The list of the new instances.
+
+        Raises:
+            ValueError: If the columns differ in length.
+        """
+        if columns:
+            if len({len(values) for values in columns.values()}) > 1:
+                raise ValueError("columns differ in length")
+            names = list(columns)
+            records = [dict(zip(names, values))
+                       for values in zip(*columns.values())]
+        else:
+            records = list(records)
+        now = datetime.today()
+        objs = []
+        for obj_id, attributes in zip(uuid4_strings(len(records)), records):
+            obj = cls.__new__(cls)
+            state = obj.__dict__
+            state["id"] = obj_id
+            state["created_at"] = now
+            state["updated_at"] = now
+            state.update(attributes)
+            state.pop("__class__", None)
+            for name in ("created_at", "updated_at"):
+                if type(state[name]) is str:
+                    state[name] = datetime.fromisoformat(state[name])
+            objs.append(obj)
+        models.storage.new_many(objs)
+        models.storage.save()
+        return objs
+
     def save(self):
         """Update updated_at with the current datetime."""
         self.updated_at = datetime.today()
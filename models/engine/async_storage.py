@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""Defines the AsyncStorage class."""
+import asyncio
+from datetime import datetime
+
+
+class AsyncStorage:
+    """Represent an asyncio facade of a storage engine.
+
+    Saves, reloads and iterations run on an executor, so the encoding and
+    the disk I/O do not stall the event loop. Saves requested while a save
+    is writing are gathered into the one write that follows it.
+
+    The storage engine must be in thread-safe mode, since the executor
+    reads the objects while the event loop changes them.
+
+    Attributes:
+        storage (FileStorage): The storage engine.
+        executor (concurrent.futures.Executor): The executor the storage
+            engine is called on, or None for the default executor of the
+            event loop.
+        batch (int): The number of objects aiter() gets from the storage
+            engine at once.
+    """
+
+    def __init__(self, storage, executor=None, batch=100):
+        """Initialize a new AsyncStorage.
+
+        Args:
+            storage (FileStorage): The storage engine.
+            executor (concurrent.futures.Executor): The executor to call
+                the storage engine on, or None for the default one.
+            batch (int): The number of objects aiter() gets at once.
+
+        Raises:
+            ValueError: If the storage engine is not thread-safe.
+        """
+        if not getattr(storage, "thread_safe", False):
+            raise ValueError("the storage engine must be thread-safe")
+        self.storage = storage
+        self.executor = executor
+        self.batch = batch
+        self.__writing = None
+        self.__waiting = None
+
+    async def __run(self, function, *args):
+        """Return the result of function called with args on the
+        executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def asave(self, obj=None):
+        """Save the changes to disk.
+
+        If a save is writing, the changes made since are saved once it is
+        done, by one write shared with every other call made meanwhile.
+
+        Args:
+            obj (BaseModel): An object to save like obj.save() does: its
+                updated_at is set, which marks it as changed if it is
+                stored.
+        """
+        if obj is not None:
+            obj.updated_at = datetime.today()
+        if self.__waiting is None:
+            self.__waiting = asyncio.ensure_future(
+                self.__save(self.__writing))
+        await asyncio.shield(self.__waiting)
+
+    async def __save(self, previous):
+        """Save once the save previous, if any, is done."""
+        if previous is not None:
+            await asyncio.wait([previous])
+        self.__writing = self.__waiting
+        self.__waiting = None
+        try:
+            await self.__run(self.storage.save)
+        finally:
+            if self.__writing is asyncio.current_task():
+                self.__writing = None
+
+    async def areload(self):
+        """Reload the objects from disk."""
+        await self.__run(self.storage.reload)
+
+    async def aiter(self, cls=None, after=None):
+        """Yield the objects of class cls, or every object, by key.
+
+        Args:
+            cls (type or str): The class of the objects or its name.
+            after (str): The key after which to start.
+        """
+        def fetch(after):
+            return list(self.storage.iter(cls, after, self.batch))
+
+        while True:
+            objs = await self.__run(fetch, after)
+            for obj in objs:
+                yield obj
+            if len(objs) < self.batch:
+                return
+            after = f"{objs[-1].__class__.__name__}.{objs[-1].id}"
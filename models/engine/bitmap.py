@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+"""Defines the bitmap index of the storage engines.
+
+Every object whose list holds a value gets a slot, a bit position, and
+every value of the list attribute indexed gets a bitmap, a Python int
+with the bits of the slots of the objects whose list holds that value.
+Objects holding several values are then found with a bitwise AND of their
+bitmaps.
+
+The index follows assignments of the attribute; a list changed in place
+must be assigned back, or its object passed to touch() or new().
+"""
+from models.engine.index import Index
+
+
+class BitmapIndex(Index):
+    """Represent a bitmap index of the objects of one class by the values
+    of a list attribute, such as the amenities of a place.
+
+    Attributes:
+        cls_name (str): The name of the class of the objects indexed.
+        attribute (str): The name of the list attribute.
+    """
+
+    def __init__(self, cls_name, attribute):
+        """Initialize a new BitmapIndex.
+
+        Args:
+            cls_name (str): The name of the class of the objects indexed.
+            attribute (str): The name of the list attribute.
+        """
+        self.cls_name = cls_name
+        self.attribute = attribute
+        self.attributes = frozenset([attribute])
+        self.clear()
+
+    def add(self, key, obj):
+        """Add the object obj stored under key."""
+        values = self.__read(obj)
+        if not values:
+            return
+        bit = 1 << self.__place(key, obj, values)
+        bitmaps = self.__bitmaps
+        for value in values:
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+        if self.__every is not None:
+            self.__every |= bit
+
+    def add_many(self, items):
+        """Add every (key, object) pair of items, none of them indexed
+        yet, building the bitmap of each value once rather than growing
+        it one bit at a time."""
+        slots = {}
+        for key, obj in items:
+            values = self.__read(obj)
+            if values:
+                slot = self.__place(key, obj, values)
+                for value in values:
+                    slots.setdefault(value, []).append(slot)
+        if not slots:
+            return
+        size = len(self.__slots) // 8 + 1
+        bitmaps = self.__bitmaps
+        for value, positions in slots.items():
+            bits = bytearray(size)
+            for slot in positions:
+                bits[slot >> 3] |= 1 << (slot & 7)
+            bitmaps[value] = (bitmaps.get(value, 0) |
+                              int.from_bytes(bits, "little"))
+        self.__every = None
+
+    def __read(self, obj):
+        """Return the set of the values of the list of obj, or None if
+        obj is not of the class indexed or has no such list."""
+        if obj.__class__.__name__ != self.cls_name:
+            return None
+        values = getattr(obj, self.attribute, None)
+        if not isinstance(values, (list, tuple, set)):
+            return None
+        return frozenset(v for v in values if isinstance(v, str))
+
+    def __place(self, key, obj, values):
+        """Give obj, stored under key and holding values, a slot and
+        return it."""
+        if self.__free:
+            slot = self.__free.pop()
+            self.__slots[slot] = (key, obj)
+        else:
+            slot = len(self.__slots)
+            self.__slots.append((key, obj))
+        self.__values[key] = (slot, values)
+        return slot
+
+    def discard(self, key):
+        """Remove the object stored under key, if it is in the index."""
+        if key not in self.__values:
+            return
+        slot, values = self.__values.pop(key)
+        mask = ~(1 << slot)
+        for value in values:
+            bitmap = self.__bitmaps[value] & mask
+            if bitmap:
+                self.__bitmaps[value] = bitmap
+            else:
+                del self.__bitmaps[value]
+        if self.__every is not None:
+            self.__every &= mask
+        self.__slots[slot] = None
+        self.__free.append(slot)
+
+    def clear(self):
+        """Remove every object from the index."""
+        self.__bitmaps = {}
+        self.__values = {}
+        self.__slots = []
+        self.__free = []
+        self.__every = 0
+
+    def bitmap(self, values=()):
+        """Return the bitmap of the objects holding every value of values.
+
+        Args:
+            values (iterable): The values, or none for every object
+                holding a value.
+        """
+        if self.__every is None:
+            every = 0
+            for bitmap in self.__bitmaps.values():
+                every |= bitmap
+            self.__every = every
+        bitmap = self.__every
+        for value in values:
+            bitmap &= self.__bitmaps.get(value, 0)
+            if not bitmap:
+                break
+        return bitmap
+
+    def objects(self, values=()):
+        """Return the objects holding every value of values.
+
+        Args:
+            values (iterable): The values, or none for every object
+                holding a value.
+
+        Return:
+            A dictionary of the objects by key.
+        """
+        objs = {}
+        slots = self.__slots
+        bitmap = self.bitmap(values)
+        while bitmap:
+            low = bitmap & -bitmap
+            key, obj = slots[low.bit_length() - 1]
+            objs[key] = obj
+            bitmap ^= low
+        return objs
+
+    def facets(self, values=()):
+        """Return, for every value, the number of objects holding it along
+        with every value of values.
+
+        Args:
+            values (iterable): The values already selected.
+
+        Return:
+            A dictionary of the counts by value, without the values no
+            such object holds.
+        """
+        base = self.bitmap(values)
+        counts = {}
+        for value, bitmap in self.__bitmaps.items():
+            count = (bitmap & base).bit_count()
+            if count:
+                counts[value] = count
+        return counts
@@ -0,0 +1,266 @@
+#!/usr/bin/python3
+"""Defines the serialization codecs of FileStorage.
+
+A codec turns the to_dict() of an object into bytes, called a fragment,
+and lays fragments out in a file. Fragments are encoded independently
+of each other, so FileStorage can keep the fragments of unchanged
+objects between saves.
+"""
+import json
+import struct
+from datetime import datetime, timedelta
+
+
+class JSONCodec:
+    """Represent the JSON codec.
+
+    Files hold a JSON object with one "<class name>.<id>": record pair
+    per line, so they can be read one record at a time.
+
+    Attributes:
+        name (str): The name of the codec.
+        extension (str): The extension of the files of the codec.
+    """
+
+    name = "json"
+    extension = ".json"
+
+    def encode(self, record):
+        """Return the fragment of the dictionary record."""
+        return json.dumps(record).encode()
+
+    def decode(self, fragment):
+        """Return the dictionary of the fragment."""
+        return json.loads(fragment)
+
+    def write(self, f, records):
+        """Write records to the binary file f.
+
+        Args:
+            f (file): The file to write to.
+            records (list): The (key, fragment) pairs to write.
+
+        Return:
+            The (offset, length) of every fragment in the file.
+        """
+        positions = []
+        offset = 2
+        f.write(b"{\n")
+        for i, (key, fragment) in enumerate(records):
+            line = json.dumps(key).encode() + b": "
+            positions.append((offset + len(line), len(fragment)))
+            line += fragment + (b",\n" if i < len(records) - 1 else b"\n")
+            f.write(line)
+            offset += len(line)
+        f.write(b"}\n")
+        return positions
+
+    def read(self, f):
+        """Yield the key, offset and fragment of every record of f.
+
+        Files in another JSON layout than the one of write() are decoded
+        as a whole, and their records come without an offset.
+
+        Args:
+            f (file): The file to read, opened in binary mode.
+        """
+        if f.readline() != b"{\n" or f.peek(1)[:1] not in (b'"', b"}"):
+            f.seek(0)
+            for key, record in json.load(f).items():
+                yield key, None, self.encode(record)
+            return
+        decoder = json.JSONDecoder()
+        offset = f.tell()
+        for line in f:
+            if line == b"}\n":
+                return
+            text = line.decode()
+            key, end = decoder.raw_decode(text)
+            end += 2
+            fragment = line[end:].rstrip(b",\n")
+            yield key, offset + end, fragment
+            offset += len(line)
+
+
+class BinaryCodec:
+    """Represent a compact binary codec.
+
+    A file starts with a magic number, followed by one frame per record
+    and by a table of the class names and attribute names the records
+    refer to by index; it ends with the offset of that table. A frame is
+    the length of the key, the key, the length of the fragment and the
+    fragment. A fragment is the number of attributes followed by, for
+    each one, the index of its name, a type tag and the packed value.
+
+    Attributes:
+        name (str): The name of the codec.
+        extension (str): The extension of the files of the codec.
+        strings (list): The string table shared by the fragments.
+    """
+
+    name = "binary"
+    extension = ".bin"
+    magic = b"HBNB\x01"
+    dates = ("created_at", "updated_at")
+    epoch = datetime(1970, 1, 1)
+
+    def __init__(self):
+        """Initialize a new BinaryCodec."""
+        self.strings = []
+        self.__indexes = {}
+
+    def encode(self, record):
+        """Return the fragment of the dictionary record."""
+        parts = [struct.pack(">H", len(record))]
+        for k, v in record.items():
+            parts.append(struct.pack(">I", self.__index(k)))
+            micros = self.__micros(v) if k in self.dates else None
+            if k == "__class__":
+                parts.append(b"c" + struct.pack(">I", self.__index(v)))
+            elif micros is not None:
+                parts.append(b"D" + struct.pack(">q", micros))
+            elif type(v) is str:
+                data = v.encode()
+                parts.append(b"s" + struct.pack(">I", len(data)) + data)
+            elif type(v) is bool:
+                parts.append(b"T" if v else b"F")
+            elif v is None:
+                parts.append(b"N")
+            elif type(v) is int and -2 ** 63 <= v < 2 ** 63:
+                parts.append(b"i" + struct.pack(">q", v))
+            elif type(v) is float:
+                parts.append(b"f" + struct.pack(">d", v))
+            else:
+                data = json.dumps(v).encode()
+                parts.append(b"j" + struct.pack(">I", len(data)) + data)
+        return b"".join(parts)
+
+    def decode(self, fragment, strings=None):
+        """Return the dictionary of the fragment.
+
+        Args:
+            fragment (bytes): The fragment to decode.
+            strings (list): The string table the fragment refers to,
+                by default the one of the codec.
+        """
+        strings = self.strings if strings is None else strings
+        record = {}
+        count, = struct.unpack_from(">H", fragment)
+        pos = 2
+        for i in range(count):
+            index, = struct.unpack_from(">I", fragment, pos)
+            tag = fragment[pos + 4:pos + 5]
+            pos += 5
+            if tag == b"c":
+                value = strings[struct.unpack_from(">I", fragment, pos)[0]]
+                pos += 4
+            elif tag == b"D":
+                micro, = struct.unpack_from(">q", fragment, pos)
+                value = (self.epoch + timedelta(microseconds=micro)
+                         ).isoformat()
+                pos += 8
+            elif tag in (b"s", b"j"):
+                size, = struct.unpack_from(">I", fragment, pos)
+                value = fragment[pos + 4:pos + 4 + size].decode()
+                if tag == b"j":
+                    value = json.loads(value)
+                pos += 4 + size
+            elif tag in (b"i", b"f"):
+                value, = struct.unpack_from(
+                    ">q" if tag == b"i" else ">d", fragment, pos)
+                pos += 8
+            else:
+                value = {b"T": True, b"F": False, b"N": None}[tag]
+            record[strings[index]] = value
+        return record
+
+    def write(self, f, records):
+        """Write records to the binary file f.
+
+        Args:
+            f (file): The file to write to.
+            records (list): The (key, fragment) pairs to write.
+
+        Return:
+            The (offset, length) of every fragment in the file.
+        """
+        positions = []
+        offset = len(self.magic)
+        f.write(self.magic)
+        for key, fragment in records:
+            data = key.encode()
+            head = struct.pack(">H", len(data)) + data + struct.pack(
+                ">I", len(fragment))
+            positions.append((offset + len(head), len(fragment)))
+            f.write(head + fragment)
+            offset += len(head) + len(fragment)
+        f.write(struct.pack(">I", len(self.strings)))
+        for string in self.strings:
+            data = string.encode()
+            f.write(struct.pack(">H", len(data)) + data)
+        f.write(struct.pack(">Q", offset))
+        return positions
+
+    def read(self, f):
+        """Yield the key, offset and fragment of every record of f.
+
+        The string table of the file is merged into the one of the codec.
+        If the two tables disagree, the fragments are encoded again with
+        the table of the codec and come without an offset.
+
+        Args:
+            f (file): The file to read, opened in binary mode.
+        """
+        if f.read(len(self.magic)) != self.magic:
+            raise ValueError("not a binary storage file")
+        f.seek(-8, 2)
+        end, = struct.unpack(">Q", f.read(8))
+        f.seek(end)
+        strings = []
+        count, = struct.unpack(">I", f.read(4))
+        for i in range(count):
+            size, = struct.unpack(">H", f.read(2))
+            strings.append(f.read(size).decode())
+        shared = strings[:len(self.strings)] == self.strings[:len(strings)]
+        if shared and len(strings) > len(self.strings):
+            for string in strings[len(self.strings):]:
+                self.__index(string)
+
+        offset = len(self.magic)
+        f.seek(offset)
+        while offset < end:
+            size, = struct.unpack(">H", f.read(2))
+            key = f.read(size).decode()
+            length, = struct.unpack(">I", f.read(4))
+            offset += 6 + size
+            fragment = f.read(length)
+            if shared:
+                yield key, offset, fragment
+            else:
+                yield key, None, self.encode(self.decode(fragment, strings))
+            offset += length
+
+    def __micros(self, value):
+        """Return the microseconds since the epoch of the naive datetime
+        value is the isoformat() of, or None."""
+        try:
+            dt = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+        if dt.tzinfo is not None:
+            return None
+        return (dt - self.epoch) // timedelta(microseconds=1)
+
+    def __index(self, string):
+        """Return the index of string in the table, adding it if needed."""
+        index = self.__indexes.get(string)
+        if index is None:
+            index = self.__indexes[string] = len(self.strings)
+            self.strings.append(string)
+        return index
+
+
+codecs = {
+    JSONCodec.name: JSONCodec,
+    BinaryCodec.name: BinaryCodec
+}
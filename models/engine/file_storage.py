@@ -1,7 +1,17 @@
 #!/usr/bin/python3
 """Defines the FileStorage class."""
 
+import atexit
 import json
+import mmap
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from types import MappingProxyType
 from models.base_model import BaseModel
 from models.user import User
 from models.state import State
@@ -9,7 +19,51 @@ from models.city import City
 from models.place import Place
 from models.amenity import Amenity
 from models.review import Review
+from models.engine.bitmap import BitmapIndex
+from models.engine.codecs import codecs
+from models.engine.fulltext import FullTextIndex
+from models.engine.geo import GeoIndex
+from models.engine.index import (ClassIndex, ForeignKeyIndex, RangeIndex,
+                                 hashable)
+from models.engine.journal import Journal
+from models.engine.locks import FileLock, RWLock
+from models.engine.query import Query
 
+classes = {
+    'BaseModel': BaseModel,
+    'User': User,
+    'State': State,
+    'City': City,
+    'Amenity': Amenity,
+    'Place': Place,
+    'Review': Review
+}
+
+foreign_keys = [
+    ('City', 'state_id'),
+    ('Place', 'city_id'),
+    ('Place', 'user_id'),
+    ('Review', 'place_id'),
+    ('Review', 'user_id')
+]
+
+geo_keys = [
+    ('Place', 'latitude', 'longitude')
+]
+
+text_keys = [
+    ('Place', 'description'),
+    ('Review', 'text')
+]
+
+bitmap_keys = [
+    ('Place', 'amenity_ids')
+]
+
+interned = {
+    cls_name: [a for c, a in foreign_keys + bitmap_keys if c == cls_name]
+    for cls_name, attribute in foreign_keys + bitmap_keys
+}
 
 class FileStorage:
     """Represent an abstracted storage engine.
@@ -17,49 +71,1622 @@ class FileStorage:
     Attributes:
         __file_path (str): The name of the file to save objects to.
         __objects (dict): A dictionary of instantiated objects.
+        __changes (dict): The objects created, modified or deleted since
+            the last save, by key; deleted objects map to None.
+        __fragments (dict): The (object, fragment) pairs written by the
+            last save, by key, reused for objects that did not change.
+        __codec (object): The codec the fragments were encoded with.
+        __codecs (dict): The codec instances in use, by name.
+        __unloaded (dict): In lazy mode, the (path, offset, length) in the
+            files of every record not yet turned into an object, by key.
+        __sources (dict): The (memory map, codec) pairs the unloaded
+            records are read from, by path; the files stay mapped so the
+            records stay readable if the files are replaced.
+        __commit (threading.Condition): Guards the group commit state.
+        __batch (int): The number of the group of saves being gathered.
+        __committed (int): The number of the last group of saves written.
+        __leading (bool): Whether a save is writing for its group.
+        __failure (tuple): The number of the last group of saves that
+            failed and the exception it failed with.
+        __by_class (ClassIndex): The index of the objects by class.
+        __foreign (dict): The ForeignKeyIndex of every attribute listed
+            in foreign_keys, by (class name, attribute) pair.
+        __ranges (dict): The RangeIndex of every attribute passed to
+            index_range(), by (class name, attribute) pair.
+        __texts (dict): The FullTextIndex of every attribute listed in
+            text_keys, by class name.
+        __texts_loaded (bool): Whether the text indexes were loaded by a
+            search and are in __indexes.
+        __journaled (set): The keys of the changes the log holds and the
+            files do not, which the saved text indexes miss.
+        __indexes (list): The indexes kept up to date with __objects.
+        __indexed (tuple): The __objects dictionary the indexes were
+            built from and its size then, to rebuild them if __objects
+            is replaced or changed without the storage engine.
+        __unloaded_order (tuple): The __unloaded dictionary and the sorted
+            list of its keys, which may still hold keys loaded since.
+        __counted (tuple): The __unloaded dictionary and the number of
+            its records of every class, by class name.
+        __rwlock (RWLock): Guards the objects and the indexes in
+            thread-safe mode.
+        __saving (threading.Lock): Lets one save write the files at once.
+        __seen (dict): In shared mode, a digest of every record of the
+            files as last read or written by this process, by key.
+        __stamp (tuple): In shared mode, the generation of the lock file
+            and the [size, mtime_ns] of the files as last read or written
+            by this process.
+        __undo (dict): Within a transaction, the object stored under every
+            key changed since it began, with a copy of its attributes then
+            and the position of its record if it was not loaded, by key;
+            None outside transactions.
+        __undo_changes (dict): The __changes dictionary when the
+            transaction began.
+        __deferred (bool): Whether save() was called within the
+            transaction.
     """
     __file_path = "storage.json"
     __objects = {}
+    __changes = {}
+    __fragments = {}
+    __codec = None
+    __codecs = {}
+    __unloaded = {}
+    __sources = {}
+    __commit = threading.Condition()
+    __batch = 1
+    __committed = 0
+    __leading = False
+    __failure = (0, None)
+    __by_class = ClassIndex()
+    __foreign = {fk: ForeignKeyIndex(*fk) for fk in foreign_keys}
+    __ranges = {}
+    __geo = {gk[0]: GeoIndex(*gk) for gk in geo_keys}
+    __texts = {tk[0]: FullTextIndex(*tk) for tk in text_keys}
+    __bitmaps = {bk: BitmapIndex(*bk) for bk in bitmap_keys}
+    __texts_loaded = False
+    __journaled = set()
+    __indexes = [__by_class, *__foreign.values(), *__ranges.values(),
+                 *__geo.values(), *__bitmaps.values()]
+    __indexed = (None, 0)
+    __unloaded_order = (None, [])
+    __counted = (None, {})
+    __rwlock = RWLock()
+    __saving = threading.Lock()
+    __seen = {}
+    __stamp = None
+    __undo = None
+    __undo_changes = {}
+    __deferred = False
+
+    def __init__(self, *, journal=False, compact_threshold=4 << 20,
+                 lazy=False, sharded=False, codec="json", read_only=False,
+                 durable=True, group_commit=0, thread_safe=False,
+                 shared=False, flush_interval=0, flush_after=0):
+        """Initialize a new FileStorage.
+
+        Args:
+            journal (bool): Append each change to a log next to the JSON
+                file instead of rewriting the whole file on every save.
+            compact_threshold (int): The log size in bytes past which save
+                folds the log back into a fresh JSON file.
+            lazy (bool): Make reload only index the records of the JSON
+                file; objects are built the first time they are accessed.
+            sharded (bool): Save the objects of each class to their own
+                JSON file, storage.<class name>.json, and rewrite only the
+                files of the classes that changed.
+            codec (str): The name of the codec of the files, "json" or
+                "binary"; the extension of the files follows the codec.
+            read_only (bool): Load lazily and refuse to save. The position
+                of every record is kept in a <file>.idx index next to each
+                file, so reload does not scan the files again until they
+                change.
+            durable (bool): Flush every save to disk with fsync before it
+                returns.
+            group_commit (float): The number of seconds a save waits for
+                other threads to save too, so they all share one write;
+                this turns thread-safe mode on, since the threads change
+                the objects while the write encodes them.
+            thread_safe (bool): Guard the objects with a reader-writer
+                lock, so threads can share the storage engine. Lookups
+                then return copies instead of views of the objects, and
+                saves only hold the lock while they gather the changes.
+            shared (bool): Let several processes use the same files. They
+                take turns with an advisory lock on <file>.lock, and each
+                save first merges the objects saved by the others since,
+                so a process only overwrites the objects it changed.
+            flush_interval (float): Make save() return at once and have
+                a background thread write the changes at most that many
+                seconds later; this turns thread-safe mode on.
+            flush_after (int): Have the background thread write as soon
+                as that many objects changed, if it comes first; this
+                turns thread-safe mode on too.
+
+        Raises:
+            ValueError: If shared is combined with journal.
+        """
+        if shared and journal:
+            raise ValueError("shared mode cannot be combined with journal")
+        self.journal = journal
+        self.compact_threshold = compact_threshold
+        self.lazy = lazy or read_only
+        self.read_only = read_only
+        self.sharded = sharded
+        self.durable = durable
+        self.group_commit = group_commit
+        self.flush_interval = flush_interval
+        self.flush_after = flush_after
+        self.write_behind = bool(flush_interval or flush_after)
+        self.thread_safe = (thread_safe or self.write_behind or
+                            bool(group_commit))
+        self.shared = shared
+        self.__pending = threading.Condition()
+        self.__flushing = threading.Lock()
+        self.__flusher = None
+        self.__dirty_since = None
+        self.__metrics = {"flushes": 0, "failures": 0, "last_duration": 0.0,
+                          "max_duration": 0.0, "total_duration": 0.0}
+        if self.write_behind:
+            atexit.register(self.flush)
+        if codec not in FileStorage.__codecs:
+            FileStorage.__codecs[codec] = codecs[codec]()
+        self.codec = FileStorage.__codecs[codec]
+
+    def all(self, cls=None):
+        """Return the dictionary __objects, or the objects of one class.
+
+        Args:
+            cls (type or str): The class of the objects or its name.
+
+        Return:
+            __objects if cls is None, else a read-only view of the
+            objects of cls by key, taken from the class index. In
+            thread-safe mode, a copy of either.
+        """
+        with self.__access():
+            if cls is None:
+                for key in list(FileStorage.__unloaded):
+                    self.__load(key)
+                if self.thread_safe:
+                    return dict(FileStorage.__objects)
+                return FileStorage.__objects
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            self.__load_class(cls_name)
+            return self.__view(FileStorage.__by_class.objects(cls_name))
+
+    def lookup(self, cls, attribute, value):
+        """Return the objects of class cls whose attribute is value.
+
+        Args:
+            cls (type or str): The class of the objects or its name.
+            attribute (str): An attribute listed in foreign_keys.
+            value (str): The id the objects refer to.
+
+        Return:
+            A read-only view of the objects by key.
+
+        Raises:
+            KeyError: If cls.attribute is not listed in foreign_keys.
+        """
+        with self.__access():
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            index = FileStorage.__foreign.get((cls_name, attribute))
+            if index is None:
+                raise KeyError(f"{cls_name}.{attribute} is not indexed")
+            self.__load_class(cls_name)
+            return self.__view(index.objects(value))
+
+    def lookup_range(self, cls, attribute, low=None, high=None,
+                     include_low=True, include_high=True):
+        """Return the objects of class cls whose numeric attribute lies
+        between low and high.
+
+        Args:
+            cls (type or str): The class of the objects or its name.
+            attribute (str): An attribute with a range index.
+            low (int or float): The lower bound, or None for no bound.
+            high (int or float): The upper bound, or None for no bound.
+            include_low (bool): Whether low itself matches.
+            include_high (bool): Whether high itself matches.
+
+        Return:
+            A read-only view of the objects by key, in attribute order,
+            whose length is counted without going through them. In
+            thread-safe mode, a copy of it.
+
+        Raises:
+            KeyError: If cls.attribute has no range index.
+        """
+        with self.__access():
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            index = FileStorage.__ranges.get((cls_name, attribute))
+            if index is None:
+                raise KeyError(f"{cls_name}.{attribute} is not indexed")
+            self.__load_class(cls_name)
+            objs = index.range(low, high, include_low, include_high)
+            return dict(objs.items()) if self.thread_safe else objs
+
+    def lookup_every(self, cls, attribute, values):
+        """Return the objects of class cls whose list attribute holds
+        every value of values.
+
+        Args:
+            cls (type or str): The class of the objects or its name.
+            attribute (str): An attribute listed in bitmap_keys.
+            values (iterable): The values, such as Amenity ids; none
+                for every object of cls.
+
+        Return:
+            A dictionary of the objects by key.
+        """
+        values = list(values)
+        with self.__access():
+            index = self.__bitmap_index(cls, attribute)
+            if not values:
+                return dict(FileStorage.__by_class.objects(index.cls_name))
+            return index.objects(values)
+
+    def facet_counts(self, cls, attribute, values=()):
+        """Return, for every value of the list attribute of the objects
+        of class cls, the number of objects holding it along with every
+        value of values, such as the counts shown next to the amenity
+        filters once some are selected.
+
+        Args:
+            cls (type or str): The class of the objects or its name.
+            attribute (str): An attribute listed in bitmap_keys.
+            values (iterable): The values already selected.
+
+        Return:
+            A dictionary of the counts by value.
+        """
+        with self.__access():
+            return self.__bitmap_index(cls, attribute).facets(values)
+
+    def __bitmap_index(self, cls, attribute):
+        """Return the up to date BitmapIndex of cls.attribute.
+
+        Raises:
+            KeyError: If cls.attribute is not listed in bitmap_keys.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        index = FileStorage.__bitmaps.get((cls_name, attribute))
+        if index is None:
+            raise KeyError(f"{cls_name}.{attribute} is not indexed")
+        self.__load_class(cls_name)
+        return index
+
+    def lookup_box(self, cls, south, west, north, east):
+        """Return the objects of class cls inside a bounding box.
+
+        Args:
+            cls (type or str): A class listed in geo_keys or its name.
+            south (float): The lowest latitude.
+            west (float): The westmost longitude; a box whose west edge
+                is east of its east edge crosses the antimeridian.
+            north (float): The highest latitude.
+            east (float): The eastmost longitude.
+
+        Return:
+            A dictionary of the objects by key.
+        """
+        with self.__access():
+            return self.__geo_index(cls).box(south, west, north, east)
+
+    def lookup_radius(self, cls, lat, lon, km):
+        """Return the objects of class cls within km kilometers of the
+        point (lat, lon), nearest first, in a dictionary by key."""
+        with self.__access():
+            return self.__geo_index(cls).radius(lat, lon, km)
+
+    def lookup_nearest(self, cls, lat, lon, k):
+        """Return the k objects of class cls nearest to the point
+        (lat, lon), nearest first, in a dictionary by key."""
+        with self.__access():
+            return self.__geo_index(cls).nearest(lat, lon, k)
+
+    def __geo_index(self, cls):
+        """Return the up to date GeoIndex of class cls.
+
+        Raises:
+            KeyError: If cls is not listed in geo_keys.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        index = FileStorage.__geo.get(cls_name)
+        if index is None:
+            raise KeyError(f"{cls_name} has no geospatial index")
+        self.__load_class(cls_name)
+        return index
+
+    def search(self, cls, text, limit=None):
+        """Return the objects of class cls whose text matches the words
+        of text, best match first.
+
+        The first search loads the text indexes: they are restored from
+        the files saved next to the storage files if these did not change
+        since, or else built from the objects. Records not loaded yet are
+        then only loaded if they are returned.
+
+        Args:
+            cls (type or str): A class listed in text_keys or its name.
+            text (str): The words to search for.
+            limit (int): The maximum number of objects, or None for all.
+
+        Raises:
+            KeyError: If cls is not listed in text_keys.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        index = FileStorage.__texts.get(cls_name)
+        if index is None:
+            raise KeyError(f"{cls_name} has no text index")
+        if not FileStorage.__texts_loaded:
+            with self.__writing():
+                self.__sync()
+                self.__load_texts()
+        with self.__access():
+            objs = []
+            for key in index.search(text, limit):
+                if key in FileStorage.__unloaded:
+                    objs.append(self.__load(key))
+                elif key in FileStorage.__objects:
+                    objs.append(FileStorage.__objects[key])
+            return objs
+
+    def index_range(self, cls, attribute):
+        """Keep a range index on the numeric attribute of class cls, for
+        lookup_range() and queries; no attribute has one until it is
+        passed here, since every object stored then costs a sorted
+        insertion.
+
+        Args:
+            cls (type or str): The class of the objects or its name.
+            attribute (str): The name of the attribute.
+        """
+        with self.__writing():
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            if (cls_name, attribute) in FileStorage.__ranges:
+                return
+            self.__sync()
+            index = RangeIndex(cls_name, attribute)
+            index.add_many(FileStorage.__objects.items())
+            FileStorage.__ranges[(cls_name, attribute)] = index
+            FileStorage.__indexes.append(index)
+
+    def drop_range(self, cls, attribute):
+        """Stop keeping the range index index_range() made on the
+        attribute of class cls, if there is one.
+
+        Args:
+            cls (type or str): The class of the objects or its name.
+            attribute (str): The name of the attribute.
+        """
+        with self.__writing():
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            index = FileStorage.__ranges.pop((cls_name, attribute), None)
+            if index is not None:
+                FileStorage.__indexes.remove(index)
 
-    def all(self):
-        """Return the dictionary __objects."""
-        return FileStorage.__objects
+    def query(self, cls):
+        """Return a Query over the objects of class cls.
+
+        Args:
+            cls (type or str): The class of the objects or its name.
+        """
+        return Query(self, cls)
+
+    def _candidates(self, cls_name, attribute, op, value):
+        """Return how an index narrows the condition <attribute>__<op>=value
+        on the objects of class cls_name down, or None.
+
+        Used by Query to pick the smallest set of objects to filter. The
+        objects an index finds are counted without being gathered; only
+        the function returned gathers them, for the set picked.
+
+        Return:
+            A description of the index used, the number of objects it
+            finds, and a function returning them by key.
+        """
+        with self.__access():
+            key = (cls_name, attribute)
+            if key in FileStorage.__foreign and op in ("eq", "in"):
+                values = [value] if op == "eq" else list(value)
+                if all(hashable(v) for v in values):
+                    self.__load_class(cls_name)
+                    index = FileStorage.__foreign[key]
+                    values = list(dict.fromkeys(values))
+                    size = sum(len(index.objects(v)) for v in values)
+                    return (f"lookup {cls_name}.{attribute}", size,
+                            lambda: self.__lookup_any(cls_name, attribute,
+                                                      values))
+            if key in FileStorage.__bitmaps and op == "contains":
+                values = list(value)
+                if values:
+                    index = self.__bitmap_index(cls_name, attribute)
+                    return (f"bitmap {cls_name}.{attribute}",
+                            index.bitmap(values).bit_count(),
+                            lambda: self.lookup_every(cls_name, attribute,
+                                                      values))
+            if key in FileStorage.__ranges:
+                bounds = {
+                    "eq": lambda v: (v, v, True, True),
+                    "lt": lambda v: (None, v, True, False),
+                    "lte": lambda v: (None, v, True, True),
+                    "gt": lambda v: (v, None, False, True),
+                    "gte": lambda v: (v, None, True, True),
+                    "between": lambda v: (v[0], v[1], True, True)
+                }.get(op)
+                values = value if op == "between" else [value]
+                if bounds is not None and all(
+                        type(v) in (int, float) for v in values):
+                    self.__load_class(cls_name)
+                    bounds = bounds(value)
+                    return (f"range {cls_name}.{attribute}",
+                            FileStorage.__ranges[key].count(*bounds),
+                            lambda: self.lookup_range(cls_name, attribute,
+                                                      *bounds))
+            return None
+
+    def __lookup_any(self, cls_name, attribute, values):
+        """Return the objects of class cls_name whose attribute listed in
+        foreign_keys is one of values."""
+        if len(values) == 1:
+            return self.lookup(cls_name, attribute, values[0])
+        objs = {}
+        for value in values:
+            objs.update(self.lookup(cls_name, attribute, value))
+        return objs
+
+    def iter(self, cls=None, after=None, limit=None):
+        """Yield the objects stored, or the objects of one class, in the
+        order of their keys.
+
+        The position in the iteration is given by a key, so pages stay
+        consistent while objects are created and deleted: the next page
+        starts after the key of the last object of the previous one.
+        Records not loaded yet are loaded as they are yielded.
+
+        Args:
+            cls (type or str): The class of the objects or its name, or
+                None for every object.
+            after (str): A cursor, the key "<class name>.<id>" of the last
+                object of the previous page.
+            limit (int): The maximum number of objects, or None for all.
+        """
+        if cls is None:
+            names = sorted(classes)
+        else:
+            names = [cls if isinstance(cls, str) else cls.__name__]
+        start = None if after is None else after.partition(".")[0]
+        count = 0
+        for name in names:
+            if start is not None and name < start:
+                continue
+            cursor = after if name == start else None
+            while limit is None or count < limit:
+                with self.__access():
+                    key = self.__next_key(name, cursor)
+                    if key is None:
+                        break
+                    if key in FileStorage.__unloaded:
+                        obj = self.__load(key)
+                    else:
+                        obj = FileStorage.__objects[key]
+                cursor = key
+                yield obj
+                count += 1
+
+    def __next_key(self, cls_name, after):
+        """Return the first key of class cls_name after the key after, or
+        None, among the objects and the records not loaded yet."""
+        self.__sync()
+        key = FileStorage.__by_class.next_key(cls_name, after)
+        unloaded = FileStorage.__unloaded
+        if not unloaded:
+            return key
+        if FileStorage.__unloaded_order[0] is not unloaded:
+            FileStorage.__unloaded_order = (unloaded, sorted(unloaded))
+        keys = FileStorage.__unloaded_order[1]
+        prefix = cls_name + "."
+        i = bisect_right(keys, after) if after is not None else bisect_left(
+            keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            if keys[i] in unloaded:
+                return keys[i] if key is None or keys[i] < key else key
+            i += 1
+        return key
+
+    def count(self, cls=None):
+        """Return the number of objects stored, or of objects of one class.
+
+        Records not loaded yet are counted without being loaded.
+
+        Args:
+            cls (type or str): The class of the objects or its name.
+        """
+        with self.__reading():
+            if cls is None:
+                return len(FileStorage.__objects) + len(FileStorage.__unloaded)
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            self.__sync()
+            count = len(FileStorage.__by_class.objects(cls_name))
+            if FileStorage.__unloaded:
+                count += self.__unloaded_counts().get(cls_name, 0)
+            return count
+
+    def get(self, cls, obj_id):
+        """Return the object of class cls with id obj_id, or None.
+
+        Args:
+            cls (type or str): The class of the object or its name.
+            obj_id (str): The id of the object.
+        """
+        with self.__access():
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            key = f"{cls_name}.{obj_id}"
+            if key in FileStorage.__unloaded:
+                return self.__load(key)
+            return FileStorage.__objects.get(key)
 
     def new(self, obj):
         """Set in __objects obj with key <obj_class_name>.id"""
-        obj_class_name = obj.__class__.__name__
-        FileStorage.__objects[f"{obj_class_name}.{obj.id}"] = obj
+        with self.__writing():
+            obj_class_name = obj.__class__.__name__
+            key = f"{obj_class_name}.{obj.id}"
+            self.__log(key)
+            if FileStorage.__unloaded:
+                self.__forget(key)
+            self.__store(key, obj)
+            FileStorage.__changes[key] = obj
+
+    def new_many(self, objs):
+        """Set in __objects every object of objs, like new() does, in one
+        operation.
+
+        Args:
+            objs (iterable): The objects.
+        """
+        with self.__writing():
+            self.__sync()
+            objects = FileStorage.__objects
+            unloaded = FileStorage.__unloaded
+            items = {}
+            for obj in objs:
+                key = f"{obj.__class__.__name__}.{obj.id}"
+                self.__log(key)
+                if unloaded:
+                    self.__forget(key)
+                self.__intern(obj)
+                object.__setattr__(obj, "_stored", True)
+                items[key] = obj
+            replaced = [key for key in items if key in objects]
+            for index in FileStorage.__indexes:
+                for key in replaced:
+                    index.discard(key)
+                index.add_many(items.items())
+            objects.update(items)
+            FileStorage.__changes.update(items)
+            FileStorage.__indexed = (objects, len(objects))
+
+    def touch(self, obj, name=None, *previous):
+        """Mark obj as modified if it is stored in __objects.
+
+        Assignments call it for the attribute assigned. Changes made
+        without an assignment, such as appending to a list attribute or
+        writing to __dict__, are not seen by the storage engine: call
+        touch(obj) after them, or obj.save(), for the next save to write
+        the object and for the indexes to follow it.
+
+        Args:
+            obj (BaseModel): The object modified.
+            name (str): The name of the attribute assigned, if known;
+                the indexes depending on it are updated.
+            previous (any): The value of the attribute before it was
+                assigned, if it had one, for transactions to restore.
+        """
+        key = f"{obj.__class__.__name__}.{getattr(obj, 'id', None)}"
+        if FileStorage.__objects.get(key) is not obj:
+            return
+        with self.__writing():
+            if FileStorage.__objects.get(key) is obj:
+                self.__log(key, name, previous)
+                if name in interned.get(obj.__class__.__name__, ()):
+                    self.__intern(obj)
+                FileStorage.__changes[key] = obj
+                self.__sync()
+                for index in FileStorage.__indexes:
+                    if name is None or name in index.attributes:
+                        index.discard(key)
+                        index.add(key, obj)
+
+    def delete(self, obj):
+        """Delete obj from __objects if it is there."""
+        with self.__writing():
+            key = f"{obj.__class__.__name__}.{obj.id}"
+            self.__log(key)
+            if self.__remove(key) is not None:
+                FileStorage.__changes[key] = None
+
+    @contextmanager
+    def transaction(self):
+        """Group the changes of a with block into one save.
+
+        Within the block save() only takes note that it was called, and
+        the changes are saved once when the block ends. If the block
+        raises an exception, the objects are put back as they were when
+        it began, and nothing is saved. A transaction within another one
+        joins it.
+
+        The transaction covers the changes made by every thread; the
+        attributes of an object are only put back if they were assigned.
+        """
+        with self.__writing():
+            joined = FileStorage.__undo is not None
+            if not joined:
+                FileStorage.__undo = {}
+                FileStorage.__undo_changes = dict(FileStorage.__changes)
+                FileStorage.__deferred = False
+        if joined:
+            yield self
+            return
+        try:
+            yield self
+        except BaseException:
+            with self.__writing():
+                self.__rollback()
+            raise
+        with self.__writing():
+            undo, FileStorage.__undo = FileStorage.__undo, None
+        if undo or FileStorage.__deferred:
+            self.save()
+
+    def _defer_save(self):
+        """Return whether a save must wait for the transaction in
+        progress, taking note that it was asked for."""
+        if FileStorage.__undo is None:
+            return False
+        FileStorage.__deferred = True
+        return True
+
+    def __log(self, key, name=None, previous=()):
+        """Keep what is stored under key in the undo log of the
+        transaction in progress, unless it changed already within it.
+
+        Args:
+            key (str): The key about to change.
+            name (str): The name of the attribute just assigned, if any.
+            previous (tuple): The value of that attribute before, if it
+                had one.
+        """
+        undo = FileStorage.__undo
+        if undo is None or key in undo:
+            return
+        obj = FileStorage.__objects.get(key)
+        state = None
+        if obj is not None:
+            state = obj.__dict__.copy()
+            if name is not None:
+                if previous:
+                    state[name] = previous[0]
+                else:
+                    state.pop(name, None)
+        undo[key] = (obj, state, FileStorage.__unloaded.get(key))
+
+    def __rollback(self):
+        """Put back every object changed within the transaction in
+        progress, and end it."""
+        for key, (obj, state, position) in FileStorage.__undo.items():
+            if obj is None:
+                self.__remove(key)
+            else:
+                obj.__dict__.clear()
+                obj.__dict__.update(state)
+                self.__store(key, obj)
+            if position is not None:
+                self.__unload(key, position)
+        FileStorage.__changes = FileStorage.__undo_changes
+        FileStorage.__unloaded_order = (None, [])
+        FileStorage.__undo = None
+
+    def __reading(self):
+        """Return a context holding the lock for reading in thread-safe
+        mode."""
+        if self.thread_safe:
+            return FileStorage.__rwlock.reading()
+        return nullcontext()
+
+    def __writing(self):
+        """Return a context holding the lock for writing in thread-safe
+        mode."""
+        if self.thread_safe:
+            return FileStorage.__rwlock.writing()
+        return nullcontext()
+
+    def __access(self):
+        """Return a context holding the lock for reading, or for writing
+        if records not loaded yet may have to be loaded."""
+        if FileStorage.__unloaded:
+            return self.__writing()
+        return self.__reading()
+
+    def __view(self, objs):
+        """Return a read-only view of the dictionary objs kept by an
+        index, or a copy of it in thread-safe mode."""
+        if self.thread_safe:
+            return dict(objs)
+        return MappingProxyType(objs)
+
+    def __file_lock(self, exclusive=False):
+        """Return a context holding the lock shared with the other
+        processes in shared mode, which gives the FileLock, or None."""
+        if self.shared:
+            return FileLock(self.__path(None) + ".lock").holding(exclusive)
+        return nullcontext()
+
+    def __load_class(self, cls_name):
+        """Load the records of the class cls_name not loaded yet and
+        bring the indexes up to date."""
+        prefix = cls_name + "."
+        for key in [k for k in FileStorage.__unloaded
+                    if k.startswith(prefix)]:
+            self.__load(key)
+        self.__sync()
+
+    def __sync(self):
+        """Rebuild the indexes if __objects is not the dictionary they
+        were built from or changed size without the storage engine."""
+        objects = FileStorage.__objects
+        indexed, size = FileStorage.__indexed
+        if indexed is not objects or size != len(objects):
+            self.__unload_texts()
+            for obj in objects.values():
+                object.__setattr__(obj, "_stored", True)
+            for index in FileStorage.__indexes:
+                index.clear()
+                index.add_many(objects.items())
+            FileStorage.__indexed = (objects, len(objects))
+
+    def __store(self, key, obj):
+        """Store obj in __objects under key and in the indexes."""
+        self.__intern(obj)
+        self.__sync()
+        replaced = key in FileStorage.__objects
+        FileStorage.__objects[key] = obj
+        object.__setattr__(obj, "_stored", True)
+        for index in FileStorage.__indexes:
+            if replaced:
+                index.discard(key)
+            index.add(key, obj)
+        FileStorage.__indexed = (FileStorage.__objects,
+                                 len(FileStorage.__objects))
+
+    @staticmethod
+    def __intern(obj):
+        """Intern the ids obj refers to, in the attributes listed in
+        foreign_keys and bitmap_keys, so that the objects referring to the
+        same object share one string."""
+        state = obj.__dict__
+        for attribute in interned.get(obj.__class__.__name__, ()):
+            value = state.get(attribute)
+            if type(value) is str:
+                state[attribute] = sys.intern(value)
+            elif type(value) is list:
+                value[:] = [sys.intern(v) if type(v) is str else v
+                            for v in value]
+
+    def __remove(self, key):
+        """Remove and return the object of key from __objects and from
+        the indexes, or return None if it is not there."""
+        self.__sync()
+        obj = FileStorage.__objects.pop(key, None)
+        if obj is not None:
+            object.__setattr__(obj, "_stored", False)
+            for index in FileStorage.__indexes:
+                index.discard(key)
+            FileStorage.__indexed = (FileStorage.__objects,
+                                     len(FileStorage.__objects))
+        return obj
+
+    def _take_changes(self):
+        """Return the changes since the last save and start over.
+
+        Used by storage engines that persist the changes themselves.
+        """
+        with self.__writing():
+            changes = FileStorage.__changes
+            FileStorage.__changes = {}
+            return changes
+
+    def _restore_changes(self, changes):
+        """Put back changes taken by a save that failed, under the
+        changes made since."""
+        with self.__writing():
+            changes.update(FileStorage.__changes)
+            FileStorage.__changes = changes
 
     def save(self):
-        """Serialize __objects to the JSON file __file_path."""
-        saved_objs_dict = FileStorage.__objects
-        objs_dict = {
-            obj: saved_objs_dict[obj].to_dict()
-            for obj in saved_objs_dict.keys()
-        }
+        """Serialize __objects to the file __file_path, in the format of
+        the codec.
+
+        Only the objects changed since the last save are encoded again;
+        the others reuse the fragments of the previous save. An object
+        is changed when it is created, deleted or stored with new(), or
+        when one of its attributes is assigned; an object changed in
+        place, e.g. by appending to one of its lists, is only saved again
+        once touch() is called with it. In journal
+        mode only the changes are appended to the log, and the file is
+        rewritten once the log grows past compact_threshold. In sharded
+        mode only the files of the classes that changed are rewritten.
+        Files are written to a temporary file that then replaces them,
+        so a crash never leaves a partly written file behind.
+
+        With group_commit, the first save waits that long, then writes
+        the changes of every save made in the meantime at once; those
+        saves return when the write is done.
+
+        In thread-safe mode the changes are encoded while holding the lock
+        for reading, and written without it, so other threads only wait
+        for the save while it gathers and installs them.
+
+        In shared mode the save holds the lock of the files for writing,
+        and first merges the objects other processes saved since.
+
+        In write-behind mode the save only marks the changes as pending;
+        the background thread writes them flush_interval seconds later at
+        most, or once flush_after objects changed.
+
+        Within a transaction the save waits for the transaction to end.
+
+        Raises:
+            PermissionError: If the storage engine is read-only.
+        """
+        if self.read_only:
+            raise PermissionError("storage is read-only")
+        if self._defer_save():
+            return
+        if not self.write_behind:
+            return self.__persist()
+        with self.__pending:
+            if self.__dirty_since is None:
+                self.__dirty_since = time.monotonic()
+            if self.__flusher is None:
+                self.__flusher = threading.Thread(
+                    target=self.__flush_behind, name="FileStorage flusher",
+                    daemon=True)
+                self.__flusher.start()
+            self.__pending.notify()
+
+    def flush(self):
+        """Write the changes of the saves the background thread has not
+        written yet, in write-behind mode, and wait for the write.
+
+        Called at exit, and by the console on quit and EOF.
+        """
+        with self.__flushing:
+            with self.__pending:
+                since = self.__dirty_since
+                self.__dirty_since = None
+            if since is None:
+                return
+            start = time.perf_counter()
+            try:
+                self.__persist()
+            except BaseException:
+                with self.__pending:
+                    self.__metrics["failures"] += 1
+                    if self.__dirty_since is None:
+                        self.__dirty_since = since
+                raise
+            duration = time.perf_counter() - start
+            with self.__pending:
+                metrics = self.__metrics
+                metrics["flushes"] += 1
+                metrics["last_duration"] = duration
+                metrics["max_duration"] = max(metrics["max_duration"],
+                                              duration)
+                metrics["total_duration"] += duration
+
+    def flush_metrics(self):
+        """Return the metrics of the writes of write-behind mode.
+
+        Return:
+            A dictionary of the number of flushes and failed flushes, the
+            duration of the last and the longest flush and the time spent
+            flushing in seconds, and the data at risk: the number of
+            objects changed since the last write and the age in seconds
+            of the oldest save not written yet.
+        """
+        with self.__pending:
+            metrics = dict(self.__metrics)
+            since = self.__dirty_since
+        metrics["pending_objects"] = len(FileStorage.__changes)
+        metrics["pending_seconds"] = (0.0 if since is None else
+                                      time.monotonic() - since)
+        return metrics
+
+    def __flush_behind(self):
+        """Write the pending saves when they are due, forever."""
+        pending = self.__pending
+        while True:
+            with pending:
+                while not self.__due():
+                    timeout = None
+                    if self.__dirty_since is not None and self.flush_interval:
+                        timeout = (self.__dirty_since + self.flush_interval -
+                                   time.monotonic())
+                    pending.wait(timeout)
+            try:
+                self.flush()
+            except Exception:
+                with pending:
+                    pending.wait(self.flush_interval or 1)
+
+    def __due(self):
+        """Return whether the pending saves are due to be written."""
+        if self.__dirty_since is None:
+            return False
+        if self.flush_after and len(FileStorage.__changes) >= self.flush_after:
+            return True
+        return (bool(self.flush_interval) and
+                time.monotonic() >= self.__dirty_since + self.flush_interval)
+
+    def __persist(self):
+        """Write the changes to disk, with a group commit if enabled."""
+        if not self.group_commit:
+            return self.__save()
+
+        commit = FileStorage.__commit
+        with commit:
+            batch = FileStorage.__batch
+            while FileStorage.__leading and FileStorage.__committed < batch:
+                commit.wait()
+            if FileStorage.__committed >= batch:
+                failed, error = FileStorage.__failure
+                if failed == batch:
+                    raise error
+                return
+            FileStorage.__leading = True
+        time.sleep(self.group_commit)
+        with commit:
+            FileStorage.__batch += 1
+        try:
+            self.__save()
+        except Exception as error:
+            FileStorage.__failure = (batch, error)
+            raise
+        finally:
+            with commit:
+                FileStorage.__committed = batch
+                FileStorage.__leading = False
+                commit.notify_all()
+
+    def __save(self):
+        """Write the changes since the last save to disk.
 
-        with open(FileStorage.__file_path, "w") as f:
-            json.dump(objs_dict, f)
+        The changes are taken at once and the objects encoded while
+        holding the lock for reading; the files are then written without
+        holding the lock, so other threads keep reading and writing
+        objects meanwhile.
+        """
+        with FileStorage.__saving, self.__file_lock(True) as lock:
+            if lock is not None:
+                with self.__writing():
+                    self.__refresh(lock)
+            changes = self._take_changes()
+            try:
+                self.__save_changes(changes)
+            except BaseException:
+                self._restore_changes(changes)
+                raise
+            if lock is not None:
+                lock.advance()
+                FileStorage.__stamp = self.__current_stamp(lock)
+
+    def __save_changes(self, changes):
+        """Write changes to disk.
+
+        Args:
+            changes (dict): The objects created, modified or deleted, by
+                key; deleted objects map to None.
+        """
+        if FileStorage.__codec is not self.codec:
+            FileStorage.__fragments = {}
+            FileStorage.__codec = self.codec
+        fragments = FileStorage.__fragments
+        journal = Journal(FileStorage.__file_path + ".log")
+        if self.journal and journal.size() < self.compact_threshold:
+            entries = []
+            with self.__reading():
+                for key, obj in changes.items():
+                    if obj is None:
+                        fragments.pop(key, None)
+                        entries.append((key, None))
+                        continue
+                    record = obj.to_dict()
+                    fragments[key] = (obj, self.codec.encode(record))
+                    if self.codec.name == "json":
+                        entries.append((key, fragments[key][1].decode()))
+                    else:
+                        entries.append((key, json.dumps(record)))
+            journal.append(entries, self.durable)
+            with self.__writing():
+                FileStorage.__journaled.update(changes)
+            return
+
+        if not self.sharded:
+            files = {self.__path(None): {}}
+        elif journal.size():
+            files = {self.__shard(name): {} for name in classes}
+        else:
+            files = {self.__path(key): {} for key in changes}
+            for name in classes:
+                if not os.path.exists(self.__shard(name)):
+                    files[self.__shard(name)] = {}
+        previous = delta = None
+        if (FileStorage.__texts_loaded or
+                os.path.exists(self._texts_path())):
+            previous, delta = self.__stats(self.__paths()), {}
+
+        with self.__reading():
+            for key, obj in FileStorage.__objects.items():
+                records = files.get(self.__path(key))
+                if records is None:
+                    continue
+                fragment = fragments.get(key)
+                if (key in changes or fragment is None or
+                        fragment[0] is not obj):
+                    fragment = (obj, self.codec.encode(obj.to_dict()))
+                    fragments[key] = fragment
+                records[key] = fragment
+            for key in FileStorage.__unloaded:
+                records = files.get(self.__path(key))
+                if records is not None:
+                    fragment, codec = self.__read(key)
+                    if codec is not self.codec:
+                        fragment = self.codec.encode(codec.decode(fragment))
+                    records[key] = (None, fragment)
+            if delta is not None:
+                self.__text_changes(delta, changes)
+
+        written = []
+        for path, records in files.items():
+            if records or os.path.exists(path):
+                items = list(records.items())
+                written.append((path, items, self.__write(path, items)))
+        with self.__writing():
+            for path, items, positions in written:
+                self.__install(path, items, positions)
+                if self.shared:
+                    for key, (obj, fragment) in items:
+                        FileStorage.__seen[key] = hash(fragment)
+            for key, obj in changes.items():
+                if obj is None:
+                    fragments.pop(key, None)
+                    FileStorage.__seen.pop(key, None)
+            journal.clear()
+            FileStorage.__journaled = set()
+            self.__write_texts(previous, delta)
 
     def reload(self):
-        """Deserialize the JSON file
-        __file_path to __objects, if it exists."""
-        available_models = {
-            'BaseModel': BaseModel,
-            'User': User,
-            'State': State,
-            'City': City,
-            'Amenity': Amenity,
-            'Place': Place,
-            'Review': Review
-        }
+        """Deserialize the file __file_path to __objects, if it exists.
+
+        Files written by save() are read one record at a time, so the
+        whole decoded file is never held in memory; in lazy mode their
+        records are only indexed. In sharded mode the file of every class
+        is read on its own thread. Changes recorded in the log are then
+        replayed over it.
+
+        In shared mode the files are read holding their lock for reading.
+        """
+        with FileStorage.__saving, self.__file_lock() as lock, \
+                self.__writing():
+            if FileStorage.__codec is not self.codec:
+                FileStorage.__fragments = {}
+                FileStorage.__codec = self.codec
+            paths = self.__paths()
+            self.__sync()
+            self.__unload_texts()
+
+            with ThreadPoolExecutor(len(paths)) as pool:
+                for objs, positions, digests in pool.map(self.__read_file,
+                                                         paths):
+                    self.new_many(objs)
+                    FileStorage.__unloaded.update(positions)
+                    FileStorage.__seen.update(digests)
+            FileStorage.__unloaded_order = (None, [])
+            FileStorage.__counted = (None, {})
+
+            replayed = set()
+            for key, o in Journal(FileStorage.__file_path + ".log").replay():
+                replayed.add(key)
+                if o is None:
+                    self.__forget(key)
+                    self.__remove(key)
+                    FileStorage.__fragments.pop(key, None)
+                else:
+                    cls_name = o.pop("__class__")
+                    self.new(classes[cls_name](**o))
+            FileStorage.__journaled = replayed
+            FileStorage.__changes.clear()
+            if lock is not None:
+                FileStorage.__stamp = self.__current_stamp(lock)
 
+    def refresh(self):
+        """Bring the objects up to date with the files, in shared mode,
+        if another process saved them since this one last read or wrote
+        them.
+
+        Only the files whose size or modification time changed are read
+        again, and only their records that changed are decoded; the
+        objects changed here and not saved yet are kept as they are.
+        """
+        if not self.shared:
+            return
+        with FileStorage.__saving, self.__file_lock() as lock, \
+                self.__writing():
+            self.__refresh(lock)
+
+    def __current_stamp(self, lock):
+        """Return the generation of lock and the [size, mtime_ns] of the
+        files, by path."""
+        return (lock.generation(), self.__stats(self.__paths()))
+
+    def __refresh(self, lock):
+        """Merge the records other processes saved since the last read or
+        write, holding lock."""
+        stamp = self.__current_stamp(lock)
+        if stamp == FileStorage.__stamp:
+            return
+        known = FileStorage.__stamp[1] if FileStorage.__stamp else {}
+        paths = [path for path in self.__paths() + list(known)
+                 if stamp[1].get(path) != known.get(path)]
+        seen = FileStorage.__seen
+        changes = FileStorage.__changes
+        unloaded = FileStorage.__unloaded
+        found = set()
+        for path in dict.fromkeys(paths):
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with f:
+                mapped = False
+                for key, offset, fragment in self.codec.read(f):
+                    found.add(key)
+                    digest = hash(fragment)
+                    if key in changes:
+                        pass
+                    elif (seen.get(key) == digest and key in unloaded and
+                            offset is not None):
+                        unloaded[key] = (path, offset, len(fragment))
+                        mapped = True
+                    elif seen.get(key) != digest or key in unloaded:
+                        self.__forget(key)
+                        o = self.codec.decode(fragment)
+                        obj = classes[o.pop("__class__")](**o)
+                        self.__store(key, obj)
+                        if self.codec is FileStorage.__codec:
+                            FileStorage.__fragments[key] = (obj, fragment)
+                    seen[key] = digest
+                source = FileStorage.__sources.pop(path, None)
+                if source is not None:
+                    source[0].close()
+                if mapped:
+                    FileStorage.__sources[path] = (
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ),
+                        self.codec)
+        paths = set(paths)
+        for key in [k for k in set(seen) | set(unloaded)
+                    if k not in found and self.__path(k) in paths]:
+            seen.pop(key, None)
+            if key not in changes:
+                self.__forget(key)
+                self.__remove(key)
+                FileStorage.__fragments.pop(key, None)
+        FileStorage.__unloaded_order = (None, [])
+        FileStorage.__stamp = stamp
+
+    def __paths(self):
+        """Return the paths of the files the objects are saved to."""
+        paths = [self.__path(None)]
+        if self.sharded:
+            shards = [self.__shard(name) for name in classes
+                      if os.path.exists(self.__shard(name))]
+            paths = shards or paths
+        return paths
+
+    @staticmethod
+    def __stats(paths):
+        """Return the [size, mtime_ns] of the existing files of paths,
+        by path."""
+        stats = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stats[path] = [stat.st_size, stat.st_mtime_ns]
+        return stats
+
+    @staticmethod
+    def __size(path):
+        """Return the size of the file path, or None if there is none."""
         try:
-            with open(FileStorage.__file_path, 'r') as f:
-                obj_dict = json.load(f)
-                for o in obj_dict.values():
+            return os.path.getsize(path)
+        except OSError:
+            return None
+
+    def _texts_path(self):
+        """Return the path the text indexes are saved to next to the
+        files, or None for storage engines that do not save them."""
+        return self.__path(None) + ".fts"
+
+    def __load_texts(self):
+        """Load the text indexes into __indexes, if they are not.
+
+        They are restored from the files saved next to the storage files
+        if these did not change since, except for the objects changed
+        since; otherwise the records of their classes are loaded to build
+        them, and they are saved for the next time.
+        """
+        if FileStorage.__texts_loaded:
+            return
+        texts = FileStorage.__texts
+        docs = self.__read_texts(self.__paths())
+        if docs is None:
+            for cls_name in texts:
+                self.__load_class(cls_name)
+        else:
+            stale = set(FileStorage.__changes) | FileStorage.__journaled
+            for cls_name, index in texts.items():
+                index.load({key: doc
+                            for key, doc in docs.get(cls_name, {}).items()
+                            if key not in stale})
+        for index in texts.values():
+            index.add_many(FileStorage.__objects.items())
+        FileStorage.__indexes.extend(texts.values())
+        FileStorage.__texts_loaded = True
+        if not self.shared and FileStorage.__saving.acquire(False):
+            try:
+                if docs is None:
+                    self.__remove_texts()
+                self.__write_texts()
+            finally:
+                FileStorage.__saving.release()
+
+    def __unload_texts(self):
+        """Take the text indexes out of __indexes and empty them, until
+        the next search loads them again."""
+        if FileStorage.__texts_loaded:
+            for index in FileStorage.__texts.values():
+                FileStorage.__indexes.remove(index)
+                index.clear()
+            FileStorage.__texts_loaded = False
+
+    def __text_changes(self, docs, changes):
+        """Add to docs the document of every object of a class with a
+        text index written by a save of changes, by key, by class name;
+        None for the objects removed or without words."""
+        for key in FileStorage.__journaled.union(changes):
+            cls_name = key.partition(".")[0]
+            index = FileStorage.__texts.get(cls_name)
+            if index is None or key in FileStorage.__unloaded:
+                continue
+            obj = FileStorage.__objects.get(key)
+            docs.setdefault(cls_name, {})[key] = (
+                None if obj is None else index.document(obj))
+
+    def __read_texts(self, paths):
+        """Return the documents of the text indexes saved with the files
+        of paths, by key, by class name, with the changes logged since
+        applied; or None if there are none or the files changed without
+        them."""
+        path = self._texts_path()
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                saved = json.loads(f.read())
+            docs, files = saved["indexes"], saved["files"]
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            with open(path + ".log", "rb") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            lines = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            if entry["previous"] != files:
+                continue
+            for cls_name, changed in entry["indexes"].items():
+                cls_docs = docs.setdefault(cls_name, {})
+                for key, doc in changed.items():
+                    if doc is None:
+                        cls_docs.pop(key, None)
+                    else:
+                        cls_docs[key] = doc
+            files = entry["files"]
+        if files != self.__stats(paths):
+            return None
+        return docs
+
+    def __write_texts(self, previous=None, delta=None):
+        """Bring the text indexes saved next to the files up to date.
+
+        Loaded text indexes that match the files are saved whole if none
+        are saved yet, or if the log of their changes outgrew them. After
+        a save, the changes it wrote are appended to the log otherwise,
+        and the log is folded into the saved indexes once it outgrows
+        them.
+
+        Args:
+            previous (dict): The [size, mtime_ns] of the files before the
+                save, by path, or None outside saves.
+            delta (dict): The documents the save wrote, as gathered by
+                __text_changes().
+        """
+        path = self._texts_path()
+        if path is None:
+            return
+        stats = self.__stats(self.__paths())
+        size = self.__size(path)
+        logged = self.__size(path + ".log") or 0
+        try:
+            if (stats and self.__texts_current() and
+                    (size is None or logged > size)):
+                self.__dump_texts(path, stats, {
+                    name: index.dump()
+                    for name, index in FileStorage.__texts.items()})
+            elif previous is not None and size is not None:
+                line = json.dumps({"previous": previous, "files": stats,
+                                   "indexes": delta}) + "\n"
+                with open(path + ".log", "a") as f:
+                    f.write(line)
+                if logged + len(line) > size:
+                    docs = self.__read_texts(self.__paths())
+                    if docs is None:
+                        self.__remove_texts()
+                    else:
+                        self.__dump_texts(path, stats, docs)
+        except OSError:
+            self.__remove_texts()
+
+    def __texts_current(self):
+        """Return whether the text indexes are loaded and match the
+        files, with no change to their objects left to save."""
+        if not FileStorage.__texts_loaded or FileStorage.__journaled:
+            return False
+        texts = FileStorage.__texts
+        return not any(key.partition(".")[0] in texts
+                       for key in FileStorage.__changes)
+
+    @staticmethod
+    def __dump_texts(path, stats, docs):
+        """Save the documents docs of the text indexes, by key, by class
+        name, to path for the files of stats, and remove the log of their
+        changes."""
+        data = json.dumps({"files": stats, "indexes": docs})
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp, "w") as f:
+                f.write(data)
+            os.replace(temp, path)
+        except OSError:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        if os.path.exists(path + ".log"):
+            os.remove(path + ".log")
+
+    def __remove_texts(self):
+        """Remove the text indexes saved next to the files, if any."""
+        path = self._texts_path()
+        for name in (path, path + ".log") if path else ():
+            try:
+                os.remove(name)
+            except OSError:
+                pass
+
+    def __shard(self, cls_name):
+        """Return the path of the file of the class cls_name."""
+        root = os.path.splitext(FileStorage.__file_path)[0]
+        return f"{root}.{cls_name}{self.codec.extension}"
+
+    def __path(self, key):
+        """Return the path of the file the object of key goes to."""
+        if self.sharded and key is not None:
+            return self.__shard(key.partition(".")[0])
+        root = os.path.splitext(FileStorage.__file_path)[0]
+        return root + self.codec.extension
+
+    def __write(self, path, items):
+        """Write records to the file path.
+
+        Args:
+            path (str): The path of the file.
+            items (list): The (key, (object, fragment)) pairs to write.
+
+        Return:
+            The (offset, length) of every fragment in the file.
+        """
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp, "wb") as f:
+                positions = self.codec.write(
+                    f, [(key, fragment) for key, (obj, fragment) in items])
+                if self.durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(temp, path)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        if self.durable and hasattr(os, "O_DIRECTORY"):
+            directory = os.open(os.path.dirname(os.path.abspath(path)),
+                                os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+        return positions
+
+    def __install(self, path, items, positions):
+        """Point the unloaded records written to the file path at their
+        new position in it.
+
+        Args:
+            path (str): The path of the file.
+            items (list): The (key, (object, fragment)) pairs written;
+                records without an object stay unloaded, unless they were
+                loaded while the file was written.
+            positions (list): The (offset, length) of every fragment.
+        """
+        unloaded = False
+        for (key, (obj, fragment)), (offset, length) in zip(items, positions):
+            if obj is None and key in FileStorage.__unloaded:
+                FileStorage.__unloaded[key] = (path, offset, length)
+                unloaded = True
+        source = FileStorage.__sources.pop(path, None)
+        if source is not None:
+            source[0].close()
+        if unloaded:
+            with open(path, "rb") as f:
+                FileStorage.__sources[path] = (
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ),
+                    self.codec)
+
+    def __read_file(self, path):
+        """Read the file path.
+
+        Return:
+            The objects built from the file and, in lazy mode, the
+            (path, offset, length) of its records by key instead; then,
+            in shared mode, a digest of its records by key.
+        """
+        objs, positions, digests = [], None, {}
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return objs, {}, digests
+        with f:
+            stat = os.fstat(f.fileno())
+            if self.read_only:
+                positions = self.__read_index(path, stat)
+            if positions is None:
+                positions = {}
+                for key, offset, fragment in self.codec.read(f):
+                    if self.shared:
+                        digests[key] = hash(fragment)
+                    if self.lazy and offset is not None:
+                        positions[key] = (path, offset, len(fragment))
+                        continue
+                    o = self.codec.decode(fragment)
                     cls_name = o["__class__"]
                     del o["__class__"]
-                    self.new(available_models[cls_name](**o))
-        except (FileNotFoundError, FileExistsError):
-            return
+                    objs.append(classes[cls_name](**o))
+                if self.read_only:
+                    self.__write_index(path, stat, positions)
+            if positions:
+                source = FileStorage.__sources.pop(path, None)
+                if source is not None:
+                    source[0].close()
+                FileStorage.__sources[path] = (
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ),
+                    self.codec)
+        return objs, positions, digests
+
+    @staticmethod
+    def __read_index(path, stat):
+        """Return the positions stored in the index of the file path, or
+        None if there is no index or the file changed since it was made.
+
+        Args:
+            path (str): The path of the file.
+            stat (os.stat_result): The status of the file.
+        """
+        try:
+            with open(path + ".idx", "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if [index.get("size"), index.get("mtime_ns")] != [
+                stat.st_size, stat.st_mtime_ns]:
+            return None
+        return {
+            key: (path, offset, length) for key, offset, length in
+            zip(index["keys"], index["offsets"], index["lengths"])
+        }
+
+    @staticmethod
+    def __write_index(path, stat, positions):
+        """Store positions in the index of the file path, if possible.
+
+        Args:
+            path (str): The path of the file.
+            stat (os.stat_result): The status of the file.
+            positions (dict): The (path, offset, length) of the records of
+                the file, by key.
+        """
+        index = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "keys": list(positions),
+            "offsets": [offset for p, offset, length in positions.values()],
+            "lengths": [length for p, offset, length in positions.values()]
+        }
+        try:
+            with open(path + ".idx", "w") as f:
+                json.dump(index, f)
+        except OSError:
+            pass
+
+    def __read(self, key):
+        """Return the fragment of the unloaded record of key and the
+        codec it is encoded with."""
+        path, offset, length = FileStorage.__unloaded[key]
+        source, codec = FileStorage.__sources[path]
+        return source[offset:offset + length], codec
+
+    def __unloaded_counts(self):
+        """Return the number of records not loaded yet of every class, by
+        class name, counting them again if __unloaded was replaced."""
+        unloaded = FileStorage.__unloaded
+        if FileStorage.__counted[0] is not unloaded:
+            counts = {}
+            for key in unloaded:
+                cls_name = key.partition(".")[0]
+                counts[cls_name] = counts.get(cls_name, 0) + 1
+            FileStorage.__counted = (unloaded, counts)
+        return FileStorage.__counted[1]
+
+    def __unload(self, key, position):
+        """Set the position of the record of key, not loaded, in
+        __unloaded and count it if it was not there."""
+        unloaded = FileStorage.__unloaded
+        counted, counts = FileStorage.__counted
+        if counted is unloaded and key not in unloaded:
+            cls_name = key.partition(".")[0]
+            counts[cls_name] = counts.get(cls_name, 0) + 1
+        unloaded[key] = position
+
+    def __forget(self, key):
+        """Remove the record of key from __unloaded, if it is there, and
+        from the counts."""
+        unloaded = FileStorage.__unloaded
+        counted, counts = FileStorage.__counted
+        if unloaded.pop(key, None) is not None and counted is unloaded:
+            counts[key.partition(".")[0]] -= 1
+
+    def __load(self, key):
+        """Build, store and return the not yet loaded object of key."""
+        fragment, codec = self.__read(key)
+        self.__forget(key)
+        o = codec.decode(fragment)
+        obj = classes[o.pop("__class__")](**o)
+        self.__store(key, obj)
+        if codec is FileStorage.__codec:
+            FileStorage.__fragments[key] = (obj, fragment)
+        return obj
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""Defines the full-text index of the storage engines.
+
+Text is split into lowercase words, and every word maps to the objects
+containing it, with the number of times it occurs; searches rank the
+objects with BM25.
+"""
+import heapq
+import math
+import re
+from models.engine.index import Index
+
+word = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Return the list of the lowercase words of text."""
+    return word.findall(text.lower())
+
+
+class FullTextIndex(Index):
+    """Represent an inverted index of the words of a text attribute of
+    the objects of one class.
+
+    The index only holds keys, so it can be saved to a file and stand for
+    objects not loaded yet.
+
+    Attributes:
+        cls_name (str): The name of the class of the objects indexed.
+        attribute (str): The name of the text attribute.
+        k1 (float): The BM25 term frequency saturation.
+        b (float): The BM25 length normalization.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, cls_name, attribute):
+        """Initialize a new FullTextIndex.
+
+        Args:
+            cls_name (str): The name of the class of the objects indexed.
+            attribute (str): The name of the text attribute.
+        """
+        self.cls_name = cls_name
+        self.attribute = attribute
+        self.attributes = frozenset([attribute])
+        self.clear()
+
+    def add(self, key, obj):
+        """Add the object obj stored under key.
+
+        A key restored by load() is kept as it is, since its words were
+        saved from the same record.
+        """
+        if key in self.__docs or obj.__class__.__name__ != self.cls_name:
+            return
+        document = self.document(obj)
+        if document is not None:
+            self.__insert(key, *document)
+
+    def document(self, obj):
+        """Return the number of words of the text of obj, an object of
+        the class indexed, and the number of times each word occurs in
+        it; or None if it has no words to index."""
+        text = getattr(obj, self.attribute, None)
+        if type(text) is not str:
+            return None
+        counts = {}
+        words = tokenize(text)
+        for term in words:
+            counts[term] = counts.get(term, 0) + 1
+        return (len(words), counts) if words else None
+
+    def discard(self, key):
+        """Remove the object stored under key, if it is in the index."""
+        if key not in self.__docs:
+            return
+        length, counts = self.__docs.pop(key)
+        self.__length -= length
+        for term in counts:
+            keys = self.__postings[term]
+            del keys[key]
+            if not keys:
+                del self.__postings[term]
+
+    def clear(self):
+        """Remove every object from the index."""
+        self.__docs = {}
+        self.__postings = {}
+        self.__length = 0
+
+    def __contains__(self, key):
+        """Return whether the object stored under key is indexed."""
+        return key in self.__docs
+
+    def __len__(self):
+        """Return the number of objects indexed."""
+        return len(self.__docs)
+
+    def terms(self):
+        """Return the number of distinct words indexed."""
+        return len(self.__postings)
+
+    def search(self, text, limit=None):
+        """Return the keys of the objects matching the words of text.
+
+        Args:
+            text (str): The words to search for.
+            limit (int): The maximum number of keys, or None for all.
+
+        Return:
+            The list of the keys, best match first.
+        """
+        docs = self.__docs
+        if not docs:
+            return []
+        average = self.__length / len(docs) or 1
+        scores = {}
+        for term in set(tokenize(text)):
+            keys = self.__postings.get(term, {})
+            idf = math.log(1 + (len(docs) - len(keys) + 0.5) /
+                           (len(keys) + 0.5))
+            for key, count in keys.items():
+                norm = self.k1 * (1 - self.b + self.b * docs[key][0] /
+                                  average)
+                scores[key] = scores.get(key, 0) + idf * count * (
+                    self.k1 + 1) / (count + norm)
+        ranked = ((-score, key) for key, score in scores.items())
+        if limit is None:
+            return [key for score, key in sorted(ranked)]
+        return [key for score, key in heapq.nsmallest(limit, ranked)]
+
+    def dump(self):
+        """Return the state of the index as a JSON serializable dict."""
+        return {key: [length, counts]
+                for key, (length, counts) in self.__docs.items()}
+
+    def load(self, docs):
+        """Restore a state returned by dump() into the empty index."""
+        for key, (length, counts) in docs.items():
+            self.__insert(key, length, counts)
+
+    def __insert(self, key, length, counts):
+        """Add the word counts of the text of key to the index."""
+        self.__docs[key] = (length, counts)
+        self.__length += length
+        for term, count in counts.items():
+            self.__postings.setdefault(term, {})[key] = count
@@ -0,0 +1,244 @@
+#!/usr/bin/python3
+"""Defines the geospatial index of the storage engines.
+
+Objects are bucketed in a grid of cells of a fixed number of degrees, so
+a search only measures the distance to the objects of the cells that
+overlap the area searched. Distances are great-circle distances in
+kilometers; they are computed with NumPy when it is installed and many
+objects have to be measured at once.
+"""
+import math
+from models.engine.index import Index
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EARTH_RADIUS = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Return the great-circle distance in kilometers between two points
+    given in degrees."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2)
+         * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distances(lat, lon, points):
+    """Return the distances in kilometers from (lat, lon) to points.
+
+    Args:
+        lat (float): The latitude of the origin, in degrees.
+        lon (float): The longitude of the origin, in degrees.
+        points (list): The (latitude, longitude) pairs to measure.
+    """
+    if numpy is None or len(points) < 64:
+        return [haversine(lat, lon, p_lat, p_lon) for p_lat, p_lon in points]
+    coords = numpy.radians(numpy.array(points, dtype=float))
+    lat, lon = math.radians(lat), math.radians(lon)
+    a = (numpy.sin((coords[:, 0] - lat) / 2) ** 2 + math.cos(lat)
+         * numpy.cos(coords[:, 0]) * numpy.sin((coords[:, 1] - lon) / 2) ** 2)
+    return (2 * EARTH_RADIUS * numpy.arcsin(
+        numpy.sqrt(numpy.minimum(a, 1.0)))).tolist()
+
+
+class GeoIndex(Index):
+    """Represent a grid index of the objects of one class by position.
+
+    Objects whose coordinates are not set on them, such as Places left at
+    the class defaults of 0.0, or are not numbers, are left out of the
+    index.
+
+    Attributes:
+        cls_name (str): The name of the class of the objects indexed.
+        latitude (str): The name of the latitude attribute.
+        longitude (str): The name of the longitude attribute.
+        cell (float): The size of the cells of the grid, in degrees.
+    """
+
+    def __init__(self, cls_name, latitude="latitude", longitude="longitude",
+                 cell=0.1):
+        """Initialize a new GeoIndex.
+
+        Args:
+            cls_name (str): The name of the class of the objects indexed.
+            latitude (str): The name of the latitude attribute.
+            longitude (str): The name of the longitude attribute.
+            cell (float): The size of the cells of the grid, in degrees.
+        """
+        self.cls_name = cls_name
+        self.latitude = latitude
+        self.longitude = longitude
+        self.attributes = frozenset([latitude, longitude])
+        self.cell = cell
+        self.__rows = math.ceil(180 / cell)
+        self.__cols = math.ceil(360 / cell)
+        self.__cells = {}
+        self.__points = {}
+
+    def add(self, key, obj):
+        """Add the object obj stored under key."""
+        if obj.__class__.__name__ != self.cls_name:
+            return
+        state = obj.__dict__
+        lat = state.get(self.latitude)
+        lon = state.get(self.longitude)
+        if type(lat) not in (int, float) or type(lon) not in (int, float):
+            return
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return
+        cell = (self.__row(lat), self.__col(lon))
+        self.__cells.setdefault(cell, {})[key] = obj
+        self.__points[key] = (lat, lon, cell)
+
+    def discard(self, key):
+        """Remove the object stored under key, if it is in the index."""
+        if key not in self.__points:
+            return
+        lat, lon, cell = self.__points.pop(key)
+        objs = self.__cells[cell]
+        del objs[key]
+        if not objs:
+            del self.__cells[cell]
+
+    def clear(self):
+        """Remove every object from the index."""
+        self.__cells = {}
+        self.__points = {}
+
+    def box(self, south, west, north, east):
+        """Return the objects inside a bounding box.
+
+        A box whose west edge is east of its east edge crosses the
+        antimeridian.
+
+        Args:
+            south (float): The lowest latitude.
+            west (float): The westmost longitude.
+            north (float): The highest latitude.
+            east (float): The eastmost longitude.
+
+        Return:
+            A dictionary of the objects by key.
+        """
+        objs = {}
+        points = self.__points
+        for key, obj in self.__candidates(south, west, north, east):
+            lat, lon, cell = points[key]
+            if south <= lat <= north and (
+                    west <= lon <= east if west <= east
+                    else lon >= west or lon <= east):
+                objs[key] = obj
+        return objs
+
+    def radius(self, lat, lon, km):
+        """Return the objects within km kilometers of a point.
+
+        Args:
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            km (float): The distance in kilometers.
+
+        Return:
+            A dictionary of the objects by key, nearest first.
+        """
+        return {key: obj for key, obj, d in self.__within(lat, lon, km)}
+
+    def nearest(self, lat, lon, k):
+        """Return the k objects nearest to a point.
+
+        The rings of cells around the point are searched until k objects
+        are found; the objects within the distance of the farthest of
+        them are then measured, since a nearer one may lie in a cell not
+        searched yet.
+
+        Args:
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            k (int): The number of objects.
+
+        Return:
+            A dictionary of the objects by key, nearest first.
+        """
+        if k <= 0 or not self.__points:
+            return {}
+        row, col = self.__row(lat), self.__col(lon)
+        found = {}
+        ring = 0
+        while len(found) < k:
+            if 8 * ring > len(self.__cells):
+                found = self.__points
+                break
+            for cell in self.__ring(row, col, ring):
+                found.update(self.__cells.get(cell, {}))
+            ring += 1
+        points = self.__points
+        farthest = max(distances(lat, lon, [points[key][:2]
+                                            for key in found]))
+        near = self.__within(lat, lon, farthest * (1 + 1e-9))
+        return {key: obj for key, obj, d in near[:k]}
+
+    def __row(self, lat):
+        """Return the row of the cells of latitude lat."""
+        return min(int((lat + 90) // self.cell), self.__rows - 1)
+
+    def __col(self, lon):
+        """Return the column of the cells of longitude lon."""
+        return min(int((lon + 180) // self.cell), self.__cols - 1)
+
+    def __ring(self, row, col, ring):
+        """Return the cells at ring cells from the cell (row, col)."""
+        cells = set()
+        for i in range(-ring, ring + 1):
+            for j in (-ring, ring) if abs(i) != ring else range(
+                    -ring, ring + 1):
+                if 0 <= row + i < self.__rows:
+                    cells.add((row + i, (col + j) % self.__cols))
+        return cells
+
+    def __candidates(self, south, west, north, east):
+        """Yield the (key, object) pairs of the cells overlapping a
+        bounding box."""
+        rows = range(self.__row(max(south, -90)), self.__row(min(north, 90))
+                     + 1)
+        first, last = self.__col(west), self.__col(east)
+        if west <= east:
+            cols = range(first, last + 1)
+        else:
+            cols = list(dict.fromkeys(
+                [*range(first, self.__cols), *range(0, last + 1)]))
+        if len(rows) * len(cols) > len(self.__cells):
+            rows, cols = set(rows), set(cols)
+            for (row, col), objs in self.__cells.items():
+                if row in rows and col in cols:
+                    yield from objs.items()
+            return
+        for row in rows:
+            for col in cols:
+                yield from self.__cells.get((row, col), {}).items()
+
+    def __within(self, lat, lon, km):
+        """Return the (key, object, distance) of the objects within km
+        kilometers of a point, nearest first."""
+        dlat = km / KM_PER_DEGREE
+        south, north = lat - dlat, lat + dlat
+        ratio = math.sin(km / EARTH_RADIUS) / math.cos(math.radians(lat)) \
+            if abs(lat) < 90 else 2
+        if south <= -90 or north >= 90 or km / EARTH_RADIUS >= math.pi / 2 \
+                or ratio >= 1:
+            west, east = -180, 180
+        else:
+            dlon = math.degrees(math.asin(ratio))
+            west = (lon - dlon + 180) % 360 - 180
+            east = (lon + dlon + 180) % 360 - 180
+        found = list(self.__candidates(south, west, north, east))
+        points = self.__points
+        measured = distances(lat, lon, [points[key][:2] for key, obj in found])
+        near = [(key, obj, d) for (key, obj), d in zip(found, measured)
+                if d <= km]
+        near.sort(key=lambda item: item[2])
+        return near
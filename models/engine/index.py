@@ -0,0 +1,398 @@
+#!/usr/bin/python3
+"""Defines the secondary indexes of the storage engines.
+
+An index is told by the storage engine about every object stored,
+replaced or deleted, and about every attribute assignment on a stored
+object it watches, so it never needs to scan the objects itself.
+"""
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import ItemsView, Mapping, ValuesView
+from operator import itemgetter
+
+
+def hashable(value):
+    """Return whether value can be a dictionary key."""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class Index:
+    """Represent the interface of a secondary index.
+
+    Attributes:
+        attributes (set): The names of the attributes the index depends
+            on; when one of them is assigned on a stored object, the
+            object is discarded from the index and added back.
+    """
+
+    attributes = frozenset()
+
+    def add(self, key, obj):
+        """Add the object obj stored under key."""
+        raise NotImplementedError
+
+    def add_many(self, items):
+        """Add every (key, object) pair of items, none of them indexed
+        yet; indexes that can add many objects faster than one at a time
+        override it."""
+        add = self.add
+        for key, obj in items:
+            add(key, obj)
+
+    def discard(self, key):
+        """Remove the object stored under key, if it is in the index."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every object from the index."""
+        raise NotImplementedError
+
+
+class ClassIndex(Index):
+    """Represent an index of the stored objects by class name.
+
+    The keys of every class are also kept in order, for iterating over
+    the objects page by page. New keys are merged into the order when it
+    is next needed, each once however often its object is stored again
+    meanwhile, and the keys of removed objects are dropped once they
+    make up half of it.
+    """
+
+    def __init__(self):
+        """Initialize a new ClassIndex."""
+        self.clear()
+
+    def add(self, key, obj):
+        """Add the object obj stored under key."""
+        cls_name = obj.__class__.__name__
+        self.__objects.setdefault(cls_name, {})[key] = obj
+        self.__classes[key] = cls_name
+        self.__pending.setdefault(cls_name, {})[key] = None
+
+    def discard(self, key):
+        """Remove the object stored under key, if it is in the index."""
+        cls_name = self.__classes.pop(key, None)
+        if cls_name is not None:
+            del self.__objects[cls_name][key]
+            self.__pending.get(cls_name, {}).pop(key, None)
+            self.__removed[cls_name] = self.__removed.get(cls_name, 0) + 1
+
+    def clear(self):
+        """Remove every object from the index."""
+        self.__objects = {}
+        self.__classes = {}
+        self.__sorted = {}
+        self.__pending = {}
+        self.__removed = {}
+
+    def objects(self, cls_name):
+        """Return the dictionary of the objects of class cls_name, by key.
+
+        The dictionary is the one the index keeps up to date; it must
+        not be modified.
+        """
+        return self.__objects.setdefault(cls_name, {})
+
+    def next_key(self, cls_name, after=None):
+        """Return the first key of class cls_name in key order, or the
+        first one after the key after, or None if there is none."""
+        keys = self.__order(cls_name)
+        objs = self.__objects.get(cls_name, {})
+        i = 0 if after is None else bisect_right(keys, after)
+        while i < len(keys):
+            if keys[i] in objs:
+                return keys[i]
+            i += 1
+        return None
+
+    def __order(self, cls_name):
+        """Return the sorted list of the keys of class cls_name, which may
+        still hold keys of removed objects."""
+        keys = self.__sorted.get(cls_name, [])
+        pending = self.__pending.pop(cls_name, {})
+        objs = self.__objects.get(cls_name, {})
+        removed = self.__removed.get(cls_name, 0)
+        if len(pending) > len(keys) // 32 or removed > len(keys) // 2:
+            keys = sorted(k for k in set(keys).union(pending) if k in objs)
+            self.__sorted[cls_name] = keys
+            self.__removed[cls_name] = 0
+            return keys
+        for key in pending:
+            i = bisect_left(keys, key)
+            if i == len(keys) or keys[i] != key:
+                keys.insert(i, key)
+        return keys
+
+
+class ForeignKeyIndex(Index):
+    """Represent an index of the objects of one class by the id another
+    object they refer to, such as the cities of a state.
+
+    Objects whose attribute holds a value that cannot be hashed, such as
+    a list, are left out of the index.
+
+    Attributes:
+        cls_name (str): The name of the class of the objects indexed.
+        attribute (str): The name of the attribute holding the id.
+    """
+
+    def __init__(self, cls_name, attribute):
+        """Initialize a new ForeignKeyIndex.
+
+        Args:
+            cls_name (str): The name of the class of the objects indexed.
+            attribute (str): The name of the attribute holding the id.
+        """
+        self.cls_name = cls_name
+        self.attribute = attribute
+        self.attributes = frozenset([attribute])
+        self.__objects = {}
+        self.__values = {}
+
+    def add(self, key, obj):
+        """Add the object obj stored under key."""
+        if obj.__class__.__name__ != self.cls_name:
+            return
+        value = getattr(obj, self.attribute, None)
+        if not hashable(value):
+            return
+        self.__objects.setdefault(value, {})[key] = obj
+        self.__values[key] = value
+
+    def discard(self, key):
+        """Remove the object stored under key, if it is in the index."""
+        if key not in self.__values:
+            return
+        value = self.__values.pop(key)
+        objs = self.__objects[value]
+        del objs[key]
+        if not objs:
+            del self.__objects[value]
+
+    def clear(self):
+        """Remove every object from the index."""
+        self.__objects = {}
+        self.__values = {}
+
+    def objects(self, value):
+        """Return the dictionary of the objects referring to value, by key.
+
+        The dictionary is the one the index keeps up to date; it must
+        not be modified.
+        """
+        return self.__objects.get(value, {})
+
+
+class RangeIndex(Index):
+    """Represent a sorted index of the objects of one class by a numeric
+    attribute, answering range queries with binary searches.
+
+    The entries are (value, key, object) triples sorted by value and key,
+    so the objects of a range are read in order from one slice. Objects
+    whose attribute is not a number are left out of the index.
+
+    Attributes:
+        cls_name (str): The name of the class of the objects indexed.
+        attribute (str): The name of the numeric attribute.
+    """
+
+    def __init__(self, cls_name, attribute):
+        """Initialize a new RangeIndex.
+
+        Args:
+            cls_name (str): The name of the class of the objects indexed.
+            attribute (str): The name of the numeric attribute.
+        """
+        self.cls_name = cls_name
+        self.attribute = attribute
+        self.attributes = frozenset([attribute])
+        self.__entries = []
+        self.__objects = {}
+        self.__version = 0
+
+    def add(self, key, obj):
+        """Add the object obj stored under key."""
+        if obj.__class__.__name__ != self.cls_name:
+            return
+        value = getattr(obj, self.attribute, None)
+        if type(value) not in (int, float):
+            return
+        entry = (value, key, obj)
+        insort(self.__entries, entry)
+        self.__objects[key] = entry
+        self.__version += 1
+
+    def add_many(self, items):
+        """Add every (key, object) pair of items, none of them indexed
+        yet, sorting the entries once instead of inserting each."""
+        entries = []
+        objects = self.__objects
+        for key, obj in items:
+            if obj.__class__.__name__ != self.cls_name:
+                continue
+            value = getattr(obj, self.attribute, None)
+            if type(value) not in (int, float):
+                continue
+            entry = (value, key, obj)
+            entries.append(entry)
+            objects[key] = entry
+        if len(entries) < 8:
+            for entry in entries:
+                insort(self.__entries, entry)
+        else:
+            self.__entries.extend(entries)
+            self.__entries.sort()
+        self.__version += 1
+
+    def discard(self, key):
+        """Remove the object stored under key, if it is in the index."""
+        if key not in self.__objects:
+            return
+        entry = self.__objects.pop(key)
+        del self.__entries[bisect_left(self.__entries, entry)]
+        self.__version += 1
+
+    def clear(self):
+        """Remove every object from the index."""
+        self.__entries = []
+        self.__objects = {}
+        self.__version += 1
+
+    def range(self, low=None, high=None, include_low=True,
+              include_high=True):
+        """Return the objects whose attribute lies between low and high.
+
+        Args:
+            low (int or float): The lower bound, or None for no bound.
+            high (int or float): The upper bound, or None for no bound.
+            include_low (bool): Whether low itself matches.
+            include_high (bool): Whether high itself matches.
+
+        Return:
+            A RangeView of the objects by key, in attribute order.
+        """
+        return RangeView(self, low, high, include_low, include_high)
+
+    def count(self, low=None, high=None, include_low=True,
+              include_high=True):
+        """Return the number of objects whose attribute lies between low
+        and high, with two binary searches; the arguments are those of
+        range()."""
+        start, end = self.__span(low, high, include_low, include_high)
+        return end - start
+
+    def items(self, low=None, high=None, include_low=True,
+              include_high=True):
+        """Yield the (key, object) pairs of the objects whose attribute
+        lies between low and high, in attribute order; the arguments are
+        those of range().
+
+        Raises:
+            RuntimeError: If the index changes during the iteration.
+        """
+        start, end = self.__span(low, high, include_low, include_high)
+        version = self.__version
+        for i in range(start, end, 1024):
+            for value, key, obj in self.__entries[i:min(i + 1024, end)]:
+                if self.__version != version:
+                    raise RuntimeError("index changed during iteration")
+                yield key, obj
+
+    def find(self, key):
+        """Return the (value, key, object) entry of key, or None."""
+        return self.__objects.get(key)
+
+    def __span(self, low, high, include_low, include_high):
+        """Return the start and end positions in the entries of the values
+        between low and high."""
+        entries = self.__entries
+        value = itemgetter(0)
+        start, end = 0, len(entries)
+        if low is not None:
+            search = bisect_left if include_low else bisect_right
+            start = search(entries, low, key=value)
+        if high is not None:
+            search = bisect_right if include_high else bisect_left
+            end = search(entries, high, key=value)
+        return start, max(start, end)
+
+
+class RangeView(Mapping):
+    """Represent a read-only view of the objects of a RangeIndex whose
+    attribute lies between two bounds, by key, in attribute order.
+
+    Nothing is copied: the view follows the index, its length takes two
+    binary searches and its objects are only looked up as they are read.
+    """
+
+    def __init__(self, index, low=None, high=None, include_low=True,
+                 include_high=True):
+        """Initialize a new RangeView.
+
+        Args:
+            index (RangeIndex): The index viewed.
+            low (int or float): The lower bound, or None for no bound.
+            high (int or float): The upper bound, or None for no bound.
+            include_low (bool): Whether low itself matches.
+            include_high (bool): Whether high itself matches.
+        """
+        self.__index = index
+        self.__bounds = (low, high, include_low, include_high)
+
+    def __getitem__(self, key):
+        """Return the object stored under key, if its attribute lies
+        between the bounds."""
+        found = self.__index.find(key)
+        if found is None or not self.__within(found[0]):
+            raise KeyError(key)
+        return found[2]
+
+    def __iter__(self):
+        """Yield the keys of the objects, in attribute order."""
+        return (key for key, obj in self.__index.items(*self.__bounds))
+
+    def __len__(self):
+        """Return the number of objects."""
+        return self.__index.count(*self.__bounds)
+
+    def items(self):
+        """Return a view of the (key, object) pairs, in attribute order."""
+        return RangeItemsView(self)
+
+    def values(self):
+        """Return a view of the objects, in attribute order."""
+        return RangeValuesView(self)
+
+    def pairs(self):
+        """Yield the (key, object) pairs straight from the index."""
+        return self.__index.items(*self.__bounds)
+
+    def __within(self, value):
+        """Return whether value lies between the bounds."""
+        low, high, include_low, include_high = self.__bounds
+        if low is not None and (value < low or
+                                value == low and not include_low):
+            return False
+        if high is not None and (value > high or
+                                 value == high and not include_high):
+            return False
+        return True
+
+
+class RangeItemsView(ItemsView):
+    """Represent the view of the (key, object) pairs of a RangeView."""
+
+    def __iter__(self):
+        """Yield the pairs without looking each key up again."""
+        return self._mapping.pairs()
+
+
+class RangeValuesView(ValuesView):
+    """Represent the view of the objects of a RangeView."""
+
+    def __iter__(self):
+        """Yield the objects without looking each key up again."""
+        return (obj for key, obj in self._mapping.pairs())
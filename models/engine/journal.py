@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""Defines the Journal class."""
+import json
+import os
+
+
+class Journal:
+    """Represent an append-only log of storage mutations.
+
+    Every record is one JSON line: either a put carrying the
+    serialized object, or a delete carrying only its key.
+
+    Attributes:
+        path (str): The path of the log file.
+    """
+
+    def __init__(self, path):
+        """Initialize a new Journal.
+
+        Args:
+            path (str): The path of the log file.
+        """
+        self.path = path
+
+    def append(self, changes, sync=False):
+        """Append one record per change to the log.
+
+        Args:
+            changes (iterable): (key, text) pairs, where text is the JSON
+                encoded to_dict() of the object or None for a delete.
+            sync (bool): Flush the log to disk with fsync.
+        """
+        lines = []
+        for key, text in changes:
+            if text is None:
+                lines.append(json.dumps({"op": "delete", "key": key}) + "\n")
+            else:
+                lines.append('{{"op": "put", "key": {}, "obj": {}}}\n'.format(
+                    json.dumps(key), text))
+        if not lines:
+            return
+        with open(self.path, "a") as f:
+            f.writelines(lines)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def replay(self):
+        """Yield the (key, record) pairs stored in the log, oldest first.
+
+        A truncated last line left behind by a crash is ignored.
+        """
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        return
+                    yield entry["key"], entry.get("obj")
+        except FileNotFoundError:
+            return
+
+    def size(self):
+        """Return the size of the log in bytes."""
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def clear(self):
+        """Remove the log once its records are part of a snapshot."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,174 @@
+#!/usr/bin/python3
+"""Defines the RWLock and FileLock classes."""
+import os
+import threading
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class RWLock:
+    """Represent a reader-writer lock.
+
+    Any number of threads can hold the lock for reading at once, while a
+    thread holding it for writing holds it alone. Threads waiting to write
+    go before threads that start reading, so writers are not starved.
+
+    The lock is reentrant: a thread holding it can take it again for
+    reading, and the writer can also take it again for writing. A reader
+    cannot take it for writing, since two readers doing so would wait for
+    each other forever.
+    """
+
+    def __init__(self):
+        """Initialize a new RWLock."""
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writer = None
+        self.__depth = 0
+        self.__waiting = 0
+        self.__local = threading.local()
+
+    def acquire_read(self):
+        """Take the lock for reading, waiting for the writers."""
+        if self.__writer == threading.get_ident():
+            self.__depth += 1
+            return
+        count = getattr(self.__local, "count", 0)
+        if count:
+            self.__local.count = count + 1
+            return
+        with self.__condition:
+            while self.__writer is not None or self.__waiting:
+                self.__condition.wait()
+            self.__readers += 1
+        self.__local.count = 1
+
+    def release_read(self):
+        """Release the lock taken for reading."""
+        if self.__writer == threading.get_ident():
+            self.__depth -= 1
+            return
+        self.__local.count -= 1
+        if self.__local.count:
+            return
+        with self.__condition:
+            self.__readers -= 1
+            if not self.__readers:
+                self.__condition.notify_all()
+
+    def acquire_write(self):
+        """Take the lock for writing, waiting for every other thread.
+
+        Raises:
+            RuntimeError: If the thread holds the lock for reading.
+        """
+        me = threading.get_ident()
+        if self.__writer == me:
+            self.__depth += 1
+            return
+        if getattr(self.__local, "count", 0):
+            raise RuntimeError("cannot take a read lock for writing")
+        with self.__condition:
+            self.__waiting += 1
+            try:
+                while self.__writer is not None or self.__readers:
+                    self.__condition.wait()
+            finally:
+                self.__waiting -= 1
+            self.__writer = me
+            self.__depth = 1
+
+    def release_write(self):
+        """Release the lock taken for writing."""
+        self.__depth -= 1
+        if self.__depth:
+            return
+        with self.__condition:
+            self.__writer = None
+            self.__condition.notify_all()
+
+    @contextmanager
+    def reading(self):
+        """Hold the lock for reading within a with statement."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        """Hold the lock for writing within a with statement."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class FileLock:
+    """Represent an advisory lock shared by the processes using a file.
+
+    The lock is taken with flock on a file of its own, which also holds a
+    generation counter: a process holding the lock for writing advances it
+    after changing the files the lock guards, so the other processes can
+    tell cheaply that their copy is out of date. Only one thread of a
+    process should hold a FileLock instance at once.
+
+    Attributes:
+        path (str): The path of the lock file.
+    """
+
+    def __init__(self, path):
+        """Initialize a new FileLock.
+
+        Args:
+            path (str): The path of the lock file, created if needed.
+
+        Raises:
+            OSError: If the platform has no flock.
+        """
+        if fcntl is None:
+            raise OSError("file locking is not available")
+        self.path = path
+        self.__fd = None
+
+    @contextmanager
+    def holding(self, exclusive=False):
+        """Hold the lock within a with statement, waiting for the other
+        processes.
+
+        Args:
+            exclusive (bool): Take the lock for writing instead of sharing
+                it with the other readers.
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self.__fd = fd
+            yield self
+        finally:
+            self.__fd = None
+            os.close(fd)
+
+    def generation(self):
+        """Return the generation counter, 0 for a new lock file."""
+        try:
+            return int(os.pread(self.__fd, 32, 0) or 0)
+        except ValueError:
+            return 0
+
+    def advance(self):
+        """Advance the generation counter, holding the lock for writing.
+
+        Return:
+            The new generation.
+        """
+        generation = self.generation() + 1
+        data = b"%d\n" % generation
+        os.pwrite(self.__fd, data, 0)
+        os.ftruncate(self.__fd, len(data))
+        return generation
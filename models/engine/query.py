@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""Defines the Query class."""
+import operator
+from itertools import islice
+
+operators = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "in": lambda value, values: value in values,
+    "between": lambda value, bounds: bounds[0] <= value <= bounds[1],
+    "contains": lambda value, values: set(values) <= set(value)
+}
+
+
+def sort_key(name):
+    """Return a function giving the sort key of an object by its
+    attribute name, which puts the objects without it, or where it is
+    None, before the others; a descending sort puts them after."""
+    def key(obj):
+        value = getattr(obj, name, None)
+        return (value is not None, value)
+    return key
+
+
+class Query:
+    """Represent a query over the stored objects of one class.
+
+    Conditions are given as keyword arguments <attribute>__<operator>,
+    e.g. price_by_night__lte=150; a bare <attribute> tests equality. The
+    operators are eq, ne, lt, lte, gt, gte, in, between, which takes a
+    (low, high) pair and includes both bounds, and contains, which tests
+    that a list attribute holds every value of a list.
+
+    When the query is iterated, the storage engine is asked how many
+    objects an index can narrow each condition down to, and only the
+    smallest of these sets is gathered and filtered; without a usable
+    index every object of the class is.
+
+    The objects are yielded as they are filtered, unless the query is
+    ordered; like with a dictionary view, the objects must not be stored
+    or deleted meanwhile, except in thread-safe mode, where the storage
+    engine hands out copies of the sets it gathers.
+
+    Objects whose attribute is missing or None sort before the others in
+    ascending order, and after them in descending order.
+
+    Attributes:
+        storage (FileStorage): The storage engine queried.
+        cls_name (str): The name of the class of the objects.
+    """
+
+    def __init__(self, storage, cls):
+        """Initialize a new Query.
+
+        Args:
+            storage (FileStorage): The storage engine to query.
+            cls (type or str): The class of the objects or its name.
+        """
+        self.storage = storage
+        self.cls_name = cls if isinstance(cls, str) else cls.__name__
+        self.__conditions = []
+        self.__order = []
+        self.__limit = None
+
+    def where(self, **conditions):
+        """Return a copy of the query also matching conditions.
+
+        Raises:
+            ValueError: If an operator is unknown.
+        """
+        query = self.__copy()
+        for name, value in conditions.items():
+            attribute, _, op = name.partition("__")
+            op = op or "eq"
+            if op not in operators:
+                raise ValueError(f"unknown operator {op}")
+            query.__conditions.append((attribute, op, value))
+        return query
+
+    def order_by(self, *attributes):
+        """Return a copy of the query sorting the objects by attributes.
+
+        An attribute prefixed with "-" sorts in descending order.
+        """
+        query = self.__copy()
+        query.__order = list(attributes)
+        return query
+
+    def limit(self, count):
+        """Return a copy of the query returning at most count objects."""
+        query = self.__copy()
+        query.__limit = count
+        return query
+
+    def explain(self):
+        """Return a description of how the objects are found."""
+        return self.__plan()[0]
+
+    def __iter__(self):
+        """Yield the objects matching the query."""
+        objs = (obj for obj in self.__plan()[2]().values()
+                if self.__match(obj))
+        for attribute in reversed(self.__order):
+            objs = sorted(objs, key=sort_key(attribute.lstrip("-")),
+                          reverse=attribute.startswith("-"))
+        return islice(objs, self.__limit)
+
+    def all(self):
+        """Return the list of the objects matching the query."""
+        return list(self)
+
+    def count(self):
+        """Return the number of objects matching the query."""
+        return sum(1 for obj in self)
+
+    def first(self):
+        """Return the first object matching the query, or None."""
+        return next(iter(self.limit(1)), None)
+
+    def __copy(self):
+        """Return a copy of the query."""
+        query = Query(self.storage, self.cls_name)
+        query.__conditions = list(self.__conditions)
+        query.__order = list(self.__order)
+        query.__limit = self.__limit
+        return query
+
+    def __plan(self):
+        """Return the description and the size of the smallest set of
+        candidate objects, and a function returning their mapping."""
+        plan = (f"scan {self.cls_name}", self.storage.count(self.cls_name),
+                lambda: self.storage.all(self.cls_name))
+        for attribute, op, value in self.__conditions:
+            found = self.storage._candidates(
+                self.cls_name, attribute, op, value)
+            if found is not None and found[1] < plan[1]:
+                plan = found
+        return plan
+
+    def __match(self, obj):
+        """Return whether obj matches every condition."""
+        for attribute, op, value in self.__conditions:
+            try:
+                if not operators[op](getattr(obj, attribute, None), value):
+                    return False
+            except TypeError:
+                return False
+        return True
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""Defines the SQLiteStorage class."""
+
+import json
+import sqlite3
+from models.engine.file_storage import FileStorage, classes
+
+
+class SQLiteStorage(FileStorage):
+    """Represent a storage engine backed by an SQLite database.
+
+    Objects are kept in memory like with FileStorage; the database has
+    one table per class, with the id and the JSON encoded to_dict() of
+    every object. save() only writes the objects created, modified or
+    deleted since the last save, in one transaction.
+
+    The objects, the changes and the indexes are the class-level state of
+    FileStorage, shared with any FileStorage of the process, and the
+    lookups, queries, transactions and searches are those of FileStorage.
+    Its file options do not apply: the engine reads and writes no
+    storage.json, and the text indexes are built from the objects on the
+    first search instead of being saved next to it.
+
+    Attributes:
+        database (str): The path of the database file.
+    """
+
+    def __init__(self, *, database="storage.db"):
+        """Initialize a new SQLiteStorage.
+
+        Args:
+            database (str): The path of the database file.
+        """
+        super().__init__()
+        self.database = database
+        self.__connection = sqlite3.connect(
+            database, check_same_thread=False)
+        with self.__connection:
+            for name in classes:
+                self.__connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{name}" '
+                    '(id TEXT PRIMARY KEY, data TEXT NOT NULL)')
+
+    def save(self):
+        """Write the changes since the last save to the database, or once
+        the transaction in progress ends."""
+        if self._defer_save():
+            return
+        changes = self._take_changes()
+        try:
+            with self.__connection:
+                for key, obj in changes.items():
+                    cls_name, obj_id = key.split(".", 1)
+                    if obj is None:
+                        self.__connection.execute(
+                            f'DELETE FROM "{cls_name}" WHERE id = ?',
+                            (obj_id,))
+                    else:
+                        self.__connection.execute(
+                            f'INSERT OR REPLACE INTO "{cls_name}" '
+                            'VALUES (?, ?)',
+                            (obj_id, json.dumps(obj.to_dict())))
+        except sqlite3.Error:
+            self._restore_changes(changes)
+            raise
+
+    def _texts_path(self):
+        """Return None: the text indexes are not saved."""
+        return None
+
+    def reload(self):
+        """Load every object of the database into __objects."""
+        for name, cls in classes.items():
+            rows = self.__connection.execute(f'SELECT data FROM "{name}"')
+            for data, in rows:
+                o = json.loads(data)
+                del o["__class__"]
+                self.new(cls(**o))
+        self._take_changes()
+
+    def close(self):
+        """Close the connection to the database."""
+        self.__connection.close()
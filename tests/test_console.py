@@ -10,12 +10,18 @@ Unittest classes:
     TestHBNBCommand_all
     TestHBNBCommand_destroy
     TestHBNBCommand_update
+    TestHBNBCommand_count
+    TestHBNBCommand_search
+    TestHBNBCommand_read_only
 """
 import os
 import sys
 import unittest
 from models import storage
+from models.base_model import BaseModel
 from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
 from console import HBNBCommand
 from io import StringIO
 from unittest.mock import patch
@@ -32,6 +38,11 @@ class TestHBNBCommand_prompting(unittest.TestCase):
             self.assertFalse(HBNBCommand().onecmd(""))
             self.assertEqual("", output.getvalue().strip())
 
+    def test_precmd_refreshes(self):
+        with patch.object(storage, "refresh") as refresh:
+            self.assertEqual("all", HBNBCommand().precmd("all"))
+        refresh.assert_called_once_with()
+
 
 class TestHBNBCommand_help(unittest.TestCase):
     """Unittests for testing help messages of the HBNB command interpreter."""
@@ -71,10 +82,14 @@ class TestHBNBCommand_help(unittest.TestCase):
             self.assertEqual(h, output.getvalue().strip())
 
     def test_help_all(self):
-        h = ("Usage: all or all <class> or <class>.all()\n        "
+        h = ("Usage: all [<class>] [limit=<n>] [after=<key>] or\n       "
+             "<class>.all([limit=<n>], [after=<key>])\n        "
              "Display string representations of all instances of a given class"
              ".\n        If no class is specified, displays all instantiated "
-             "objects.")
+             "objects.\n        Instances are listed in the order of their "
+             "<class>.<id> keys; with\n        limit, at most n of them are "
+             "listed, and after lists the ones\n        following the given "
+             "key (or id, with a class).")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help all"))
             self.assertEqual(h, output.getvalue().strip())
@@ -96,10 +111,20 @@ class TestHBNBCommand_help(unittest.TestCase):
             self.assertFalse(HBNBCommand().onecmd("help update"))
             self.assertEqual(h, output.getvalue().strip())
 
+    def test_help_search(self):
+        h = ("Usage: search <class> <words> or <class>.search(<words>)\n"
+             "        Display string representations of the instances of a "
+             "given class\n        whose text best matches the given words, "
+             "best match first.")
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("help search"))
+            self.assertEqual(h, output.getvalue().strip())
+
     def test_help(self):
         h = ("Documented commands (type help <topic>):\n"
              "========================================\n"
-             "EOF  all  count  create  destroy  help  quit  show  update")
+             "EOF  all  count  create  destroy  help  quit  search  show  "
+             "update")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help"))
             self.assertEqual(h, output.getvalue().strip())
@@ -116,6 +141,13 @@ class TestHBNBCommand_exit(unittest.TestCase):
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertTrue(HBNBCommand().onecmd("EOF"))
 
+    def test_exit_flushes(self):
+        for command in ("quit", "EOF"):
+            with patch("sys.stdout", new=StringIO()):
+                with patch.object(storage, "flush") as flush:
+                    HBNBCommand().onecmd(command)
+            flush.assert_called_once_with()
+
 
 class TestHBNBCommand_create(unittest.TestCase):
     """Unittests for testing create from the HBNB command interpreter."""
@@ -851,6 +883,44 @@ class TestHBNBCommand_all(unittest.TestCase):
             self.assertIn("Review", output.getvalue().strip())
             self.assertNotIn("BaseModel", output.getvalue().strip())
 
+    def test_all_output_is_list(self):
+        FileStorage._FileStorage__objects = {}
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all"))
+            self.assertEqual("[]", output.getvalue().strip())
+        bm = BaseModel()
+        us = User()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all"))
+            self.assertEqual(str([bm.__str__(), us.__str__()]),
+                             output.getvalue().strip())
+
+    def test_all_limit_and_after(self):
+        FileStorage._FileStorage__objects = {}
+        ids = sorted(Place().id for i in range(3))
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all Place limit=2"))
+            found = output.getvalue()
+        self.assertEqual([True, True, False], [i in found for i in ids])
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.all(limit=2, after={})".format(ids[1])))
+            found = output.getvalue()
+        self.assertEqual([False, False, True], [i in found for i in ids])
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "all after=Place.{}".format(ids[0])))
+            found = output.getvalue()
+        self.assertEqual([False, True, True], [i in found for i in ids])
+
+    def test_all_invalid_option(self):
+        for command in ["all Place limit=x", "all Place size=2",
+                        "all Place after=", "all after=1234"]:
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(command))
+                self.assertEqual("** invalid option **",
+                                 output.getvalue().strip())
+
 
 class TestHBNBCommand_update(unittest.TestCase):
     """Unittests for testing update from the HBNB command interpreter."""
@@ -1566,5 +1636,130 @@ class TestHBNBCommand_count(unittest.TestCase):
             self.assertEqual("1", output.getvalue().strip())
 
 
+class TestHBNBCommand_search(unittest.TestCase):
+    """Unittests for testing search method of HBNB comand interpreter."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        for path in ("storage.json", "storage.json.fts"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+
+    def create_review(self, text):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("create Review"))
+            review_id = output.getvalue().strip()
+        command = 'update Review {} text "{}"'.format(review_id, text)
+        self.assertFalse(HBNBCommand().onecmd(command))
+        return review_id
+
+    def test_search_missing_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search"))
+            self.assertEqual("** class name missing **",
+                             output.getvalue().strip())
+
+    def test_search_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search MyModel great"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_search_missing_words(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search Review"))
+            self.assertEqual("** search words missing **",
+                             output.getvalue().strip())
+
+    def test_search_class_without_text(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search User great"))
+            self.assertEqual("** class can't be searched **",
+                             output.getvalue().strip())
+
+    def test_search(self):
+        great = self.create_review("Great stay, great host")
+        quiet = self.create_review("Quiet and great")
+        self.create_review("Too noisy")
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search Review great"))
+            found = output.getvalue()
+        self.assertLess(found.index(great), found.index(quiet))
+        self.assertNotIn("noisy", found)
+
+    def test_search_dot_notation(self):
+        quiet = self.create_review("Quiet and great")
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                'Review.search("quiet place")'))
+            self.assertIn(quiet, output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd('Review.search("noisy")'))
+            self.assertEqual("[]", output.getvalue().strip())
+
+
+
+class TestHBNBCommand_read_only(unittest.TestCase):
+    """Unittests for testing the HBNB command interpreter on read-only
+    storage."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.user = User()
+        self.patcher = patch.object(storage, "read_only", True)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def refused(self, command):
+        """Return whether command printed that the storage is read-only."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(command))
+        return output.getvalue().strip() == "** storage is read-only **"
+
+    def test_create(self):
+        self.assertTrue(self.refused("create User"))
+        self.assertEqual(1, storage.count(User))
+
+    def test_destroy(self):
+        self.assertTrue(self.refused("destroy User " + self.user.id))
+        self.assertIs(self.user, storage.get(User, self.user.id))
+
+    def test_update(self):
+        self.assertTrue(self.refused(
+            "update User {} first_name Betty".format(self.user.id)))
+        self.assertNotIn("first_name", self.user.__dict__)
+
+    def test_checks_arguments_first(self):
+        self.assertFalse(self.refused("create MyModel"))
+        self.assertFalse(self.refused("destroy User 1234"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -4,13 +4,18 @@ Unittest classes:
     TestBaseModel_instantiation
     TestBaseModel_save
     TestBaseModel_to_dict
+    TestBaseModel_create_many
 """
 import os
+import json
+import uuid
 import models
 import unittest
+from unittest.mock import patch
 from datetime import datetime
 from time import sleep
-from models.base_model import BaseModel
+from models.base_model import BaseModel, uuid4_strings
+from models.place import Place
 
 
 class TestBaseModel_instantiation(unittest.TestCase):
@@ -84,6 +89,30 @@ class TestBaseModel_instantiation(unittest.TestCase):
         self.assertEqual(bm.created_at, dt)
         self.assertEqual(bm.updated_at, dt)
 
+    def test_stored_flag(self):
+        bm = BaseModel()
+        self.assertTrue(bm._stored)
+        self.assertNotIn("_stored", bm.__dict__)
+        self.assertNotIn("_stored", bm.to_dict())
+        models.storage.delete(bm)
+        self.assertFalse(bm._stored)
+
+    def test_assignment_not_stored_skips_touch(self):
+        dt_iso = datetime.today().isoformat()
+        bm = BaseModel(id="345", created_at=dt_iso, updated_at=dt_iso)
+        self.assertFalse(bm._stored)
+        with patch.object(models.storage, "touch") as touch:
+            bm.name = "School"
+            BaseModel(id="346", created_at=dt_iso, updated_at=dt_iso)
+        touch.assert_not_called()
+        self.assertEqual(bm.name, "School")
+
+    def test_assignment_stored_touches(self):
+        bm = BaseModel()
+        with patch.object(models.storage, "touch") as touch:
+            bm.name = "School"
+        touch.assert_called_once_with(bm, "name")
+
 
 class TestBaseModel_save(unittest.TestCase):
     """Unittests for testing save method of the BaseModel class."""
@@ -136,6 +165,14 @@ class TestBaseModel_save(unittest.TestCase):
         with open("storage.json", "r") as f:
             self.assertIn(bmid, f.read())
 
+    def test_save_does_not_restore_deleted(self):
+        bm = BaseModel()
+        models.storage.delete(bm)
+        bm.save()
+        self.assertIsNone(models.storage.get(BaseModel, bm.id))
+        with open("storage.json", "r") as f:
+            self.assertNotIn("BaseModel." + bm.id, f.read())
+
 
 class TestBaseModel_to_dict(unittest.TestCase):
     """Unittests for testing to_dict method of the BaseModel class."""
@@ -187,5 +224,79 @@ class TestBaseModel_to_dict(unittest.TestCase):
             bm.to_dict(None)
 
 
+class TestBaseModel_create_many(unittest.TestCase):
+    """Unittests for testing create_many method of the BaseModel class."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        models.storage.drop_range(Place, "price_by_night")
+
+    def test_uuid4_strings(self):
+        ids = uuid4_strings(100)
+        self.assertEqual(100, len(set(ids)))
+        for obj_id in ids:
+            self.assertEqual(4, uuid.UUID(obj_id).version)
+            self.assertEqual(uuid.RFC_4122, uuid.UUID(obj_id).variant)
+            self.assertEqual(obj_id, str(uuid.UUID(obj_id)))
+        self.assertEqual([], uuid4_strings(0))
+
+    def test_records(self):
+        places = Place.create_many([{"name": "Loft"}, {"name": "Cabin"}])
+        self.assertEqual(["Loft", "Cabin"], [p.name for p in places])
+        self.assertEqual(places[0].created_at, places[1].updated_at)
+        self.assertEqual(datetime, type(places[0].created_at))
+        self.assertIs(places[1], models.storage.get(Place, places[1].id))
+        self.assertIn("Place." + places[0].id, models.storage.all(Place))
+
+    def test_records_from_to_dict(self):
+        loft = Place(name="Loft", created_at="2017-09-28T21:05:54.119427",
+                     updated_at="2017-09-28T21:05:54.119572")
+        copy, = Place.create_many([loft.to_dict()])
+        self.assertNotIn("__class__", copy.__dict__)
+        self.assertEqual(loft.created_at, copy.created_at)
+        self.assertEqual(loft.updated_at, copy.updated_at)
+        self.assertEqual(loft.to_dict(), copy.to_dict())
+
+    def test_columns(self):
+        models.storage.index_range(Place, "price_by_night")
+        places = Place.create_many(name=["Loft", "Cabin"],
+                                   price_by_night=[80, 120])
+        self.assertEqual([80, 120], [p.price_by_night for p in places])
+        found = models.storage.lookup_range(Place, "price_by_night",
+                                            100, 200)
+        self.assertEqual([places[1]], list(found.values()))
+        with self.assertRaises(ValueError):
+            Place.create_many(name=["Loft"], price_by_night=[80, 120])
+
+    def test_saves_once(self):
+        with patch.object(models.storage, "save") as save:
+            places = Place.create_many([{}] * 3)
+        save.assert_called_once_with()
+        models.storage.save()
+        with open("storage.json", "r") as f:
+            saved = json.load(f)
+        for place in places:
+            self.assertEqual(place.to_dict(), saved["Place." + place.id])
+
+    def test_instances_follow_changes(self):
+        place, = Place.create_many([{"name": "Loft"}])
+        place.city_id = "c1"
+        self.assertEqual([place], list(models.storage.lookup(
+            Place, "city_id", "c1").values()))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/async_storage.py.
+
+Unittest classes:
+    TestAsyncStorage
+"""
+import os
+import json
+import asyncio
+import models
+import threading
+import unittest
+from unittest.mock import patch
+from models.engine.async_storage import AsyncStorage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+
+
+class TestAsyncStorage(unittest.TestCase):
+    """Unittests for testing the AsyncStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(thread_safe=True)
+        self.patcher = patch.object(models, "storage", self.storage)
+        self.patcher.start()
+        self.storage_async = AsyncStorage(self.storage, batch=2)
+
+    def tearDown(self):
+        self.patcher.stop()
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def saved(self):
+        """Return the records of storage.json."""
+        with open("storage.json", "r") as f:
+            return json.load(f)
+
+    def test_needs_thread_safe_storage(self):
+        with self.assertRaises(ValueError):
+            AsyncStorage(FileStorage())
+
+    def test_asave(self):
+        user = User()
+        asyncio.run(self.storage_async.asave())
+        self.assertEqual(["User." + user.id], list(self.saved()))
+
+    def test_asave_obj(self):
+        user = User()
+        updated_at = user.updated_at
+        asyncio.run(self.storage_async.asave(user))
+        self.assertLess(updated_at, user.updated_at)
+        self.assertEqual(user.updated_at.isoformat(),
+                         self.saved()["User." + user.id]["updated_at"])
+
+    def test_asave_obj_does_not_restore_deleted(self):
+        user, kept = User(), User()
+        self.storage.delete(user)
+        asyncio.run(self.storage_async.asave(user))
+        self.assertIsNone(self.storage.get(User, user.id))
+        self.assertEqual(["User." + kept.id], list(self.saved()))
+
+    def test_asave_runs_off_the_loop(self):
+        threads = []
+        save = self.storage.save
+
+        def record():
+            threads.append(threading.get_ident())
+            save()
+
+        with patch.object(self.storage, "save", side_effect=record):
+            asyncio.run(self.storage_async.asave())
+        self.assertNotEqual([threading.get_ident()], threads)
+
+    def test_asave_coalesces(self):
+        async def create():
+            User()
+            await self.storage_async.asave()
+
+        async def main():
+            await asyncio.gather(*(create() for i in range(10)))
+
+        save = self.storage.save
+        with patch.object(self.storage, "save", side_effect=save) as mock:
+            asyncio.run(main())
+        self.assertLessEqual(mock.call_count, 2)
+        self.assertEqual(10, len(self.saved()))
+
+    def test_asave_after_write_saves_again(self):
+        async def main():
+            User()
+            first = asyncio.ensure_future(self.storage_async.asave())
+            await asyncio.sleep(0)
+            Place()
+            await self.storage_async.asave()
+            await first
+
+        asyncio.run(main())
+        self.assertEqual(2, len(self.saved()))
+
+    def test_asave_failure(self):
+        User()
+        with patch.object(self.storage, "save", side_effect=OSError):
+            with self.assertRaises(OSError):
+                asyncio.run(self.storage_async.asave())
+        asyncio.run(self.storage_async.asave())
+        self.assertEqual(1, len(self.saved()))
+
+    def test_areload(self):
+        user = User()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        asyncio.run(self.storage_async.areload())
+        self.assertEqual(user.id, self.storage.get(User, user.id).id)
+
+    def test_aiter(self):
+        places = sorted((Place() for i in range(5)), key=lambda p: p.id)
+        User()
+
+        async def collect(*args):
+            return [obj async for obj in self.storage_async.aiter(*args)]
+
+        self.assertEqual(places, asyncio.run(collect(Place)))
+        self.assertEqual(places[3:],
+                         asyncio.run(collect(Place, "Place." + places[2].id)))
+        self.assertEqual(6, len(asyncio.run(collect())))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/bitmap.py.
+
+Unittest classes:
+    TestBitmapIndex
+    TestFileStorage_bitmap
+"""
+import os
+import models
+import unittest
+from models.engine.bitmap import BitmapIndex
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def place(i, amenity_ids):
+    """Return a Place with amenity_ids that is not stored."""
+    return Place(id=str(i), amenity_ids=amenity_ids)
+
+
+class TestBitmapIndex(unittest.TestCase):
+    """Unittests for testing the BitmapIndex class."""
+
+    def setUp(self):
+        self.index = BitmapIndex("Place", "amenity_ids")
+        for i, ids in enumerate([["wifi", "pool"], ["wifi"],
+                                 ["wifi", "pool", "kitchen"], []]):
+            self.index.add(f"Place.{i}", place(i, ids))
+
+    def test_objects(self):
+        self.assertEqual(["Place.0", "Place.2"],
+                         sorted(self.index.objects(["wifi", "pool"])))
+        self.assertEqual(["Place.2"],
+                         list(self.index.objects(["pool", "kitchen"])))
+        self.assertEqual({}, self.index.objects(["wifi", "sauna"]))
+        self.assertEqual(3, len(self.index.objects()))
+
+    def test_facets(self):
+        self.assertEqual({"wifi": 3, "pool": 2, "kitchen": 1},
+                         self.index.facets())
+        self.assertEqual({"wifi": 2, "pool": 2, "kitchen": 1},
+                         self.index.facets(["pool"]))
+        self.assertEqual({}, self.index.facets(["sauna"]))
+
+    def test_discard_reuses_slot(self):
+        self.index.discard("Place.0")
+        self.assertEqual(["Place.2"], list(self.index.objects(["pool"])))
+        self.index.add("Place.9", place(9, ["pool"]))
+        self.assertEqual(["Place.2", "Place.9"],
+                         sorted(self.index.objects(["pool"])))
+        self.assertEqual(3, len(self.index.objects()))
+
+    def test_skips_other_objects(self):
+        self.index.add("Place.a", place("a", "wifi"))
+        self.index.add("Place.b", place("b", []))
+        self.assertEqual(3, len(self.index.objects()))
+        self.assertNotIn("Place.b", self.index.objects())
+
+    def test_add_many(self):
+        index = BitmapIndex("Place", "amenity_ids")
+        index.add("Place.1", place(1, ["wifi"]))
+        index.discard("Place.1")
+        index.add_many((f"Place.{i}", place(i, ["wifi", str(i % 3)]))
+                       for i in range(2, 40))
+        self.assertEqual(38, len(index.objects(["wifi"])))
+        self.assertEqual(sorted(f"Place.{i}" for i in range(2, 40, 3)),
+                         sorted(index.objects(["2"])))
+        self.assertEqual({"wifi": 38, "0": 13, "1": 12, "2": 13},
+                         index.facets())
+        index.add("Place.40", place(40, ["pool"]))
+        self.assertEqual(39, len(index.objects()))
+
+
+class TestFileStorage_bitmap(unittest.TestCase):
+    """Unittests for testing the amenity lookups of FileStorage."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.loft = Place()
+        self.loft.amenity_ids = ["wifi", "pool"]
+        self.cabin = Place()
+        self.cabin.amenity_ids = ["wifi"]
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_lookup_every(self):
+        objs = models.storage.lookup_every(Place, "amenity_ids",
+                                           ["pool", "wifi"])
+        self.assertEqual([self.loft], list(objs.values()))
+        bare = Place()
+        objs = models.storage.lookup_every(Place, "amenity_ids", [])
+        self.assertEqual([self.loft, self.cabin, bare], list(objs.values()))
+
+    def test_facet_counts(self):
+        self.assertEqual({"wifi": 2, "pool": 1},
+                         models.storage.facet_counts(Place, "amenity_ids"))
+
+    def test_follows_assignment_and_delete(self):
+        self.cabin.amenity_ids = ["pool"]
+        self.assertEqual({"wifi": 1, "pool": 2},
+                         models.storage.facet_counts("Place", "amenity_ids"))
+        models.storage.delete(self.loft)
+        self.assertEqual({"pool": 1},
+                         models.storage.facet_counts("Place", "amenity_ids"))
+
+    def test_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.lookup_every(Place, "name", ["x"])
+
+    def test_query_contains(self):
+        query = models.storage.query(Place).where(
+            amenity_ids__contains=["wifi", "pool"])
+        self.assertEqual("bitmap Place.amenity_ids", query.explain())
+        self.assertEqual([self.loft], query.all())
+
+
+if __name__ == "__main__":
+    unittest.main()
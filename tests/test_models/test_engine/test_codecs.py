@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/codecs.py.
+
+Unittest classes:
+    TestJSONCodec
+    TestBinaryCodec
+"""
+import io
+import json
+import unittest
+from datetime import datetime
+from models.engine.codecs import JSONCodec, BinaryCodec, codecs
+
+
+def file_of(codec, records):
+    """Return a binary file holding records written by codec."""
+    f = io.BytesIO()
+    codec.write(f, records)
+    return io.BufferedReader(io.BytesIO(f.getvalue()))
+
+
+class TestJSONCodec(unittest.TestCase):
+    """Unittests for testing the JSONCodec class."""
+
+    def setUp(self):
+        self.codec = JSONCodec()
+        self.record = {"id": "1", "__class__": "Place", "max_guest": 4}
+
+    def test_round_trip(self):
+        fragment = self.codec.encode(self.record)
+        self.assertEqual(bytes, type(fragment))
+        self.assertEqual(self.record, self.codec.decode(fragment))
+
+    def test_write_is_json(self):
+        fragment = self.codec.encode(self.record)
+        f = file_of(self.codec, [("Place.1", fragment)])
+        self.assertEqual({"Place.1": self.record}, json.load(f))
+
+    def test_read_gives_positions(self):
+        fragment = self.codec.encode(self.record)
+        f = io.BytesIO()
+        positions = self.codec.write(f, [("Place.1", fragment)])
+        data = f.getvalue()
+        offset, length = positions[0]
+        self.assertEqual(fragment, data[offset:offset + length])
+        records = list(self.codec.read(io.BufferedReader(io.BytesIO(data))))
+        self.assertEqual([("Place.1", offset, fragment)], records)
+
+    def test_read_other_layout(self):
+        f = io.BufferedReader(io.BytesIO(
+            json.dumps({"Place.1": self.record}).encode()))
+        key, offset, fragment = next(self.codec.read(f))
+        self.assertEqual("Place.1", key)
+        self.assertIsNone(offset)
+        self.assertEqual(self.record, self.codec.decode(fragment))
+
+
+class TestBinaryCodec(unittest.TestCase):
+    """Unittests for testing the BinaryCodec class."""
+
+    def setUp(self):
+        self.codec = BinaryCodec()
+        now = datetime.today()
+        self.record = {
+            "id": "1", "__class__": "Place", "name": "Chez été",
+            "max_guest": 4, "latitude": 37.77, "amenity_ids": ["a", "b"],
+            "flag": True, "empty": None, "big": 2 ** 70,
+            "created_at": now.isoformat(),
+            "updated_at": now.replace(microsecond=0).isoformat()
+        }
+
+    def test_codecs(self):
+        self.assertIs(BinaryCodec, codecs["binary"])
+        self.assertIs(JSONCodec, codecs["json"])
+
+    def test_round_trip(self):
+        fragment = self.codec.encode(self.record)
+        self.assertEqual(self.record, self.codec.decode(fragment))
+
+    def test_smaller_than_json(self):
+        self.assertLess(len(self.codec.encode(self.record)),
+                        len(JSONCodec().encode(self.record)))
+
+    def test_string_table(self):
+        self.codec.encode(self.record)
+        self.assertIn("Place", self.codec.strings)
+        self.assertIn("max_guest", self.codec.strings)
+        self.assertNotIn("1", self.codec.strings)
+
+    def test_read(self):
+        fragment = self.codec.encode(self.record)
+        f = file_of(self.codec, [("Place.1", fragment)])
+        other = BinaryCodec()
+        [(key, offset, read)] = list(other.read(f))
+        self.assertEqual("Place.1", key)
+        self.assertIsNotNone(offset)
+        self.assertEqual(self.record, other.decode(read))
+
+    def test_read_with_other_table(self):
+        fragment = self.codec.encode(self.record)
+        f = file_of(self.codec, [("Place.1", fragment)])
+        other = BinaryCodec()
+        other.encode({"unrelated": 1})
+        [(key, offset, read)] = list(other.read(f))
+        self.assertIsNone(offset)
+        self.assertEqual(self.record, other.decode(read))
+
+    def test_read_not_binary(self):
+        f = io.BufferedReader(io.BytesIO(b"{\n}\n"))
+        with self.assertRaises(ValueError):
+            list(self.codec.read(f))
+
+
+if __name__ == "__main__":
+    unittest.main()
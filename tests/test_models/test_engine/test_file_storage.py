@@ -4,12 +4,35 @@
 Unittest classes:
     TestFileStorage_instantiation
     TestFileStorage_methods
+    TestFileStorage_journal
+    TestFileStorage_changes
+    TestFileStorage_class_index
+    TestFileStorage_foreign_keys
+    TestFileStorage_range_index
+    TestFileStorage_iter
+    TestFileStorage_lazy
+    TestFileStorage_sharded
+    TestFileStorage_binary
+    TestFileStorage_read_only
+    TestFileStorage_atomic_save
+    TestFileStorage_thread_safe
+    TestFileStorage_shared
+    TestFileStorage_write_behind
+    TestFileStorage_transaction
+    TestFileStorage_intern
 """
 import os
 import json
+import sys
+import functools
+import time
+import mmap
 import models
+import multiprocessing
+import threading
 import unittest
 from datetime import datetime
+from unittest.mock import patch
 from models.base_model import BaseModel
 from models.engine.file_storage import FileStorage
 from models.user import User
@@ -20,6 +43,45 @@ from models.amenity import Amenity
 from models.review import Review
 
 
+def file_only(test):
+    """Decorate a test that only applies to storage engines keeping the
+    objects in storage.json."""
+    @functools.wraps(test)
+    def run(self):
+        if not self.files:
+            self.skipTest("the storage engine keeps no storage.json")
+        return test(self)
+    return run
+
+
+class StorageTestCase(unittest.TestCase):
+    """Runs its tests with models.storage set to the storage engine
+    make_storage() returns, so that the storage engines other than
+    FileStorage can run them too.
+
+    Attributes:
+        files (bool): Whether the storage engine keeps the objects in
+            storage.json.
+    """
+
+    files = True
+
+    def make_storage(self):
+        """Return the storage engine the tests run against."""
+        return models.storage
+
+    def run(self, result=None):
+        """Run the test with models.storage set to make_storage()."""
+        self.engine = self.make_storage()
+        with patch.object(models, "storage", self.engine):
+            return super().run(result)
+
+    def saved(self):
+        """Return the records the storage engine saved, by key."""
+        with open("storage.json", "r") as f:
+            return json.load(f)
+
+
 class TestFileStorage_instantiation(unittest.TestCase):
     """Unittests for testing instantiation of the FileStorage class."""
 
@@ -40,7 +102,7 @@ class TestFileStorage_instantiation(unittest.TestCase):
         self.assertEqual(type(models.storage), FileStorage)
 
 
-class TestFileStorage_methods(unittest.TestCase):
+class TestFileStorage_methods(StorageTestCase):
     """Unittests for testing methods of the FileStorage class."""
 
     @classmethod
@@ -66,8 +128,11 @@ class TestFileStorage_methods(unittest.TestCase):
         self.assertEqual(dict, type(models.storage.all()))
 
     def test_all_with_arg(self):
+        self.assertIs(models.storage.all(), models.storage.all(None))
+
+    def test_all_with_two_args(self):
         with self.assertRaises(TypeError):
-            models.storage.all(None)
+            models.storage.all(User, None)
 
     def test_new(self):
         bm = BaseModel()
@@ -119,16 +184,14 @@ class TestFileStorage_methods(unittest.TestCase):
         models.storage.new(am)
         models.storage.new(rv)
         models.storage.save()
-        save_text = ""
-        with open("storage.json", "r") as f:
-            save_text = f.read()
-            self.assertIn("BaseModel." + bm.id, save_text)
-            self.assertIn("User." + us.id, save_text)
-            self.assertIn("State." + st.id, save_text)
-            self.assertIn("Place." + pl.id, save_text)
-            self.assertIn("City." + cy.id, save_text)
-            self.assertIn("Amenity." + am.id, save_text)
-            self.assertIn("Review." + rv.id, save_text)
+        saved = self.saved()
+        self.assertIn("BaseModel." + bm.id, saved)
+        self.assertIn("User." + us.id, saved)
+        self.assertIn("State." + st.id, saved)
+        self.assertIn("Place." + pl.id, saved)
+        self.assertIn("City." + cy.id, saved)
+        self.assertIn("Amenity." + am.id, saved)
+        self.assertIn("Review." + rv.id, saved)
 
     def test_save_with_arg(self):
         with self.assertRaises(TypeError):
@@ -160,10 +223,1421 @@ class TestFileStorage_methods(unittest.TestCase):
         self.assertIn("Amenity." + am.id, objs)
         self.assertIn("Review." + rv.id, objs)
 
+    def test_get(self):
+        us = User()
+        self.assertIs(us, models.storage.get(User, us.id))
+        self.assertIs(us, models.storage.get("User", us.id))
+
+    def test_get_missing(self):
+        self.assertIsNone(models.storage.get("User", "missing"))
+
+    @file_only
+    def test_reload_reads_one_record_at_a_time(self):
+        us = User()
+        us.first_name = "Betty"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        with patch("json.load") as load:
+            FileStorage().reload()
+        load.assert_not_called()
+        us = FileStorage._FileStorage__objects["User." + us.id]
+        self.assertEqual("Betty", us.first_name)
+        self.assertEqual(datetime, type(us.created_at))
+
+    @file_only
+    def test_reload_other_json_layouts(self):
+        bm = BaseModel()
+        for indent in (None, 4):
+            with open("storage.json", "w") as f:
+                json.dump({"BaseModel." + bm.id: bm.to_dict()}, f,
+                          indent=indent)
+            FileStorage._FileStorage__objects = {}
+            models.storage.reload()
+            self.assertIn("BaseModel." + bm.id,
+                          FileStorage._FileStorage__objects)
+
     def test_reload_with_arg(self):
         with self.assertRaises(TypeError):
             models.storage.reload(None)
 
 
+class TestFileStorage_journal(unittest.TestCase):
+    """Unittests for testing the journal mode of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(journal=True)
+
+    def tearDown(self):
+        for path in ("storage.json", "storage.json.log"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_appends_to_log(self):
+        bm = BaseModel()
+        self.storage.save()
+        self.assertFalse(os.path.exists("storage.json"))
+        with open("storage.json.log", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(1, len(lines))
+        self.assertIn("BaseModel." + bm.id, lines[0])
+
+    def test_save_appends_only_changes(self):
+        BaseModel()
+        self.storage.save()
+        us = User()
+        self.storage.save()
+        with open("storage.json.log", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(2, len(lines))
+        self.assertIn("User." + us.id, lines[1])
+
+    def test_reload_replays_log(self):
+        bm = BaseModel()
+        us = User()
+        self.storage.save()
+        bm.name = "Holberton"
+        bm.save()
+        self.storage.delete(us)
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        objs = self.storage.all()
+        self.assertEqual("Holberton", objs["BaseModel." + bm.id].name)
+        self.assertNotIn("User." + us.id, objs)
+
+    def test_reload_ignores_torn_record(self):
+        bm = BaseModel()
+        self.storage.save()
+        with open("storage.json.log", "a") as f:
+            f.write('{"op": "put", "key": "User.')
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertIn("BaseModel." + bm.id, self.storage.all())
+
+    def test_compaction(self):
+        self.storage.compact_threshold = 0
+        bm = BaseModel()
+        self.storage.save()
+        self.assertFalse(os.path.exists("storage.json.log"))
+        with open("storage.json", "r") as f:
+            self.assertIn("BaseModel." + bm.id, json.load(f))
+
+    def test_snapshot_save_clears_log(self):
+        BaseModel()
+        self.storage.save()
+        FileStorage().save()
+        self.assertFalse(os.path.exists("storage.json.log"))
+
+    def test_delete(self):
+        bm = BaseModel()
+        self.storage.delete(bm)
+        self.assertNotIn("BaseModel." + bm.id, self.storage.all())
+
+
+class TestFileStorage_changes(unittest.TestCase):
+    """Unittests for testing change tracking of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_new_object_is_changed(self):
+        bm = BaseModel()
+        changes = FileStorage._FileStorage__changes
+        self.assertIs(bm, changes["BaseModel." + bm.id])
+
+    def test_attribute_assignment_marks_changed(self):
+        bm = BaseModel()
+        models.storage.save()
+        bm.name = "Holberton"
+        changes = FileStorage._FileStorage__changes
+        self.assertIn("BaseModel." + bm.id, changes)
+
+    def test_save_clears_changes(self):
+        BaseModel()
+        models.storage.save()
+        self.assertEqual({}, FileStorage._FileStorage__changes)
+
+    def test_save_encodes_only_changed_objects(self):
+        bm = BaseModel()
+        us = User()
+        models.storage.save()
+        us.first_name = "Betty"
+        with patch.object(BaseModel, "to_dict", autospec=True,
+                          side_effect=BaseModel.to_dict) as to_dict:
+            models.storage.save()
+        self.assertEqual([((us,), {})], to_dict.call_args_list)
+        with open("storage.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual("Betty", saved["User." + us.id]["first_name"])
+        self.assertIn("BaseModel." + bm.id, saved)
+
+    def test_save_drops_deleted_objects(self):
+        bm = BaseModel()
+        models.storage.save()
+        models.storage.delete(bm)
+        models.storage.save()
+        with open("storage.json", "r") as f:
+            self.assertNotIn("BaseModel." + bm.id, json.load(f))
+
+    def test_touch_saves_changes_in_place(self):
+        pl = Place()
+        pl.amenity_ids = ["a"]
+        models.storage.save()
+        pl.amenity_ids.append("b")
+        pl.__dict__["name"] = "direct"
+        models.storage.touch(pl)
+        models.storage.save()
+        with open("storage.json", "r") as f:
+            saved = json.load(f)["Place." + pl.id]
+        self.assertEqual(["a", "b"], saved["amenity_ids"])
+        self.assertEqual("direct", saved["name"])
+
+
+class TestFileStorage_class_index(StorageTestCase):
+    """Unittests for testing the class index of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+
+    def test_all_cls(self):
+        bm = BaseModel()
+        us = User()
+        self.assertEqual({"User." + us.id: us}, dict(models.storage.all(User)))
+        self.assertEqual(["BaseModel." + bm.id],
+                         list(models.storage.all("BaseModel")))
+        self.assertEqual({}, dict(models.storage.all("MyModel")))
+
+    def test_all_cls_is_read_only(self):
+        User()
+        with self.assertRaises(TypeError):
+            models.storage.all(User)["User.1"] = None
+
+    def test_count(self):
+        BaseModel()
+        User()
+        User()
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(2, models.storage.count(User))
+        self.assertEqual(1, models.storage.count("BaseModel"))
+        self.assertEqual(0, models.storage.count("MyModel"))
+
+    def test_count_after_delete(self):
+        us = User()
+        models.storage.delete(us)
+        self.assertEqual(0, models.storage.count(User))
+        self.assertEqual({}, dict(models.storage.all(User)))
+
+    def test_count_does_not_scan(self):
+        for i in range(3):
+            User()
+        with patch.object(FileStorage, "all", side_effect=AssertionError):
+            self.assertEqual(3, models.storage.count(User))
+
+    def test_index_follows_replaced_objects(self):
+        User()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(0, models.storage.count(User))
+        us = User()
+        self.assertEqual(["User." + us.id], list(models.storage.all(User)))
+
+    def test_reload_fills_index(self):
+        us = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(["User." + us.id], list(models.storage.all(User)))
+
+    @file_only
+    def test_lazy_all_cls_loads_one_class(self):
+        bm = BaseModel()
+        us = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(lazy=True)
+        storage.reload()
+        self.assertEqual(1, storage.count(User))
+        self.assertEqual(["User." + us.id], list(storage.all(User)))
+        self.assertIn("BaseModel." + bm.id, FileStorage._FileStorage__unloaded)
+        self.assertEqual(1, storage.count(BaseModel))
+
+
+class TestFileStorage_foreign_keys(StorageTestCase):
+    """Unittests for testing the foreign key indexes of FileStorage."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.st = State()
+        self.cy = City()
+        self.cy.state_id = self.st.id
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+
+    def test_lookup(self):
+        City()
+        cities = models.storage.lookup(City, "state_id", self.st.id)
+        self.assertEqual({"City." + self.cy.id: self.cy}, dict(cities))
+        self.assertEqual({}, dict(models.storage.lookup("Review", "place_id",
+                                                        self.st.id)))
+
+    def test_lookup_follows_assignment(self):
+        other = State()
+        self.cy.state_id = other.id
+        self.assertEqual({}, dict(models.storage.lookup(City, "state_id",
+                                                        self.st.id)))
+        self.assertEqual(["City." + self.cy.id],
+                         list(models.storage.lookup(City, "state_id",
+                                                    other.id)))
+
+    def test_lookup_follows_new(self):
+        self.cy.__dict__["state_id"] = "other"
+        models.storage.new(self.cy)
+        self.assertEqual(["City." + self.cy.id],
+                         list(models.storage.lookup(City, "state_id",
+                                                    "other")))
+
+    def test_lookup_follows_delete(self):
+        models.storage.delete(self.cy)
+        self.assertEqual({}, dict(models.storage.lookup(City, "state_id",
+                                                        self.st.id)))
+
+    def test_lookup_after_reload(self):
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(["City." + self.cy.id],
+                         list(models.storage.lookup(City, "state_id",
+                                                    self.st.id)))
+
+    @file_only
+    def test_lookup_lazy(self):
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(lazy=True)
+        storage.reload()
+        self.assertEqual(["City." + self.cy.id],
+                         list(storage.lookup(City, "state_id", self.st.id)))
+
+    def test_lookup_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.lookup(City, "name", "Tulsa")
+
+    @file_only
+    def test_reload_skips_unhashable_ids(self):
+        models.storage.save()
+        with open("storage.json", "r") as f:
+            saved = json.load(f)
+        saved["City." + self.cy.id]["state_id"] = ["x"]
+        with open("storage.json", "w") as f:
+            json.dump(saved, f)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(1, models.storage.count(City))
+        self.assertEqual({}, dict(models.storage.lookup(City, "state_id",
+                                                        self.st.id)))
+        found = models.storage.query(City).where(state_id=["x"]).all()
+        self.assertEqual([self.cy.id], [c.id for c in found])
+        self.cy = models.storage.get(City, self.cy.id)
+        self.cy.state_id = self.st.id
+        self.assertEqual(1, len(models.storage.lookup(City, "state_id",
+                                                      self.st.id)))
+
+
+class TestFileStorage_range_index(unittest.TestCase):
+    """Unittests for testing the range indexes of FileStorage."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        models.storage.index_range(Place, "price_by_night")
+        self.places = []
+        for price in [150, 50, 100, 100, 200]:
+            pl = Place()
+            pl.price_by_night = price
+            self.places.append(pl)
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        models.storage.drop_range(Place, "price_by_night")
+        models.storage.drop_range(State, "population")
+
+    def prices(self, *args, **kwargs):
+        objs = models.storage.lookup_range(Place, "price_by_night",
+                                           *args, **kwargs)
+        return [obj.price_by_night for obj in objs.values()]
+
+    def test_lookup_range(self):
+        self.assertEqual([100, 100, 150], self.prices(100, 150))
+        self.assertEqual([50, 100, 100, 150, 200], self.prices())
+        self.assertEqual([150, 200], self.prices(low=120))
+        self.assertEqual([50], self.prices(high=99))
+        self.assertEqual([], self.prices(300))
+
+    def test_lookup_range_exclusive(self):
+        self.assertEqual([150], self.prices(100, 200, include_low=False,
+                                            include_high=False))
+
+    def test_lookup_range_follows_assignment(self):
+        self.places[1].price_by_night = 500
+        self.assertEqual([100, 100, 150, 200, 500], self.prices())
+
+    def test_lookup_range_follows_delete(self):
+        models.storage.delete(self.places[0])
+        self.assertEqual([100, 100], self.prices(100, 150))
+
+    def test_lookup_range_skips_non_numbers(self):
+        self.places[0].price_by_night = "150"
+        self.assertEqual([50, 100, 100, 200], self.prices())
+
+    def test_lookup_range_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.lookup_range(Place, "latitude", 0, 1)
+        with self.assertRaises(KeyError):
+            models.storage.lookup_range(Place, "number_bathrooms", 0, 1)
+
+    def test_lookup_range_is_a_view(self):
+        objs = models.storage.lookup_range(Place, "price_by_night", 100, 150)
+        self.assertEqual(3, len(objs))
+        self.assertIs(self.places[0], objs["Place." + self.places[0].id])
+        with self.assertRaises(KeyError):
+            objs["Place." + self.places[1].id]
+        self.places[1].price_by_night = 120
+        self.assertEqual(4, len(objs))
+        self.assertIn("Place." + self.places[1].id, objs)
+        with self.assertRaises(RuntimeError):
+            for key in objs:
+                Place().price_by_night = 110
+
+    def test_index_range(self):
+        st = State()
+        st.population = 10
+        models.storage.index_range(State, "population")
+        self.assertEqual([st], list(models.storage.lookup_range(
+            "State", "population", 5, 15).values()))
+        st.population = 20
+        self.assertEqual({}, models.storage.lookup_range(
+            "State", "population", 5, 15))
+
+    def test_drop_range(self):
+        index = FileStorage._FileStorage__ranges[(
+            "Place", "price_by_night")]
+        models.storage.drop_range(Place, "price_by_night")
+        self.assertNotIn(index, FileStorage._FileStorage__indexes)
+        with self.assertRaises(KeyError):
+            self.prices()
+        self.places[0].price_by_night = 10
+        models.storage.drop_range(Place, "price_by_night")
+        models.storage.index_range(Place, "price_by_night")
+        self.assertEqual([10, 50, 100, 100, 200], self.prices())
+
+
+class TestFileStorage_iter(StorageTestCase):
+    """Unittests for testing iteration over the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.users = sorted((User() for i in range(5)), key=lambda u: u.id)
+        self.bm = BaseModel()
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+
+    def test_iter(self):
+        self.assertEqual([self.bm] + self.users, list(models.storage.iter()))
+        self.assertEqual(self.users, list(models.storage.iter(User)))
+
+    def test_iter_pages(self):
+        page = list(models.storage.iter("User", limit=2))
+        self.assertEqual(self.users[:2], page)
+        after = "User." + page[-1].id
+        page = list(models.storage.iter("User", after=after, limit=2))
+        self.assertEqual(self.users[2:4], page)
+
+    def test_iter_after_across_classes(self):
+        after = "BaseModel." + self.bm.id
+        self.assertEqual(self.users, list(models.storage.iter(after=after)))
+
+    def test_iter_cursor_is_stable(self):
+        after = "User." + self.users[1].id
+        models.storage.delete(self.users[1])
+        models.storage.delete(self.users[3])
+        self.assertEqual([self.users[2], self.users[4]],
+                         list(models.storage.iter(User, after=after)))
+
+    def test_iter_is_lazy(self):
+        it = models.storage.iter(User)
+        self.assertIs(self.users[0], next(it))
+        us = User(id="~")
+        models.storage.new(us)
+        rest = list(it)
+        self.assertEqual(5, len(rest))
+        self.assertIn(us, rest)
+
+    def test_storing_again_does_not_grow_order(self):
+        for i in range(1000):
+            models.storage.new(self.users[0])
+        by_class = FileStorage._FileStorage__by_class
+        pending = by_class._ClassIndex__pending.get("User", {})
+        self.assertLessEqual(len(pending), 5)
+        self.assertEqual(self.users, list(models.storage.iter(User)))
+
+    @file_only
+    def test_iter_lazy_mode(self):
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(lazy=True)
+        storage.reload()
+        storage.get(User, self.users[2].id)
+        page = list(storage.iter(User, limit=3))
+        self.assertEqual([u.id for u in self.users[:3]],
+                         [u.id for u in page])
+        self.assertEqual(3, len(FileStorage._FileStorage__objects))
+
+
+class TestFileStorage_lazy(unittest.TestCase):
+    """Unittests for testing the lazy mode of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.bm = BaseModel()
+        self.us = User()
+        self.us.first_name = "Betty"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(lazy=True)
+        self.storage.reload()
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+
+    def test_reload_builds_no_objects(self):
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertIn("User." + self.us.id,
+                      FileStorage._FileStorage__unloaded)
+
+    def test_count_follows_unloaded_records(self):
+        self.assertEqual(1, self.storage.count(User))
+        self.storage.get(User, self.us.id)
+        self.assertEqual(1, self.storage.count(User))
+        with self.assertRaises(ValueError):
+            with self.storage.transaction():
+                self.storage.new(BaseModel(**self.bm.to_dict()))
+                self.assertEqual(1, self.storage.count(BaseModel))
+                raise ValueError
+        self.assertEqual(1, self.storage.count(BaseModel))
+        self.assertIn("BaseModel." + self.bm.id,
+                      FileStorage._FileStorage__unloaded)
+        self.storage.delete(self.storage.get(BaseModel, self.bm.id))
+        self.assertEqual(0, self.storage.count(BaseModel))
+
+    def test_count_does_not_scan_unloaded_records(self):
+        class Records(dict):
+            def __iter__(self):
+                Records.scans += 1
+                return super().__iter__()
+
+        Records.scans = 0
+        FileStorage._FileStorage__unloaded = Records(
+            FileStorage._FileStorage__unloaded)
+        self.assertEqual(1, self.storage.count(User))
+        self.assertEqual(1, self.storage.count(BaseModel))
+        self.assertEqual(1, Records.scans)
+
+    def test_get_loads_one_object(self):
+        us = self.storage.get(User, self.us.id)
+        self.assertEqual("Betty", us.first_name)
+        self.assertEqual(self.us.created_at, us.created_at)
+        self.assertEqual(["User." + self.us.id],
+                         list(FileStorage._FileStorage__objects))
+
+    def test_all_loads_every_object(self):
+        objs = self.storage.all()
+        self.assertIn("BaseModel." + self.bm.id, objs)
+        self.assertIn("User." + self.us.id, objs)
+        self.assertEqual({}, FileStorage._FileStorage__unloaded)
+
+    def test_save_keeps_unloaded_records(self):
+        bm = self.storage.get(BaseModel, self.bm.id)
+        bm.name = "Holberton"
+        self.storage.save()
+        with open("storage.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual("Holberton", saved["BaseModel." + bm.id]["name"])
+        self.assertEqual("Betty", saved["User." + self.us.id]["first_name"])
+        us = self.storage.get(User, self.us.id)
+        self.assertEqual("Betty", us.first_name)
+
+    def test_reload_legacy_file(self):
+        with open("storage.json", "w") as f:
+            json.dump({"BaseModel." + self.bm.id: self.bm.to_dict()}, f)
+        FileStorage._FileStorage__unloaded = {}
+        self.storage.reload()
+        self.assertIn("BaseModel." + self.bm.id, self.storage.all())
+
+
+class TestFileStorage_sharded(unittest.TestCase):
+    """Unittests for testing the sharded mode of the FileStorage class."""
+
+    shards = ["storage.{}.json".format(name) for name in
+              ("BaseModel", "User", "State", "City", "Amenity", "Place",
+               "Review")]
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(sharded=True)
+
+    def tearDown(self):
+        for path in ["storage.json"] + self.shards:
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+
+    def test_save_writes_one_file_per_class(self):
+        us = User()
+        am = Amenity()
+        self.storage.save()
+        self.assertFalse(os.path.exists("storage.json"))
+        with open("storage.User.json", "r") as f:
+            self.assertEqual(["User." + us.id], list(json.load(f)))
+        with open("storage.Amenity.json", "r") as f:
+            self.assertEqual(["Amenity." + am.id], list(json.load(f)))
+
+    def test_save_rewrites_changed_classes_only(self):
+        User()
+        am = Amenity()
+        self.storage.save()
+        am.name = "Wifi"
+        write = FileStorage._FileStorage__write
+        with patch.object(FileStorage, "_FileStorage__write", autospec=True,
+                          side_effect=write) as mock:
+            self.storage.save()
+        self.assertEqual(["storage.Amenity.json"],
+                         [args[1] for args, kwargs in mock.call_args_list])
+
+    def test_reload(self):
+        us = User()
+        am = Amenity()
+        am.name = "Wifi"
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        objs = self.storage.all()
+        self.assertIn("User." + us.id, objs)
+        self.assertEqual("Wifi", objs["Amenity." + am.id].name)
+
+    def test_reload_lazy(self):
+        us = User()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage(sharded=True, lazy=True).reload()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(us.id, self.storage.get(User, us.id).id)
+
+    def test_reload_single_file(self):
+        us = User()
+        FileStorage().save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertIn("User." + us.id, self.storage.all())
+        self.storage.save()
+        self.assertTrue(os.path.exists("storage.User.json"))
+
+
+class TestFileStorage_binary(unittest.TestCase):
+    """Unittests for testing the FileStorage class with the binary codec."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(codec="binary")
+
+    def tearDown(self):
+        try:
+            os.remove("storage.bin")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+
+    def test_save(self):
+        BaseModel()
+        self.storage.save()
+        self.assertTrue(os.path.exists("storage.bin"))
+        self.assertFalse(os.path.exists("storage.json"))
+
+    def test_reload(self):
+        pl = Place()
+        pl.max_guest = 4
+        pl.amenity_ids = ["wifi"]
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        pl2 = self.storage.all()["Place." + pl.id]
+        self.assertEqual(pl.to_dict(), pl2.to_dict())
+
+    def test_reload_lazy(self):
+        us = User()
+        us.first_name = "Betty"
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage(codec="binary", lazy=True).reload()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual("Betty", self.storage.get(User, us.id).first_name)
+
+
+class TestFileStorage_read_only(unittest.TestCase):
+    """Unittests for testing the read-only mode of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.us = User()
+        self.us.first_name = "Betty"
+        FileStorage().save()
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(read_only=True)
+
+    def tearDown(self):
+        for path in ("storage.json", "storage.json.idx"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+
+    def test_reload_maps_file(self):
+        self.storage.reload()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        source, codec = FileStorage._FileStorage__sources["storage.json"]
+        self.assertEqual(mmap.mmap, type(source))
+        us = self.storage.get(User, self.us.id)
+        self.assertEqual("Betty", us.first_name)
+
+    def test_reload_writes_index(self):
+        self.storage.reload()
+        with open("storage.json.idx", "r") as f:
+            index = json.load(f)
+        self.assertEqual(["User." + self.us.id], index["keys"])
+
+    def test_reload_uses_index(self):
+        self.storage.reload()
+        FileStorage._FileStorage__unloaded = {}
+        with patch.object(self.storage.codec, "read") as read:
+            self.storage.reload()
+        read.assert_not_called()
+        us = self.storage.get(User, self.us.id)
+        self.assertEqual("Betty", us.first_name)
+
+    def test_reload_ignores_stale_index(self):
+        self.storage.reload()
+        bm = BaseModel()
+        FileStorage().save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+        self.storage.reload()
+        self.assertIsNotNone(self.storage.get(BaseModel, bm.id))
+        self.assertIsNotNone(self.storage.get(User, self.us.id))
+
+    def test_save_refused(self):
+        self.storage.reload()
+        with self.assertRaises(PermissionError):
+            self.storage.save()
+
+
+class TestFileStorage_atomic_save(unittest.TestCase):
+    """Unittests for testing atomic saves and group commit."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_failed_save_keeps_file(self):
+        bm = BaseModel()
+        storage = FileStorage()
+        storage.save()
+        User()
+        with patch.object(storage.codec, "write", side_effect=OSError):
+            with self.assertRaises(OSError):
+                storage.save()
+        with open("storage.json", "r") as f:
+            self.assertEqual(["BaseModel." + bm.id], list(json.load(f)))
+        self.assertEqual([], [p for p in os.listdir(".")
+                              if p.endswith(".tmp")])
+
+    def test_durable_save_syncs(self):
+        BaseModel()
+        with patch("os.fsync") as fsync:
+            FileStorage().save()
+        fsync.assert_called()
+        with patch("os.fsync") as fsync:
+            FileStorage(durable=False).save()
+        fsync.assert_not_called()
+
+    def test_group_commit_is_thread_safe(self):
+        self.assertTrue(FileStorage(group_commit=0.01).thread_safe)
+        self.assertFalse(FileStorage().thread_safe)
+
+    def test_group_commit_shares_writes(self):
+        storage = FileStorage(group_commit=0.05)
+        write = FileStorage._FileStorage__save
+        with patch.object(FileStorage, "_FileStorage__save", autospec=True,
+                          side_effect=write) as mock, \
+                patch.object(models, "storage", storage):
+            def create():
+                BaseModel()
+                storage.save()
+            threads = [threading.Thread(target=create) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertLess(mock.call_count, 8)
+        with open("storage.json", "r") as f:
+            self.assertEqual(8, len(json.load(f)))
+
+    def test_group_commit_failure(self):
+        BaseModel()
+        storage = FileStorage(group_commit=0.01)
+        with patch.object(storage.codec, "write", side_effect=OSError):
+            with self.assertRaises(OSError):
+                storage.save()
+        storage.save()
+        self.assertTrue(os.path.exists("storage.json"))
+
+
+class TestFileStorage_thread_safe(unittest.TestCase):
+    """Unittests for testing the thread-safe mode of FileStorage."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(thread_safe=True)
+        self.storage.index_range(Place, "price_by_night")
+        self.patcher = patch.object(models, "storage", self.storage)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage.drop_range(Place, "price_by_night")
+
+    def test_returns_copies(self):
+        place = Place()
+        objs = self.storage.all(Place)
+        Place()
+        self.assertEqual([place], list(objs.values()))
+        self.assertIsNot(FileStorage._FileStorage__objects,
+                         self.storage.all())
+
+    def test_reload(self):
+        place = Place()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(place.id, self.storage.get(Place, place.id).id)
+
+    def test_readers_do_not_wait_for_write(self):
+        Place()
+        writing = threading.Event()
+        done = threading.Event()
+        write = self.storage.codec.write
+
+        def slow_write(f, items):
+            writing.set()
+            done.wait(5)
+            return write(f, items)
+
+        with patch.object(self.storage.codec, "write",
+                          side_effect=slow_write):
+            saver = threading.Thread(target=self.storage.save)
+            saver.start()
+            writing.wait(5)
+            self.assertEqual(1, self.storage.count(Place))
+            Place()
+            self.assertEqual(2, len(self.storage.all()))
+            done.set()
+            saver.join()
+        with open("storage.json", "r") as f:
+            self.assertEqual(1, len(json.load(f)))
+        self.storage.save()
+        with open("storage.json", "r") as f:
+            self.assertEqual(2, len(json.load(f)))
+
+    def test_stress(self):
+        errors = []
+        kept = []
+
+        def work():
+            try:
+                for i in range(100):
+                    place = Place()
+                    place.price_by_night = i
+                    place.description = "quiet loft"
+                    if i % 2:
+                        self.storage.delete(place)
+                    else:
+                        kept.append(place)
+                    if i % 10 == 0:
+                        self.storage.save()
+                    self.storage.lookup_range(Place, "price_by_night",
+                                              0, 50)
+                    self.storage.search(Place, "quiet")
+                    list(self.storage.iter(Place, limit=10))
+            except Exception as error:
+                errors.append(error)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=work) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual([], errors)
+        self.storage.save()
+        keys = sorted("Place." + place.id for place in kept)
+        self.assertEqual(keys, sorted(self.storage.all(Place)))
+        with open("storage.json", "r") as f:
+            self.assertEqual(keys, sorted(json.load(f)))
+        self.assertEqual(400, self.storage.count(Place))
+
+
+def in_process(target):
+    """Run target in a child process with the objects of storage.json,
+    as another process sharing the file would, and wait for it."""
+    def run():
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+        FileStorage._FileStorage__seen = {}
+        storage = FileStorage(shared=True)
+        storage.reload()
+        target(storage)
+    child = multiprocessing.get_context("fork").Process(target=run)
+    child.start()
+    child.join()
+    return child.exitcode
+
+
+class TestFileStorage_shared(unittest.TestCase):
+    """Unittests for testing FileStorage shared by several processes."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__seen = {}
+        FileStorage._FileStorage__stamp = None
+        self.storage = FileStorage(shared=True)
+        self.place = Place()
+        self.user = User()
+        self.storage.save()
+
+    def tearDown(self):
+        for path in ("storage.json", "storage.json.lock"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+        FileStorage._FileStorage__seen = {}
+        FileStorage._FileStorage__stamp = None
+
+    def saved(self):
+        """Return the records of storage.json."""
+        with open("storage.json", "r") as f:
+            return json.load(f)
+
+    def test_journal_rejected(self):
+        with self.assertRaises(ValueError):
+            FileStorage(shared=True, journal=True)
+
+    def test_save_merges(self):
+        def change(storage):
+            storage.get(Place, self.place.id).name = "child"
+            State().name = "new"
+            storage.save()
+        self.assertEqual(0, in_process(change))
+        self.user.first_name = "parent"
+        self.storage.save()
+        saved = self.saved()
+        self.assertEqual(3, len(saved))
+        self.assertEqual("child", saved["Place." + self.place.id]["name"])
+        self.assertEqual("parent",
+                         saved["User." + self.user.id]["first_name"])
+        self.assertEqual("child", self.storage.get(Place, self.place.id).name)
+        self.assertEqual(1, self.storage.count(State))
+
+    def test_own_changes_win(self):
+        def change(storage):
+            storage.get(Place, self.place.id).name = "child"
+            storage.save()
+        self.assertEqual(0, in_process(change))
+        self.place.name = "parent"
+        self.storage.save()
+        self.assertEqual("parent",
+                         self.saved()["Place." + self.place.id]["name"])
+
+    def test_delete_elsewhere(self):
+        def delete(storage):
+            storage.delete(storage.get(User, self.user.id))
+            storage.save()
+        self.assertEqual(0, in_process(delete))
+        self.place.name = "parent"
+        self.storage.save()
+        self.assertEqual(["Place." + self.place.id], list(self.saved()))
+        self.assertIsNone(self.storage.get(User, self.user.id))
+
+    def test_refresh_decodes_changed_records_only(self):
+        def change(storage):
+            storage.get(Place, self.place.id).name = "child"
+            storage.save()
+        self.assertEqual(0, in_process(change))
+        decode = self.storage.codec.decode
+        with patch.object(self.storage.codec, "decode",
+                          side_effect=decode) as mock:
+            self.storage.refresh()
+        self.assertEqual(1, mock.call_count)
+        self.assertEqual("child", self.storage.get(Place, self.place.id).name)
+        self.assertIs(self.user, self.storage.get(User, self.user.id))
+
+    def test_refresh_without_changes(self):
+        with patch.object(self.storage.codec, "read") as read:
+            self.storage.refresh()
+        read.assert_not_called()
+
+    def test_lazy_refresh_moves_unloaded_records(self):
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(shared=True, lazy=True)
+        storage.reload()
+
+        def change(storage):
+            storage.get(Place, self.place.id).name = "a longer name"
+            storage.save()
+        self.assertEqual(0, in_process(change))
+        storage.refresh()
+        self.assertEqual(self.user.id, storage.get(User, self.user.id).id)
+        self.assertEqual("a longer name",
+                         storage.get(Place, self.place.id).name)
+
+    def test_concurrent_saves(self):
+        def create(storage):
+            for i in range(10):
+                Review()
+                storage.save()
+        context = multiprocessing.get_context("fork")
+        children = [context.Process(target=in_process, args=(create,))
+                    for i in range(4)]
+        for child in children:
+            child.start()
+        for child in children:
+            child.join()
+        self.assertEqual(42, len(self.saved()))
+        self.storage.refresh()
+        self.assertEqual(40, self.storage.count(Review))
+
+
+class TestFileStorage_write_behind(unittest.TestCase):
+    """Unittests for testing the write-behind mode of FileStorage."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__changes = {}
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def storage(self, **kwargs):
+        """Return a FileStorage in write-behind mode flushed at the end of
+        the test."""
+        with patch("atexit.register"):
+            storage = FileStorage(**kwargs)
+        self.addCleanup(storage.flush)
+        return storage
+
+    def wait_for_file(self):
+        """Wait up to 5 seconds for storage.json to be written."""
+        deadline = time.monotonic() + 5
+        while not os.path.exists("storage.json"):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_registers_flush_at_exit(self):
+        with patch("atexit.register") as register:
+            storage = FileStorage(flush_interval=60)
+        register.assert_called_once_with(storage.flush)
+        self.assertTrue(storage.thread_safe)
+        with patch("atexit.register") as register:
+            FileStorage()
+        register.assert_not_called()
+
+    def test_save_returns_before_write(self):
+        storage = self.storage(flush_interval=60)
+        BaseModel()
+        storage.save()
+        self.assertFalse(os.path.exists("storage.json"))
+        metrics = storage.flush_metrics()
+        self.assertEqual(1, metrics["pending_objects"])
+        self.assertGreaterEqual(metrics["pending_seconds"], 0)
+        storage.flush()
+        with open("storage.json", "r") as f:
+            self.assertEqual(1, len(json.load(f)))
+        metrics = storage.flush_metrics()
+        self.assertEqual(1, metrics["flushes"])
+        self.assertEqual(0, metrics["pending_objects"])
+        self.assertEqual(0.0, metrics["pending_seconds"])
+        self.assertGreater(metrics["last_duration"], 0)
+
+    def test_flush_interval(self):
+        storage = self.storage(flush_interval=0.05)
+        BaseModel()
+        storage.save()
+        self.wait_for_file()
+
+    def test_flush_after(self):
+        storage = self.storage(flush_interval=60, flush_after=3)
+        BaseModel()
+        BaseModel()
+        storage.save()
+        time.sleep(0.1)
+        self.assertFalse(os.path.exists("storage.json"))
+        BaseModel()
+        storage.save()
+        self.wait_for_file()
+
+    def test_flush_without_saves(self):
+        storage = self.storage(flush_interval=60)
+        BaseModel()
+        storage.flush()
+        self.assertFalse(os.path.exists("storage.json"))
+
+    def test_failed_flush_stays_pending(self):
+        storage = self.storage(flush_interval=60)
+        BaseModel()
+        storage.save()
+        with patch.object(storage.codec, "write", side_effect=OSError):
+            with self.assertRaises(OSError):
+                storage.flush()
+        metrics = storage.flush_metrics()
+        self.assertEqual(1, metrics["failures"])
+        self.assertGreater(metrics["pending_seconds"], 0)
+        storage.flush()
+        self.assertTrue(os.path.exists("storage.json"))
+
+
+class TestFileStorage_transaction(StorageTestCase):
+    """Unittests for testing transactions of FileStorage."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        models.storage.index_range(Place, "price_by_night")
+        self.place = Place()
+        self.place.name = "Loft"
+        self.place.price_by_night = 80
+        self.user = User()
+        models.storage.save()
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        models.storage.drop_range(Place, "price_by_night")
+
+    @file_only
+    def test_saves_once(self):
+        write = FileStorage._FileStorage__save
+        with patch.object(FileStorage, "_FileStorage__save", autospec=True,
+                          side_effect=write) as mock:
+            with models.storage.transaction():
+                for i in range(5):
+                    Review().save()
+                self.assertEqual(2, len(self.saved()))
+        mock.assert_called_once()
+        self.assertEqual(7, len(self.saved()))
+
+    def test_saves_changes_without_save(self):
+        with models.storage.transaction():
+            models.storage.delete(self.user)
+        self.assertEqual(["Place." + self.place.id], list(self.saved()))
+
+    @file_only
+    def test_no_changes_no_save(self):
+        with patch.object(FileStorage, "_FileStorage__save") as mock:
+            with models.storage.transaction():
+                models.storage.get(Place, self.place.id)
+        mock.assert_not_called()
+
+    def test_rollback(self):
+        changes = dict(FileStorage._FileStorage__changes)
+        with self.assertRaises(ValueError):
+            with models.storage.transaction():
+                self.place.name = "Cabin"
+                self.place.price_by_night = 120
+                self.place.number_rooms = 2
+                models.storage.delete(self.user)
+                review = Review()
+                review.place_id = self.place.id
+                review.save()
+                raise ValueError
+        self.assertEqual("Loft", self.place.name)
+        self.assertNotIn("number_rooms", self.place.__dict__)
+        self.assertIs(self.user, models.storage.get(User, self.user.id))
+        self.assertEqual(0, models.storage.count(Review))
+        self.assertEqual({}, dict(models.storage.lookup(
+            Review, "place_id", self.place.id)))
+        self.assertEqual([self.place], list(models.storage.lookup_range(
+            Place, "price_by_night", 80, 80).values()))
+        self.assertEqual(changes, FileStorage._FileStorage__changes)
+        self.assertEqual(2, len(self.saved()))
+
+    def test_nested_joins(self):
+        with self.assertRaises(ValueError):
+            with models.storage.transaction():
+                Review()
+                with models.storage.transaction():
+                    Review().save()
+                self.assertEqual(2, len(self.saved()))
+                raise ValueError
+        self.assertEqual(0, models.storage.count(Review))
+        with models.storage.transaction():
+            with models.storage.transaction():
+                Review().save()
+            self.assertEqual(2, len(self.saved()))
+        self.assertEqual(3, len(self.saved()))
+
+
+def text(value):
+    """Return a copy of the string value, built at run time so that it is
+    not the same object."""
+    return "".join(list(value))
+
+
+class TestFileStorage_intern(unittest.TestCase):
+    """Unittests for testing the interning of the ids objects refer to."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.city_id = text("city-0001")
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_assignment(self):
+        first, second = Place(), Place()
+        first.city_id = text(self.city_id)
+        second.city_id = text(self.city_id)
+        self.assertIs(first.city_id, second.city_id)
+        first.name = text("Loft")
+        second.name = text("Loft")
+        self.assertIsNot(first.name, second.name)
+
+    def test_reload(self):
+        for i in range(2):
+            place = Place()
+            place.city_id = self.city_id
+            place.amenity_ids = [text("wifi")]
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        first, second = models.storage.all(Place).values()
+        self.assertIs(first.city_id, second.city_id)
+        self.assertIs(first.amenity_ids[0], second.amenity_ids[0])
+        names = {id(name) for obj in (first, second) for name in
+                 obj.__dict__}
+        self.assertEqual(len(first.__dict__), len(names))
+
+    def test_create_many(self):
+        first, second = Place.create_many(
+            city_id=[text(self.city_id), text(self.city_id)])
+        self.assertIs(first.city_id, second.city_id)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,217 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/fulltext.py.
+
+Unittest classes:
+    TestFullTextIndex
+    TestFileStorage_search
+"""
+import os
+import json
+import models
+import unittest
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.engine.fulltext import FullTextIndex, tokenize
+from models.place import Place
+from models.review import Review
+
+
+def review(i, text):
+    """Return a Review with text that is not stored."""
+    return Review(id=str(i), text=text)
+
+
+class TestFullTextIndex(unittest.TestCase):
+    """Unittests for testing the FullTextIndex class."""
+
+    def setUp(self):
+        self.index = FullTextIndex("Review", "text")
+        texts = ["Great stay, great host", "Quiet and great",
+                 "Too noisy", "A quiet street, a quiet room"]
+        for i, text in enumerate(texts):
+            self.index.add(f"Review.{i}", review(i, text))
+
+    def test_tokenize(self):
+        self.assertEqual(["great", "stay", "great", "host"],
+                         tokenize("Great stay, great host!"))
+
+    def test_search(self):
+        self.assertEqual(["Review.0", "Review.1"],
+                         self.index.search("great"))
+        self.assertEqual(["Review.3", "Review.1"],
+                         self.index.search("quiet"))
+        self.assertEqual([], self.index.search("pool"))
+
+    def test_search_several_words(self):
+        self.assertEqual("Review.1", self.index.search("quiet great")[0])
+
+    def test_search_limit(self):
+        self.assertEqual(["Review.0"], self.index.search("great", 1))
+
+    def test_discard(self):
+        self.index.discard("Review.0")
+        self.assertEqual(["Review.1"], self.index.search("great"))
+        self.assertNotIn("Review.0", self.index)
+        self.index.discard("Review.0")
+
+    def test_skips_other_objects(self):
+        self.index.add("Place.1", Place(id="1", description="great"))
+        self.index.add("Review.5", review(5, None))
+        self.assertEqual(4, len(self.index))
+
+    def test_dump_and_load(self):
+        index = FullTextIndex("Review", "text")
+        index.load(json.loads(json.dumps(self.index.dump())))
+        self.assertEqual(self.index.search("quiet great"),
+                         index.search("quiet great"))
+        index.add("Review.1", review(1, "pool"))
+        self.assertEqual([], index.search("pool"))
+
+
+class TestFileStorage_search(unittest.TestCase):
+    """Unittests for testing the text search of FileStorage."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.great = Review()
+        self.great.text = "Great stay, great host"
+        self.noisy = Review()
+        self.noisy.text = "Too noisy"
+        self.place = Place()
+        self.place.description = "A great loft"
+
+    def tearDown(self):
+        for path in ("storage.json", "storage.json.fts",
+                     "storage.json.fts.log", "storage.json.log"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+
+    def test_search(self):
+        self.assertEqual([self.great], models.storage.search(Review, "great"))
+        self.assertEqual([self.place], models.storage.search("Place", "loft"))
+
+    def test_search_follows_changes(self):
+        self.noisy.text = "great and noisy"
+        self.assertEqual([self.great, self.noisy],
+                         models.storage.search(Review, "great"))
+        models.storage.delete(self.great)
+        self.assertEqual([self.noisy], models.storage.search(Review, "great"))
+
+    def test_search_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.search("User", "great")
+
+    def test_search_writes_index(self):
+        models.storage.save()
+        models.storage.search(Review, "great")
+        with open("storage.json.fts", "r") as f:
+            saved = json.load(f)
+        self.assertIn("Review." + self.great.id, saved["indexes"]["Review"])
+
+    def test_save_appends_changes(self):
+        models.storage.save()
+        models.storage.search(Review, "great")
+        self.noisy.text = "great"
+        with patch.object(FullTextIndex, "dump",
+                          side_effect=AssertionError):
+            models.storage.save()
+        self.assertTrue(os.path.exists("storage.json.fts.log"))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        with patch.object(FullTextIndex, "document",
+                          side_effect=AssertionError):
+            found = models.storage.search(Review, "great")
+        self.assertEqual(2, len(found))
+
+    def test_log_is_folded_into_index(self):
+        models.storage.save()
+        models.storage.search(Review, "great")
+        for i in range(20):
+            self.noisy.text = f"noisy {i}"
+            models.storage.save()
+        self.assertFalse(os.path.exists("storage.json.fts.log"))
+        with open("storage.json.fts", "r") as f:
+            saved = json.load(f)
+        self.assertEqual([2, {"noisy": 1, "19": 1}],
+                         saved["indexes"]["Review"]["Review." + self.noisy.id])
+
+    def test_reload_does_not_touch_index(self):
+        models.storage.save()
+        models.storage.search(Review, "great")
+        stat = os.stat("storage.json.fts")
+        FileStorage._FileStorage__objects = {}
+        with patch("builtins.open", wraps=open) as opened:
+            models.storage.reload()
+        self.assertNotIn("storage.json.fts",
+                         [c.args[0] for c in opened.call_args_list])
+        self.assertEqual(stat.st_mtime_ns,
+                         os.stat("storage.json.fts").st_mtime_ns)
+        FileStorage._FileStorage__objects = {}
+        os.remove("storage.json.fts")
+        models.storage.reload()
+        self.assertFalse(os.path.exists("storage.json.fts"))
+
+    def test_reload_restores_index(self):
+        models.storage.save()
+        models.storage.search(Review, "great")
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        with patch.object(FullTextIndex, "document",
+                          side_effect=AssertionError):
+            found = models.storage.search(Review, "great")
+        self.assertEqual(["Review." + self.great.id],
+                         [f"Review.{obj.id}" for obj in found])
+
+    def test_reload_rebuilds_stale_index(self):
+        models.storage.save()
+        models.storage.search(Review, "great")
+        with open("storage.json", "r") as f:
+            saved = json.load(f)
+        saved["Review." + self.noisy.id]["text"] = "great"
+        with open("storage.json", "w") as f:
+            json.dump(saved, f)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(2, len(models.storage.search(Review, "great")))
+
+    def test_lazy_search_loads_matches_only(self):
+        models.storage.search(Review, "great")
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(lazy=True)
+        storage.reload()
+        found = storage.search(Review, "great")
+        self.assertEqual([self.great.id], [obj.id for obj in found])
+        self.assertEqual(["Review." + self.great.id],
+                         list(FileStorage._FileStorage__objects))
+
+    def test_journal_replay_updates_restored_index(self):
+        models.storage.search(Review, "great")
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(journal=True, lazy=True)
+        storage.reload()
+        storage.get(Review, self.noisy.id).text = "great"
+        storage.delete(storage.get(Review, self.great.id))
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = {}
+        storage.reload()
+        found = storage.search(Review, "great")
+        self.assertEqual([self.noisy.id], [obj.id for obj in found])
+
+
+if __name__ == "__main__":
+    unittest.main()
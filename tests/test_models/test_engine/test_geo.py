@@ -0,0 +1,165 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/geo.py.
+
+Unittest classes:
+    TestHaversine
+    TestGeoIndex
+    TestFileStorage_geo
+"""
+import os
+import models
+import random
+import unittest
+from models.engine.file_storage import FileStorage
+from models.engine.geo import GeoIndex, haversine, distances
+from models.place import Place
+
+
+def place(i, lat, lon):
+    """Return a Place at (lat, lon) that is not stored."""
+    return Place(id=str(i), latitude=lat, longitude=lon)
+
+
+class TestHaversine(unittest.TestCase):
+    """Unittests for testing the distance functions."""
+
+    def test_haversine(self):
+        self.assertEqual(0, haversine(10, 20, 10, 20))
+        self.assertAlmostEqual(111.195, haversine(0, 0, 1, 0), places=3)
+        self.assertAlmostEqual(20015.114, haversine(0, 0, 0, 180), places=3)
+
+    def test_distances(self):
+        points = [(1, 0), (0, 1), (0, -179)]
+        self.assertEqual([haversine(0, 0, *p) for p in points],
+                         distances(0, 0, points))
+
+
+class TestGeoIndex(unittest.TestCase):
+    """Unittests for testing the GeoIndex class."""
+
+    def setUp(self):
+        rand = random.Random(42)
+        self.index = GeoIndex("Place", cell=1)
+        self.places = {}
+        for i in range(500):
+            pl = place(i, rand.uniform(-60, 60), rand.uniform(-180, 180))
+            self.places["Place." + pl.id] = pl
+            self.index.add("Place." + pl.id, pl)
+
+    def brute(self, lat, lon):
+        return sorted(self.places, key=lambda key: haversine(
+            lat, lon, self.places[key].latitude,
+            self.places[key].longitude))
+
+    def test_box(self):
+        box = self.index.box(-10, 20, 10, 60)
+        expected = {key for key, pl in self.places.items()
+                    if -10 <= pl.latitude <= 10 and
+                    20 <= pl.longitude <= 60}
+        self.assertEqual(expected, set(box))
+
+    def test_box_across_antimeridian(self):
+        box = self.index.box(-30, 170, 30, -170)
+        expected = {key for key, pl in self.places.items()
+                    if -30 <= pl.latitude <= 30 and
+                    abs(pl.longitude) >= 170}
+        self.assertTrue(expected)
+        self.assertEqual(expected, set(box))
+
+    def test_radius(self):
+        for lat, lon in [(0, 0), (45, 179.5), (-59, -100)]:
+            expected = [key for key in self.brute(lat, lon)
+                        if haversine(lat, lon, self.places[key].latitude,
+                                     self.places[key].longitude) <= 1500]
+            self.assertEqual(expected,
+                             list(self.index.radius(lat, lon, 1500)))
+
+    def test_radius_whole_earth(self):
+        self.assertEqual(500, len(self.index.radius(0, 0, 30000)))
+
+    def test_nearest(self):
+        for lat, lon in [(0, 0), (12.5, -179.9), (80, 10)]:
+            self.assertEqual(self.brute(lat, lon)[:7],
+                             list(self.index.nearest(lat, lon, 7)))
+
+    def test_nearest_more_than_stored(self):
+        self.assertEqual(500, len(self.index.nearest(0, 0, 1000)))
+        self.assertEqual({}, GeoIndex("Place").nearest(0, 0, 3))
+
+    def test_discard(self):
+        self.index.discard("Place.0")
+        self.assertNotIn("Place.0", self.index.nearest(
+            self.places["Place.0"].latitude,
+            self.places["Place.0"].longitude, 1))
+
+    def test_skips_invalid_coordinates(self):
+        self.index.clear()
+        self.index.add("Place.a", place("a", "1", 2))
+        self.index.add("Place.b", place("b", 100, 2))
+        self.assertEqual({}, self.index.nearest(0, 0, 2))
+
+
+class TestFileStorage_geo(unittest.TestCase):
+    """Unittests for testing the geospatial lookups of FileStorage."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.paris = Place()
+        self.paris.latitude = 48.8566
+        self.paris.longitude = 2.3522
+        self.lyon = Place()
+        self.lyon.latitude = 45.764
+        self.lyon.longitude = 4.8357
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_lookup_radius(self):
+        near = models.storage.lookup_radius(Place, 48.85, 2.35, 5)
+        self.assertEqual([self.paris], list(near.values()))
+
+    def test_lookup_box(self):
+        box = models.storage.lookup_box("Place", 40, 0, 47, 10)
+        self.assertEqual([self.lyon], list(box.values()))
+
+    def test_lookup_nearest(self):
+        near = models.storage.lookup_nearest(Place, 45, 5, 2)
+        self.assertEqual([self.lyon, self.paris], list(near.values()))
+
+    def test_follows_assignment_and_delete(self):
+        self.paris.latitude = 45.7
+        self.paris.longitude = 4.8
+        near = models.storage.lookup_radius(Place, 45.76, 4.83, 10)
+        self.assertEqual({self.paris, self.lyon}, set(near.values()))
+        models.storage.delete(self.lyon)
+        near = models.storage.lookup_radius(Place, 45.76, 4.83, 10)
+        self.assertEqual([self.paris], list(near.values()))
+
+    def test_skips_unset_coordinates(self):
+        Place()
+        Place().latitude = 0.0
+        null_island = Place()
+        null_island.latitude = 0.0
+        null_island.longitude = 0.0
+        near = models.storage.lookup_radius(Place, 0.01, 0.01, 5)
+        self.assertEqual([null_island], list(near.values()))
+
+    def test_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.lookup_nearest("User", 0, 0, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
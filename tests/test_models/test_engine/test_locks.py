@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/locks.py.
+
+Unittest classes:
+    TestRWLock
+"""
+import threading
+import unittest
+from models.engine.locks import RWLock
+
+
+class TestRWLock(unittest.TestCase):
+    """Unittests for testing the RWLock class."""
+
+    def setUp(self):
+        self.lock = RWLock()
+
+    def run_thread(self, target):
+        """Run target on a new thread and return whether it finished
+        within a tenth of a second."""
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(0.1)
+        return not thread.is_alive()
+
+    def read(self):
+        """Take the lock for reading and release it."""
+        with self.lock.reading():
+            pass
+
+    def test_readers_share(self):
+        with self.lock.reading():
+            self.assertTrue(self.run_thread(self.lock.acquire_read))
+
+    def test_writer_excludes_readers(self):
+        with self.lock.writing():
+            self.assertFalse(self.run_thread(self.lock.acquire_read))
+
+    def test_reader_excludes_writers(self):
+        with self.lock.reading():
+            self.assertFalse(self.run_thread(self.lock.acquire_write))
+
+    def test_waiting_writer_goes_first(self):
+        self.lock.acquire_read()
+        self.assertFalse(self.run_thread(self.lock.acquire_write))
+        self.assertFalse(self.run_thread(self.lock.acquire_read))
+        self.lock.release_read()
+
+    def test_reentrant(self):
+        with self.lock.writing():
+            with self.lock.writing(), self.lock.reading():
+                pass
+            self.assertFalse(self.run_thread(self.read))
+        with self.lock.reading(), self.lock.reading():
+            pass
+        self.assertTrue(self.run_thread(self.lock.acquire_write))
+
+    def test_read_to_write_raises(self):
+        with self.lock.reading():
+            with self.assertRaises(RuntimeError):
+                self.lock.acquire_write()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/query.py.
+
+Unittest classes:
+    TestQuery
+"""
+import os
+import models
+import unittest
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.engine.query import Query
+from models.place import Place
+from models.user import User
+
+
+class TestQuery(unittest.TestCase):
+    """Unittests for testing the Query class."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        models.storage.index_range(Place, "price_by_night")
+        self.places = []
+        for price, guests, city in [(100, 2, "a"), (150, 4, "a"),
+                                    (200, 6, "b"), (50, 4, "b")]:
+            pl = Place()
+            pl.price_by_night = price
+            pl.max_guest = guests
+            pl.city_id = city
+            self.places.append(pl)
+        User()
+
+    def tearDown(self):
+        try:
+            os.remove("storage.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        models.storage.drop_range(Place, "price_by_night")
+
+    def test_query(self):
+        self.assertIsInstance(models.storage.query(Place), Query)
+        self.assertEqual(4, len(models.storage.query(Place).all()))
+        self.assertEqual(1, len(models.storage.query("User").all()))
+
+    def test_where(self):
+        objs = models.storage.query(Place).where(
+            price_by_night__lte=150, max_guest__gte=4).all()
+        self.assertEqual({self.places[1], self.places[3]}, set(objs))
+
+    def test_where_eq(self):
+        query = models.storage.query(Place).where(city_id="b", max_guest=4)
+        self.assertEqual([self.places[3]], query.all())
+
+    def test_where_in_and_ne(self):
+        query = models.storage.query(Place).where(
+            price_by_night__in=[100, 200], city_id__ne="a")
+        self.assertEqual([self.places[2]], query.all())
+
+    def test_where_unknown_operator(self):
+        with self.assertRaises(ValueError):
+            models.storage.query(Place).where(name__like="x")
+
+    def test_where_returns_copy(self):
+        query = models.storage.query(Place)
+        query.where(city_id="a")
+        self.assertEqual(4, query.count())
+
+    def test_where_incomparable(self):
+        self.places[0].price_by_night = None
+        query = models.storage.query(Place).where(price_by_night__gt=0)
+        self.assertEqual(3, query.count())
+
+    def test_order_by(self):
+        prices = [pl.price_by_night for pl in
+                  models.storage.query(Place).order_by("price_by_night")]
+        self.assertEqual([50, 100, 150, 200], prices)
+
+    def test_order_by_missing(self):
+        self.places[2].name = "b"
+        self.places[0].__dict__["name"] = None
+        objs = models.storage.query(Place).order_by("-name", "missing").all()
+        self.assertEqual(self.places[2], objs[0])
+        self.assertEqual(self.places[0], objs[-1])
+        objs = models.storage.query(Place).order_by("name").all()
+        self.assertEqual(self.places[0], objs[0])
+        self.assertEqual(self.places[2], objs[-1])
+
+    def test_order_by_several(self):
+        objs = models.storage.query(Place).order_by(
+            "-max_guest", "price_by_night").all()
+        self.assertEqual([self.places[2], self.places[3], self.places[1],
+                          self.places[0]], objs)
+
+    def test_limit_and_first(self):
+        query = models.storage.query(Place).order_by("-price_by_night")
+        self.assertEqual(self.places[2:0:-1], query.limit(2).all())
+        self.assertIs(self.places[2], query.first())
+        self.assertIsNone(query.where(city_id="c").first())
+
+    def test_iteration_is_lazy(self):
+        it = iter(models.storage.query(Place))
+        self.assertIsInstance(next(it), Place)
+        places = dict(models.storage.all(Place))
+        seen = []
+
+        class Places(dict):
+            def values(self):
+                for place in places.values():
+                    seen.append(place)
+                    yield place
+
+        with patch.object(FileStorage, "all", return_value=Places()):
+            self.assertIs(self.places[0], models.storage.query(Place).first())
+        self.assertEqual([self.places[0]], seen)
+
+    def test_plan_uses_foreign_key_index(self):
+        query = models.storage.query(Place).where(
+            city_id="a", price_by_night__lte=150)
+        self.assertEqual("lookup Place.city_id", query.explain())
+        self.assertEqual({self.places[0], self.places[1]}, set(query))
+
+    def test_plan_gathers_only_the_smallest_set(self):
+        query = models.storage.query(Place).where(
+            price_by_night__gte=0, city_id="a")
+        with patch.object(FileStorage, "lookup_range",
+                          side_effect=AssertionError):
+            self.assertEqual("lookup Place.city_id", query.explain())
+            self.assertEqual({self.places[0], self.places[1]}, set(query))
+
+    def test_plan_uses_range_index(self):
+        query = models.storage.query(Place).where(
+            price_by_night__lte=100, max_guest__gte=4)
+        self.assertEqual("range Place.price_by_night", query.explain())
+        self.assertEqual([self.places[3]], query.all())
+
+    def test_where_between(self):
+        query = models.storage.query(Place).where(
+            price_by_night__between=(100, 150))
+        self.assertEqual("range Place.price_by_night", query.explain())
+        self.assertEqual({self.places[0], self.places[1]}, set(query))
+
+    def test_plan_scans_without_index(self):
+        query = models.storage.query(Place).where(name="x")
+        self.assertEqual("scan Place", query.explain())
+
+
+if __name__ == "__main__":
+    unittest.main()
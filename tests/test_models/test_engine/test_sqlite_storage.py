@@ -0,0 +1,270 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/sqlite_storage.py.
+
+The storage engine tests run against both FileStorage and SQLiteStorage:
+the engine-agnostic test classes of test_file_storage.py run here again
+against SQLiteStorage.
+
+Unittest classes:
+    TestSQLiteStorage_instantiation
+    TestFileStorage_engine
+    TestSQLiteStorage_engine
+    TestSQLiteStorage_methods
+    TestSQLiteStorage_class_index
+    TestSQLiteStorage_foreign_keys
+    TestSQLiteStorage_iter
+    TestSQLiteStorage_transaction
+    TestSQLiteStorage_save
+"""
+import os
+import json
+import sqlite3
+import unittest
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage, classes
+from models.engine.sqlite_storage import SQLiteStorage
+from models.user import User
+from models.state import State
+from models.place import Place
+from models.city import City
+from models.amenity import Amenity
+from models.review import Review
+from . import test_file_storage
+
+
+class TestSQLiteStorage_instantiation(unittest.TestCase):
+    """Unittests for testing instantiation of the SQLiteStorage class."""
+
+    def tearDown(self):
+        try:
+            os.remove("test.db")
+        except IOError:
+            pass
+
+    def test_instantiation_with_arg(self):
+        with self.assertRaises(TypeError):
+            SQLiteStorage(None)
+
+    def test_creates_one_table_per_class(self):
+        SQLiteStorage(database="test.db").close()
+        with sqlite3.connect("test.db") as connection:
+            tables = {name for name, in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertEqual({"BaseModel", "User", "State", "City", "Amenity",
+                          "Place", "Review"}, tables)
+
+
+class StorageEngineTests:
+    """Unittests shared by every storage engine."""
+
+    def setUp(self):
+        try:
+            os.rename("storage.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = self.make_storage()
+
+    def tearDown(self):
+        for path in ("storage.json", "test.db"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "storage.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def reloaded(self):
+        """Return the objects of a fresh storage reloaded from disk."""
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = self.make_storage()
+        storage.reload()
+        return storage.all()
+
+    def test_all(self):
+        self.assertEqual(dict, type(self.storage.all()))
+
+    def test_new(self):
+        for cls in (BaseModel, User, State, City, Place, Amenity, Review):
+            obj = cls()
+            self.storage.new(obj)
+            key = "{}.{}".format(cls.__name__, obj.id)
+            self.assertIs(obj, self.storage.all()[key])
+
+    def test_save_and_reload(self):
+        objs = [cls() for cls in
+                (BaseModel, User, State, City, Place, Amenity, Review)]
+        reloaded = self.reloaded()
+        for obj in objs:
+            key = "{}.{}".format(obj.__class__.__name__, obj.id)
+            self.assertEqual(obj.to_dict(), reloaded[key].to_dict())
+
+    def test_reload_modified(self):
+        pl = Place()
+        self.storage.save()
+        pl.max_guest = 4
+        pl.amenity_ids = ["wifi"]
+        reloaded = self.reloaded()
+        self.assertEqual(4, reloaded["Place." + pl.id].max_guest)
+        self.assertEqual(["wifi"], reloaded["Place." + pl.id].amenity_ids)
+
+    def test_reload_deleted(self):
+        us = User()
+        self.storage.save()
+        self.storage.delete(us)
+        self.assertNotIn("User." + us.id, self.reloaded())
+
+    def test_get(self):
+        us = User()
+        self.assertIs(us, self.storage.get(User, us.id))
+        self.assertIsNone(self.storage.get(User, "missing"))
+
+
+class TestFileStorage_engine(StorageEngineTests, unittest.TestCase):
+    """Runs the storage engine tests against FileStorage."""
+
+    def make_storage(self):
+        return FileStorage()
+
+
+class TestSQLiteStorage_engine(StorageEngineTests, unittest.TestCase):
+    """Runs the storage engine tests against SQLiteStorage."""
+
+    def make_storage(self):
+        return SQLiteStorage(database="test.db")
+
+
+class SQLiteEngine:
+    """Runs the tests of a test_file_storage.StorageTestCase against
+    SQLiteStorage."""
+
+    files = False
+
+    def make_storage(self):
+        """Return an SQLiteStorage without the changes other tests left
+        unsaved in the state it shares with FileStorage."""
+        storage = SQLiteStorage(database="test.db")
+        storage._take_changes()
+        return storage
+
+    def run(self, result=None):
+        try:
+            return super().run(result)
+        finally:
+            self.engine.close()
+            try:
+                os.remove("test.db")
+            except IOError:
+                pass
+
+    def saved(self):
+        """Return the records of test.db, by key."""
+        records = {}
+        with sqlite3.connect("test.db") as connection:
+            for name in classes:
+                for obj_id, data in connection.execute(
+                        'SELECT id, data FROM "{}"'.format(name)):
+                    records["{}.{}".format(name, obj_id)] = json.loads(data)
+        return records
+
+
+class TestSQLiteStorage_methods(SQLiteEngine,
+                               test_file_storage.TestFileStorage_methods):
+    """Runs the FileStorage method tests against SQLiteStorage."""
+
+
+class TestSQLiteStorage_class_index(
+        SQLiteEngine, test_file_storage.TestFileStorage_class_index):
+    """Runs the class index tests against SQLiteStorage."""
+
+
+class TestSQLiteStorage_foreign_keys(
+        SQLiteEngine, test_file_storage.TestFileStorage_foreign_keys):
+    """Runs the foreign key index tests against SQLiteStorage."""
+
+
+class TestSQLiteStorage_iter(SQLiteEngine,
+                             test_file_storage.TestFileStorage_iter):
+    """Runs the iteration tests against SQLiteStorage."""
+
+
+class TestSQLiteStorage_transaction(
+        SQLiteEngine, test_file_storage.TestFileStorage_transaction):
+    """Runs the transaction tests against SQLiteStorage."""
+
+
+class TestSQLiteStorage_save(unittest.TestCase):
+    """Unittests for testing save method of the SQLiteStorage class."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.storage = SQLiteStorage(database="test.db")
+
+    def tearDown(self):
+        self.storage.close()
+        try:
+            os.remove("test.db")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def rows(self, table):
+        """Return the (id, data) rows of table."""
+        with sqlite3.connect("test.db") as connection:
+            return list(connection.execute(
+                'SELECT id, data FROM "{}"'.format(table)))
+
+    def test_save_writes_rows(self):
+        us = User()
+        us.first_name = "Betty"
+        self.storage.save()
+        [(obj_id, data)] = self.rows("User")
+        self.assertEqual(us.id, obj_id)
+        self.assertEqual("Betty", json.loads(data)["first_name"])
+
+    def test_save_writes_changes_only(self):
+        us = User()
+        bm = BaseModel()
+        self.storage.save()
+        with sqlite3.connect("test.db") as connection:
+            connection.execute('DELETE FROM "BaseModel"')
+        us.first_name = "Betty"
+        self.storage.save()
+        self.assertEqual([], self.rows("BaseModel"))
+        self.assertEqual(1, len(self.rows("User")))
+
+    def test_save_deletes_rows(self):
+        us = User()
+        self.storage.save()
+        self.storage.delete(us)
+        self.storage.save()
+        self.assertEqual([], self.rows("User"))
+
+    def test_failed_save_keeps_changes(self):
+        us = User()
+        self.storage.close()
+        with self.assertRaises(sqlite3.Error):
+            self.storage.save()
+        self.assertIn("User." + us.id, self.storage._take_changes())
+
+    def test_search_saves_no_text_index(self):
+        review = Review()
+        review.text = "Great stay"
+        self.storage.save()
+        self.assertEqual([review], self.storage.search(Review, "great"))
+        self.assertFalse(os.path.exists("storage.json.fts"))
+
+    def test_transaction_saves_once(self):
+        with self.storage.transaction():
+            User().save()
+            self.storage.save()
+            self.assertEqual([], self.rows("User"))
+        self.assertEqual(1, len(self.rows("User")))
+
+
+if __name__ == "__main__":
+    unittest.main()